@@ -0,0 +1,111 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the codecs of the serializer.
+
+This compares sending a list of objects with date, address and set fields
+as JSON primitives with encoding them with the binary codec, from the
+objects to bytes and back.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+from typing import Any
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import codec
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchInterface(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'name': fields.StringField(),
+        'address': fields.IPAddressField(),
+        'network': fields.IPNetworkField(),
+        'ports': fields.SetOfIntegersField(),
+        'created_at': fields.DateTimeField(),
+        'updated_at': fields.DateTimeField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchInterfaceList(
+    base.ObjectListBase[BenchInterface], base.VersionedObject
+):
+    VERSION = '1.0'
+    fields = {'objects': fields.ListOfObjectsField('BenchInterface')}
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=1000)
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    interfaces = BenchInterfaceList(
+        objects=[
+            BenchInterface(
+                id=i,
+                name=f'eth{i}',
+                address=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}',
+                network='10.0.0.0/8',
+                ports={22, 80, 443},
+                created_at=created_at,
+                updated_at=created_at + datetime.timedelta(seconds=i),
+            )
+            for i in range(args.objects)
+        ]
+    )
+    interfaces.obj_reset_changes(recursive=True)
+    serializer = base.VersionedObjectSerializer()
+    binary = codec.BinaryCodec()
+
+    def send_json() -> str:
+        return json.dumps(serializer.serialize_entity(None, interfaces))
+
+    def send_binary() -> Any:
+        return serializer.serialize_entity(None, interfaces, codec=binary)
+
+    json_data = send_json()
+    binary_entity = send_binary()
+    binary_size = len(binary_entity['versioned_object.encoded'])
+    print(f'JSON: {len(json_data)} bytes')
+    print(f'binary codec: {binary_size} bytes')
+    common.report(
+        {
+            'JSON': common.measure(send_json, args.repeat),
+            'binary codec': common.measure(send_binary, args.repeat),
+        },
+        baseline='JSON',
+    )
+    common.report(
+        {
+            'from JSON': common.measure(
+                lambda: serializer.deserialize_entity(
+                    None, json.loads(json_data)
+                ),
+                args.repeat,
+            ),
+            'from binary codec': common.measure(
+                lambda: serializer.deserialize_entity(None, binary_entity),
+                args.repeat,
+            ),
+        },
+        baseline='from JSON',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Helpers shared by the benchmark scripts.
+
+The scripts are run from the top of the source tree, for example::
+
+    PYTHONPATH=. python benchmarks/hydration.py
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import timeit
+import tracemalloc
+from typing import Any
+
+
+def parse_args(description: str, **defaults: int) -> argparse.Namespace:
+    """Parse the options common to the benchmarks.
+
+    :param description: Description of the benchmark
+    :param defaults: Default values of the integer options of the
+                     benchmark, such as the number of objects
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Number of times to repeat each measurement',
+    )
+    for name, default in defaults.items():
+        parser.add_argument(
+            '--' + name.replace('_', '-'), type=int, default=default
+        )
+    return parser.parse_args()
+
+
+def measure(func: Callable[[], Any], repeat: int, number: int = 1) -> float:
+    """Return the best time of func, in seconds per call."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """Return the most memory allocated at once by a call of func, in bytes.
+
+    The memory allocated by func is traced, so this is slower than the
+    call itself.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def report(results: dict[str, float], baseline: str | None = None) -> None:
+    """Print the times measured, relative to the baseline if any."""
+    width = max(len(name) for name in results)
+    base = results[baseline] if baseline is not None else None
+    for name, seconds in results.items():
+        line = f'{name:<{width}}  {seconds * 1000:10.3f} ms'
+        if base is not None and name != baseline:
+            line += f'  ({base / seconds:.2f}x)'
+        print(line)
@@ -0,0 +1,97 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the compression of the objects sent by the serializer.
+
+This compares the size of an object with large metadata fields as sent by
+the serializer without compression and with the zlib compressor, and the
+time taken to serialize and deserialize it both ways.
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import codec
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchInstance(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'uuid': fields.UUIDField(),
+        'metadata': fields.DictOfStringsField(),
+        'system_metadata': fields.DictOfStringsField(),
+        'tags': fields.ListOfStringsField(),
+    }
+
+
+class CompressingSerializer(base.VersionedObjectSerializer):
+    OBJ_COMPRESSOR = codec.ZlibCompressor()
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], keys=2000)
+    instance = BenchInstance(
+        uuid='00000000-0000-0000-0000-000000000001',
+        metadata={
+            f'key{i}': f'value {i} of the metadata' for i in range(args.keys)
+        },
+        system_metadata={
+            f'image_property_{i}': 'x' * (i % 64) for i in range(args.keys)
+        },
+        tags=[f'tag{i}' for i in range(args.keys)],
+    )
+    plain = base.VersionedObjectSerializer()
+    compressing = CompressingSerializer()
+    entity = plain.serialize_entity(None, instance)
+    compressed = compressing.serialize_entity(None, instance)
+    print(f'uncompressed: {len(json.dumps(entity))} bytes')
+    print(f'zlib: {len(compressed["versioned_object.encoded"])} bytes')
+    assert (
+        plain.deserialize_entity(None, compressed).obj_to_primitive()
+        == instance.obj_to_primitive()
+    )
+    common.report(
+        {
+            'uncompressed': common.measure(
+                lambda: json.dumps(plain.serialize_entity(None, instance)),
+                args.repeat,
+            ),
+            'zlib': common.measure(
+                lambda: compressing.serialize_entity(None, instance),
+                args.repeat,
+            ),
+        },
+        baseline='uncompressed',
+    )
+    text = json.dumps(entity)
+    common.report(
+        {
+            'uncompressed': common.measure(
+                lambda: plain.deserialize_entity(None, json.loads(text)),
+                args.repeat,
+            ),
+            'zlib': common.measure(
+                lambda: plain.deserialize_entity(None, compressed),
+                args.repeat,
+            ),
+        },
+        baseline='uncompressed',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the compact envelope of primitives.
+
+This compares the size of the JSON encoding of a list of small objects, and
+the time taken to serialize and deserialize it, with the full and compact
+envelopes.
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchPort(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'number': fields.IntegerField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchPortList(base.ObjectListBase[BenchPort], base.VersionedObject):
+    VERSION = '1.0'
+    fields = {'objects': fields.ListOfObjectsField('BenchPort')}
+
+
+class CompactSerializer(base.VersionedObjectSerializer):
+    OBJ_COMPACT_PRIMITIVES = True
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=1000)
+    ports = BenchPortList(
+        objects=[
+            BenchPort(id=i, number=i % 65536) for i in range(args.objects)
+        ]
+    )
+    ports.obj_reset_changes(recursive=True)
+    full = base.VersionedObjectSerializer()
+    compact = CompactSerializer()
+    full_primitive = full.serialize_entity(None, ports)
+    compact_primitive = compact.serialize_entity(None, ports)
+    print(f'full envelope: {len(json.dumps(full_primitive))} bytes')
+    print(f'compact envelope: {len(json.dumps(compact_primitive))} bytes')
+    common.report(
+        {
+            'serialize_entity': common.measure(
+                lambda: full.serialize_entity(None, ports), args.repeat
+            ),
+            'serialize_entity(compact)': common.measure(
+                lambda: compact.serialize_entity(None, ports), args.repeat
+            ),
+        },
+        baseline='serialize_entity',
+    )
+    common.report(
+        {
+            'deserialize_entity': common.measure(
+                lambda: full.deserialize_entity(None, full_primitive),
+                args.repeat,
+            ),
+            'deserialize_entity(compact)': common.measure(
+                lambda: full.deserialize_entity(None, compact_primitive),
+                args.repeat,
+            ),
+        },
+        baseline='deserialize_entity',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the hydration of objects from primitives.
+
+This compares obj_from_primitive() with and without trusted hydration, for
+a list of objects with scalar, date and collection fields.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchTag(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'name': fields.StringField(),
+        'weight': fields.IntegerField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchItem(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'uuid': fields.UUIDField(),
+        'name': fields.StringField(),
+        'enabled': fields.BooleanField(),
+        'created_at': fields.DateTimeField(),
+        'aliases': fields.ListOfStringsField(),
+        'metadata': fields.DictOfStringsField(),
+        'ports': fields.SetOfIntegersField(),
+        'tags': fields.ListOfObjectsField('BenchTag'),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchItemList(base.ObjectListBase[BenchItem], base.VersionedObject):
+    VERSION = '1.0'
+    fields = {'objects': fields.ListOfObjectsField('BenchItem')}
+
+
+def make_primitive(count: int) -> dict[str, object]:
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    items = BenchItemList(
+        objects=[
+            BenchItem(
+                id=i,
+                uuid=f'00000000-0000-0000-0000-{i:012d}',
+                name=f'item-{i}',
+                enabled=bool(i % 2),
+                created_at=created_at,
+                aliases=[f'alias-{j}' for j in range(4)],
+                metadata={f'key-{j}': f'value-{j}' for j in range(4)},
+                ports={80, 443, 8000 + i % 100},
+                tags=[BenchTag(name=f'tag-{j}', weight=j) for j in range(3)],
+            )
+            for i in range(count)
+        ]
+    )
+    return items.obj_to_primitive()
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=1000)
+    primitive = make_primitive(args.objects)
+    common.report(
+        {
+            'obj_from_primitive': common.measure(
+                lambda: BenchItemList.obj_from_primitive(primitive),
+                args.repeat,
+            ),
+            'obj_from_primitive(trusted)': common.measure(
+                lambda: BenchItemList.obj_from_primitive(
+                    primitive, trusted=True
+                ),
+                args.repeat,
+            ),
+        },
+        baseline='obj_from_primitive',
+    )
+
+
+if __name__ == '__main__':
+    main()
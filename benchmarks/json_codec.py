@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the direct JSON encoding of objects.
+
+This compares json.dumps() of the primitive of a list of objects with
+obj_to_json(), and obj_from_primitive() of the text parsed by json.loads()
+with obj_from_json(), for the time taken and the peak memory used. The list
+itself is made beforehand, so only the memory used by the primitives is
+measured.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchFlavor(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'name': fields.StringField(),
+        'vcpus': fields.IntegerField(),
+        'extra_specs': fields.DictOfStringsField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchInstance(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'uuid': fields.UUIDField(),
+        'hostname': fields.StringField(),
+        'created_at': fields.DateTimeField(),
+        'metadata': fields.DictOfStringsField(),
+        'flavor': fields.ObjectField('BenchFlavor'),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchInstanceList(
+    base.ObjectListBase[BenchInstance], base.VersionedObject
+):
+    VERSION = '1.0'
+    fields = {'objects': fields.ListOfObjectsField('BenchInstance')}
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=10000)
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    instances = BenchInstanceList(
+        objects=[
+            BenchInstance(
+                id=i,
+                uuid=f'00000000-0000-0000-0000-{i:012d}',
+                hostname=f'instance{i}',
+                created_at=created_at,
+                metadata={'role': 'web', 'index': str(i)},
+                flavor=BenchFlavor(
+                    name='m1.small', vcpus=1, extra_specs={'hw:numa': '1'}
+                ),
+            )
+            for i in range(args.objects)
+        ]
+    )
+    instances.obj_reset_changes(recursive=True)
+    text = json.dumps(instances.obj_to_primitive())
+    assert instances.obj_to_json() == text
+    assert (
+        BenchInstanceList.obj_from_json(text).obj_to_primitive()
+        == instances.obj_to_primitive()
+    )
+
+    def dumps() -> str:
+        return json.dumps(instances.obj_to_primitive())
+
+    def loads() -> BenchInstanceList:
+        return BenchInstanceList.obj_from_primitive(json.loads(text))
+
+    def from_json() -> BenchInstanceList:
+        return BenchInstanceList.obj_from_json(text)
+
+    print(f'JSON text: {len(text)} characters')
+    # NOTE: The text made and the objects hydrated are held either way, so
+    # the difference is the memory of the primitives
+    for name, func in (
+        ('json.dumps(obj_to_primitive())', dumps),
+        ('obj_to_json()', instances.obj_to_json),
+        ('obj_from_primitive(json.loads())', loads),
+        ('obj_from_json()', from_json),
+    ):
+        print(f'{name}: peak {common.peak_memory(func) / 2**20:.1f} MiB')
+    common.report(
+        {
+            'json.dumps(obj_to_primitive())': common.measure(
+                dumps, args.repeat
+            ),
+            'obj_to_json()': common.measure(
+                instances.obj_to_json, args.repeat
+            ),
+        },
+        baseline='json.dumps(obj_to_primitive())',
+    )
+    common.report(
+        {
+            'obj_from_primitive(json.loads())': common.measure(
+                loads, args.repeat
+            ),
+            'obj_from_json()': common.measure(from_json, args.repeat),
+        },
+        baseline='obj_from_primitive(json.loads())',
+    )
+
+
+if __name__ == '__main__':
+    main()
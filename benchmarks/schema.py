@@ -0,0 +1,123 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the binary layouts of object classes.
+
+This compares hydrating a list of objects from its primitive with
+obj_from_primitive() with decoding it from the bytes encoded by the schema
+codec, and the dehydration of the list both ways.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import codec
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchPort(base.VersionedObject):
+    VERSION = '1.0'
+    OBJ_BINARY_LAYOUT = True
+    fields = {
+        'id': fields.IntegerField(),
+        'uuid': fields.UUIDField(),
+        'name': fields.StringField(),
+        'description': fields.StringField(nullable=True),
+        'admin_state_up': fields.BooleanField(),
+        'mtu': fields.IntegerField(),
+        'weight': fields.FloatField(),
+        'created_at': fields.DateTimeField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchPortList(base.ObjectListBase[BenchPort], base.VersionedObject):
+    VERSION = '1.0'
+    OBJ_BINARY_LAYOUT = True
+    fields = {'objects': fields.ListOfObjectsField('BenchPort')}
+
+
+class TrustedSerializer(base.VersionedObjectSerializer):
+    OBJ_TRUSTED_HYDRATION = True
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=10000)
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    ports = BenchPortList(
+        objects=[
+            BenchPort(
+                id=i,
+                uuid=f'00000000-0000-0000-0000-{i:012d}',
+                name=f'port{i}',
+                description=None,
+                admin_state_up=True,
+                mtu=1500,
+                weight=i / 10,
+                created_at=created_at,
+            )
+            for i in range(args.objects)
+        ]
+    )
+    ports.obj_reset_changes(recursive=True)
+    schema = codec.SchemaCodec()
+    serializer = base.VersionedObjectSerializer()
+    trusted_serializer = TrustedSerializer()
+    primitive = ports.obj_to_primitive()
+    entity = serializer.serialize_entity(None, ports, codec=schema)
+    print(f'schema codec: {len(entity["versioned_object.encoded"])} bytes')
+    assert (
+        serializer.deserialize_entity(None, entity).obj_to_primitive()
+        == primitive
+    )
+    common.report(
+        {
+            'obj_to_primitive()': common.measure(
+                ports.obj_to_primitive, args.repeat
+            ),
+            'schema codec': common.measure(
+                lambda: schema.encode_object(ports), args.repeat
+            ),
+        },
+        baseline='obj_to_primitive()',
+    )
+    common.report(
+        {
+            'obj_from_primitive()': common.measure(
+                lambda: BenchPortList.obj_from_primitive(primitive),
+                args.repeat,
+            ),
+            'obj_from_primitive(trusted=True)': common.measure(
+                lambda: BenchPortList.obj_from_primitive(
+                    primitive, trusted=True
+                ),
+                args.repeat,
+            ),
+            'from schema codec': common.measure(
+                lambda: serializer.deserialize_entity(None, entity),
+                args.repeat,
+            ),
+            'from schema codec, trusted': common.measure(
+                lambda: trusted_serializer.deserialize_entity(None, entity),
+                args.repeat,
+            ),
+        },
+        baseline='obj_from_primitive()',
+    )
+
+
+if __name__ == '__main__':
+    main()
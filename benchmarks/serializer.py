@@ -0,0 +1,95 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the serialization of nested RPC arguments.
+
+This compares VersionedObjectSerializer with a subclass overriding
+_process_iterable(), which keeps the recursive processing of containers,
+for a list of dicts holding objects, lists and scalar values.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchPort(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'name': fields.StringField(),
+    }
+
+
+class RecursiveSerializer(base.VersionedObjectSerializer):
+    def _process_iterable(self, context: Any, action_fn: Any, values: Any):
+        return super()._process_iterable(context, action_fn, values)
+
+
+def make_payload(count: int, width: int) -> list[dict[str, Any]]:
+    return [
+        {
+            'id': i,
+            'name': f'host-{i}',
+            'port': BenchPort(id=i, name=f'port-{i}'),
+            'tags': [f'tag-{j}' for j in range(width)],
+            'limits': {f'limit-{j}': j for j in range(width)},
+            'nested': [
+                {'index': j, 'values': (j, None)} for j in range(width)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], items=1000, width=4)
+    payload = make_payload(args.items, args.width)
+    serializer = base.VersionedObjectSerializer()
+    recursive = RecursiveSerializer()
+    primitive = serializer.serialize_entity(None, payload)
+    assert primitive == recursive.serialize_entity(None, payload)
+    common.report(
+        {
+            'serialize_entity(recursive)': common.measure(
+                lambda: recursive.serialize_entity(None, payload),
+                args.repeat,
+            ),
+            'serialize_entity': common.measure(
+                lambda: serializer.serialize_entity(None, payload),
+                args.repeat,
+            ),
+        },
+        baseline='serialize_entity(recursive)',
+    )
+    common.report(
+        {
+            'deserialize_entity(recursive)': common.measure(
+                lambda: recursive.deserialize_entity(None, primitive),
+                args.repeat,
+            ),
+            'deserialize_entity': common.measure(
+                lambda: serializer.deserialize_entity(None, primitive),
+                args.repeat,
+            ),
+        },
+        baseline='deserialize_entity(recursive)',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the sharing of repeated sub-objects in primitives.
+
+This compares obj_to_primitive() with obj_to_shared_primitive() for a list
+of objects which all reference one of a few flavor objects, and the
+hydration of the primitives they make.
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchFlavor(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'name': fields.StringField(),
+        'memory_mb': fields.IntegerField(),
+        'vcpus': fields.IntegerField(),
+        'extra_specs': fields.DictOfStringsField(),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchInstance(base.VersionedObject):
+    VERSION = '1.0'
+    fields = {
+        'id': fields.IntegerField(),
+        'name': fields.StringField(),
+        'flavor': fields.ObjectField('BenchFlavor'),
+    }
+
+
+@base.VersionedObjectRegistry.register
+class BenchInstanceList(
+    base.ObjectListBase[BenchInstance], base.VersionedObject
+):
+    VERSION = '1.0'
+    fields = {'objects': fields.ListOfObjectsField('BenchInstance')}
+
+
+def make_list(count: int, flavors: int) -> BenchInstanceList:
+    flavor_objects = [
+        BenchFlavor(
+            id=i,
+            name=f'flavor-{i}',
+            memory_mb=1024 * (i + 1),
+            vcpus=i + 1,
+            extra_specs={f'spec-{j}': f'value-{j}' for j in range(10)},
+        )
+        for i in range(flavors)
+    ]
+    return BenchInstanceList(
+        objects=[
+            BenchInstance(
+                id=i, name=f'instance-{i}', flavor=flavor_objects[i % flavors]
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=1000, flavors=5)
+    instances = make_list(args.objects, args.flavors)
+    primitive = instances.obj_to_primitive()
+    shared = instances.obj_to_shared_primitive()
+    print(f'primitive size: {len(json.dumps(primitive))} bytes')
+    print(f'shared primitive size: {len(json.dumps(shared))} bytes')
+    common.report(
+        {
+            'obj_to_primitive': common.measure(
+                instances.obj_to_primitive, args.repeat
+            ),
+            'obj_to_shared_primitive': common.measure(
+                instances.obj_to_shared_primitive, args.repeat
+            ),
+        },
+        baseline='obj_to_primitive',
+    )
+    common.report(
+        {
+            'obj_from_primitive': common.measure(
+                lambda: BenchInstanceList.obj_from_primitive(primitive),
+                args.repeat,
+            ),
+            'obj_from_primitive(shared)': common.measure(
+                lambda: BenchInstanceList.obj_from_primitive(shared),
+                args.repeat,
+            ),
+        },
+        baseline='obj_from_primitive',
+    )
+
+
+if __name__ == '__main__':
+    main()
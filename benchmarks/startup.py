@@ -0,0 +1,127 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the registration of objects when a service starts.
+
+This generates a package with one object per module, and compares
+importing all of them with declaring them with register_lazy(), each
+followed by the lookup of one object, in a new interpreter each time.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess  # noqa: S404
+import sys
+import tempfile
+
+from benchmarks import common
+
+MODULE = '''
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchObject{index}(base.VersionedObject):
+    VERSION = '1.{index}'
+    fields = {{
+{fields}
+    }}
+'''
+
+SETUP = '''
+import time
+
+from oslo_versionedobjects import base
+
+start = time.perf_counter()
+'''
+
+EAGER = '''
+for index in range({count}):
+    __import__(f'bench_objects.module{{index}}')
+'''
+
+LAZY = '''
+for index in range({count}):
+    base.VersionedObjectRegistry.register_lazy(
+        f'BenchObject{{index}}', f'bench_objects.module{{index}}'
+    )
+'''
+
+LOOKUP = '''
+base.VersionedObject.obj_class_from_name('BenchObject0', '1.0')
+print(time.perf_counter() - start)
+'''
+
+
+def make_package(path: str, count: int, field_count: int) -> None:
+    package = os.path.join(path, 'bench_objects')
+    os.mkdir(package)
+    with open(os.path.join(package, '__init__.py'), 'w'):
+        pass
+    fields = '\n'.join(
+        f"        'field{i}': fields.StringField(nullable=True),"
+        for i in range(field_count)
+    )
+    for index in range(count):
+        module = os.path.join(package, f'module{index}.py')
+        with open(module, 'w') as f:
+            f.write(MODULE.format(index=index, fields=fields))
+
+
+def run(path: str, script: str, repeat: int) -> float:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [path, os.getcwd(), env.get('PYTHONPATH', '')]
+    )
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, '-c', script],
+            env=env,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        times.append(float(output.split()[-1]))
+    return min(times)
+
+
+def main() -> None:
+    args = common.parse_args(
+        'Measure the registration of objects when a service starts.',
+        objects=500,
+        fields=20,
+    )
+    with tempfile.TemporaryDirectory() as path:
+        make_package(path, args.objects, args.fields)
+        common.report(
+            {
+                'import all modules': run(
+                    path,
+                    SETUP + EAGER.format(count=args.objects) + LOOKUP,
+                    args.repeat,
+                ),
+                'register_lazy()': run(
+                    path,
+                    SETUP + LAZY.format(count=args.objects) + LOOKUP,
+                    args.repeat,
+                ),
+            },
+            baseline='import all modules',
+        )
+
+
+if __name__ == '__main__':
+    main()
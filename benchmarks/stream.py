@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the streaming of the primitives of object lists.
+
+This compares sending a list of objects as the JSON document of its
+primitive with sending it as one JSON document per element, made by
+iter_primitives() and hydrated by from_primitive_stream(), for the peak
+memory used and the time taken. The list itself is made beforehand, so
+only the memory used by its primitives is measured.
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks import common
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+
+@base.VersionedObjectRegistry.register
+class BenchPort(base.VersionedObject):
+    VERSION = '1.1'
+    fields = {
+        'id': fields.IntegerField(),
+        'uuid': fields.UUIDField(),
+        'name': fields.StringField(),
+        'description': fields.StringField(nullable=True),
+        'admin_state_up': fields.BooleanField(),
+        'mtu': fields.IntegerField(),
+        'tags': fields.ListOfStringsField(),
+    }
+
+    def obj_make_compatible(self, primitive, target_version):
+        super().obj_make_compatible(primitive, target_version)
+        if target_version == '1.0':
+            primitive.pop('tags', None)
+
+
+@base.VersionedObjectRegistry.register
+class BenchPortList(base.ObjectListBase[BenchPort], base.VersionedObject):
+    VERSION = '1.1'
+    fields = {'objects': fields.ListOfObjectsField('BenchPort')}
+    obj_relationships = {'objects': [('1.0', '1.0'), ('1.1', '1.1')]}
+
+
+def send_whole(ports: BenchPortList, target_version: str) -> list[str]:
+    return [json.dumps(ports.obj_to_primitive(target_version))]
+
+
+def send_stream(ports: BenchPortList, target_version: str) -> int:
+    # NOTE: The documents are sent and dropped as they are made
+    size = 0
+    for primitive in ports.iter_primitives(target_version):
+        size += len(json.dumps(primitive))
+    return size
+
+
+def main() -> None:
+    args = common.parse_args(__doc__.splitlines()[0], objects=20000)
+    ports = BenchPortList(
+        objects=[
+            BenchPort(
+                id=i,
+                uuid=f'00000000-0000-0000-0000-{i:012d}',
+                name=f'port{i}',
+                description=None,
+                admin_state_up=True,
+                mtu=1500,
+                tags=['a', 'b'],
+            )
+            for i in range(args.objects)
+        ]
+    )
+    ports.obj_reset_changes(recursive=True)
+    whole = send_whole(ports, '1.1')[0]
+    lines = [json.dumps(p) for p in ports.iter_primitives('1.1')]
+
+    def receive_whole() -> BenchPortList:
+        return BenchPortList.obj_from_primitive(json.loads(whole))
+
+    def receive_stream() -> BenchPortList:
+        return BenchPortList.from_primitive_stream(
+            json.loads(line) for line in lines
+        )
+
+    assert (
+        receive_whole().obj_to_primitive()
+        == receive_stream().obj_to_primitive()
+    )
+    cases = {
+        'send whole': lambda: send_whole(ports, '1.1'),
+        'send stream': lambda: send_stream(ports, '1.1'),
+        'send whole, backported': lambda: send_whole(ports, '1.0'),
+        'send stream, backported': lambda: send_stream(ports, '1.0'),
+    }
+    for name, func in cases.items():
+        print(f'{name}: peak {common.peak_memory(func) / 2**20:.1f} MiB')
+    # NOTE: The lists hydrated are held either way, so the difference is
+    # the memory of the primitives
+    for name, func in (
+        ('receive whole', receive_whole),
+        ('receive stream', receive_stream),
+    ):
+        print(f'{name}: peak {common.peak_memory(func) / 2**20:.1f} MiB')
+    common.report(
+        {
+            name: common.measure(func, args.repeat)
+            for name, func in cases.items()
+        },
+        baseline='send whole',
+    )
+    common.report(
+        {
+            'receive whole': common.measure(receive_whole, args.repeat),
+            'receive stream': common.measure(receive_stream, args.repeat),
+        },
+        baseline='receive whole',
+    )
+
+
+if __name__ == '__main__':
+    main()
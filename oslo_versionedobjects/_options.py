@@ -14,6 +14,7 @@ import copy
 
 from oslo_config import cfg
 
+from oslo_versionedobjects import base
 from oslo_versionedobjects import exception
 
 
@@ -33,4 +34,9 @@ def list_opts() -> list[tuple[str, list[cfg.Opt]]]:
 
     :returns: a list of (group_name, opts) tuples
     """
-    return [('oslo_versionedobjects', copy.deepcopy(exception.exc_log_opts))]
+    return [
+        (
+            'oslo_versionedobjects',
+            copy.deepcopy(exception.exc_log_opts + base.serializer_opts),
+        )
+    ]
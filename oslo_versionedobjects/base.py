@@ -17,33 +17,52 @@
 from __future__ import annotations
 
 import abc
+import base64
 import collections
 from collections.abc import (
     Callable,
+    Iterable,
     Iterator,
     MutableMapping,
+    MutableSet,
     Mapping,
     Sequence,
 )
+import contextlib
+import contextvars
 import copy
+import datetime
 import functools
+import hashlib
+import importlib
+from importlib import metadata as importlib_metadata
+import inspect
+import json
 import logging
+from reprlib import recursive_repr
+import struct
+import types
 from typing import (
     Any,
     cast,
     Concatenate,
+    NamedTuple,
     overload,
     ParamSpec,
     TypeVar,
     TYPE_CHECKING,
 )
 import warnings
+import weakref
+import zlib
 
+from oslo_config import cfg
 import oslo_messaging as messaging
 from oslo_utils import excutils
 from oslo_utils import versionutils as vutils
 
 from oslo_versionedobjects._i18n import _
+from oslo_versionedobjects import codec as obj_codec
 from oslo_versionedobjects import exception
 from oslo_versionedobjects import fields as obj_fields
 
@@ -52,18 +71,342 @@ if TYPE_CHECKING:
 
 LOG = logging.getLogger('object')
 
+serializer_opts: list[cfg.Opt] = [
+    cfg.IntOpt(
+        'compression_threshold',
+        default=16384,
+        min=0,
+        help='Size in bytes from which the objects sent by serializers '
+        'with a compressor are compressed',
+    ),
+    cfg.IntOpt(
+        'max_decompressed_size',
+        default=16777216,
+        min=0,
+        help='Size in bytes of the largest object serializers decompress '
+        'from the objects they receive',
+    ),
+]
+
+CONF: cfg.ConfigOpts = cfg.CONF
+CONF.register_opts(serializer_opts, group='oslo_versionedobjects')
+
 _VO = TypeVar('_VO', bound='VersionedObject')
 
+# Projection paths grouped by the field name they start with
+_ProjectionPaths = dict[str, list[str] | None]
+
 
 class _NotSpecifiedSentinel:
     pass
 
 
+class _UnsetFieldSentinel:
+    """Marks an unset field in the value list of a slot-backed object."""
+
+    pass
+
+
 def _get_attrname(name: str) -> str:
     """Return the mangled name of the attribute's underlying storage."""
     return '_obj_' + name
 
 
+def _make_slot_property(
+    owner: type[VersionedObject],
+    name: str,
+    field: obj_fields.Field[Any],
+    index: int,
+    checked: bool,
+) -> property:
+    """Build the property for a field of a slot-backed object.
+
+    Field values live in the ``_obj_values`` list of the instance, at the
+    position assigned to the field when the class was registered. Unset
+    fields hold :class:`_UnsetFieldSentinel`. See
+    :func:`_make_dict_property` for the checked property.
+    """
+    # Slots and changed field bits are both assigned in field order
+    bit = 1 << index
+
+    def getter(self: VersionedObject) -> Any:
+        value = self._obj_values[index]
+        if value is _UnsetFieldSentinel:
+            self.obj_load_attr(name)
+            value = self._obj_values[index]
+            if value is _UnsetFieldSentinel:
+                raise AttributeError(f"No such attribute `{name}'")
+        return value
+
+    def setter(self: VersionedObject, value: Any) -> None:
+        field_value = field.coerce(self, name, value)
+        if field.read_only:
+            current = self._obj_values[index]
+            if current is not _UnsetFieldSentinel:
+                if current != field_value:
+                    raise exception.ReadOnlyFieldError(field=name)
+                else:
+                    return
+
+        if type(self) is owner and not self._obj_owners:
+            # Nothing holds this object, so there is nobody to notify
+            self._obj_changed_mask |= bit
+        elif not (self._obj_changed_mask & bit and type(self) is owner):
+            self._obj_mark_changed(name)
+        self._obj_values[index] = field_value
+
+    def deleter(self: VersionedObject) -> None:
+        if self._obj_values[index] is _UnsetFieldSentinel:
+            raise AttributeError(f"No such attribute `{name}'")
+        self._obj_values[index] = _UnsetFieldSentinel
+
+    if not checked:
+        return property(getter, setter, deleter)
+
+    def checked_getter(self: VersionedObject) -> Any:
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow[name].reader = weakref.ref(self)
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_hydrate(name)
+        return getter(self)
+
+    def checked_setter(self: VersionedObject, value: Any) -> None:
+        field_value = field.coerce(self, name, value)
+        self._obj_cow_before_write()
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_undefer(name)
+        if field.read_only:
+            current = self._obj_values[index]
+            if current is not _UnsetFieldSentinel:
+                if current != field_value:
+                    raise exception.ReadOnlyFieldError(field=name)
+                else:
+                    return
+
+        if not (self._obj_changed_mask & bit and type(self) is owner):
+            self._obj_mark_changed(name)
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow_release(name)
+        self._obj_values[index] = field_value
+
+    def checked_deleter(self: VersionedObject) -> None:
+        self._obj_cow_before_write()
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_drop_deferred(name)
+            return
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow_release(name)
+        deleter(self)
+
+    return property(checked_getter, checked_setter, checked_deleter)
+
+
+def _make_dict_property(
+    owner: type[VersionedObject],
+    name: str,
+    field: obj_fields.Field[Any],
+    attrname: str,
+    bit: int,
+    checked: bool,
+) -> property:
+    """Build the property for a field of an object.
+
+    Field values live in an attribute of the instance named by
+    :func:`_get_attrname`, which is missing while the field is unset.
+
+    Properties are checked when some objects of the class may have fields
+    which are deferred or shared with copy-on-write clones. The checks are
+    only made for classes which need them, so that objects which use
+    neither feature do not pay for them on each access.
+    """
+
+    def getter(self: VersionedObject) -> Any:
+        if not hasattr(self, attrname):
+            self.obj_load_attr(name)
+        return getattr(self, attrname)
+
+    def setter(self: VersionedObject, value: Any) -> None:
+        field_value = field.coerce(self, name, value)
+        if field.read_only and hasattr(self, attrname):
+            # Note(yjiang5): _from_db_object() may iterate
+            # every field and write, no exception in such situation.
+            if getattr(self, attrname) != field_value:
+                raise exception.ReadOnlyFieldError(field=name)
+            else:
+                return
+
+        if type(self) is owner and not self._obj_owners:
+            # Nothing holds this object, so there is nobody to notify
+            self._obj_changed_mask |= bit
+        elif not (self._obj_changed_mask & bit and type(self) is owner):
+            self._obj_mark_changed(name)
+        try:
+            setattr(self, attrname, field_value)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                attr = f"{self.obj_name()}.{name}"
+                LOG.exception('Error setting %(attr)s', {'attr': attr})
+
+    def deleter(self: VersionedObject) -> None:
+        if not hasattr(self, attrname):
+            raise AttributeError(f"No such attribute `{name}'")
+        delattr(self, attrname)
+
+    if not checked:
+        return property(getter, setter, deleter)
+
+    def checked_getter(self: VersionedObject) -> Any:
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow[name].reader = weakref.ref(self)
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_hydrate(name)
+        return getter(self)
+
+    def checked_setter(self: VersionedObject, value: Any) -> None:
+        field_value = field.coerce(self, name, value)
+        self._obj_cow_before_write()
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_undefer(name)
+        if field.read_only and hasattr(self, attrname):
+            if getattr(self, attrname) != field_value:
+                raise exception.ReadOnlyFieldError(field=name)
+            else:
+                return
+
+        if not (self._obj_changed_mask & bit and type(self) is owner):
+            self._obj_mark_changed(name)
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow_release(name)
+        try:
+            setattr(self, attrname, field_value)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                attr = f"{self.obj_name()}.{name}"
+                LOG.exception('Error setting %(attr)s', {'attr': attr})
+
+    def checked_deleter(self: VersionedObject) -> None:
+        self._obj_cow_before_write()
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_drop_deferred(name)
+            return
+        if self._obj_cow and name in self._obj_cow:
+            self._obj_cow_release(name)
+        deleter(self)
+
+    return property(checked_getter, checked_setter, checked_deleter)
+
+
+class _FieldIndex(NamedTuple):
+    """Immutable index of the field names of an object class.
+
+    This is computed once per class, when its properties are made, so that
+    field name membership tests and iteration do not need to build lists
+    from ``fields`` and ``obj_extra_fields`` on every call.
+    """
+
+    # The class this index was computed for
+    owner: type[VersionedObject]
+    # Names of fields followed by obj_extra_fields, in declaration order
+    names: tuple[str, ...]
+    name_set: frozenset[str]
+    extra_names: frozenset[str]
+    # Mapping of each name to the attribute holding its value
+    attrnames: Mapping[str, str]
+    # Mapping of each field name to its bit in the changed fields mask
+    bits: Mapping[str, int]
+    # Whether changes are tracked by the base class implementation, rather
+    # than by an overridden obj_what_changed() or obj_reset_changes()
+    tracks_changes: bool
+
+
+def _make_field_index(cls: type[VersionedObject]) -> _FieldIndex:
+    names = tuple(cls.fields) + tuple(
+        name for name in cls.obj_extra_fields if name not in cls.fields
+    )
+    return _FieldIndex(
+        owner=cls,
+        names=names,
+        name_set=frozenset(names),
+        extra_names=frozenset(cls.obj_extra_fields),
+        attrnames=types.MappingProxyType(
+            {name: _get_attrname(name) for name in names}
+        ),
+        bits=types.MappingProxyType(
+            {name: 1 << i for i, name in enumerate(cls.fields)}
+        ),
+        tracks_changes=(
+            cls.obj_what_changed
+            in (
+                VersionedObject.obj_what_changed,
+                ObjectListBase.obj_what_changed,
+            )
+            and cls.obj_reset_changes is VersionedObject.obj_reset_changes
+        ),
+    )
+
+
+class _ChangedFields(MutableSet[str]):
+    """Set of the changed fields of an object.
+
+    This is a view of the changed fields mask of an object, which holds a
+    bit per field of the object class. Names which are not fields of the
+    class are kept in a separate set.
+    """
+
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj: VersionedObject) -> None:
+        self._obj = obj
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        obj = self._obj
+        bit = obj._obj_get_field_index().bits.get(name)
+        if bit is not None:
+            return bool(obj._obj_changed_mask & bit)
+        return name in obj._obj_changed_extra
+
+    def __iter__(self) -> Iterator[str]:
+        obj = self._obj
+        mask = obj._obj_changed_mask
+        if mask:
+            for name, bit in obj._obj_get_field_index().bits.items():
+                if mask & bit:
+                    yield name
+        yield from obj._obj_changed_extra
+
+    def __len__(self) -> int:
+        obj = self._obj
+        return bin(obj._obj_changed_mask).count('1') + len(
+            obj._obj_changed_extra
+        )
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+    def add(self, name: str) -> None:
+        self._obj._obj_mark_changed(name)
+
+    def discard(self, name: str) -> None:
+        obj = self._obj
+        bit = obj._obj_get_field_index().bits.get(name)
+        if bit is not None:
+            obj._obj_changed_mask &= ~bit
+        elif name in obj._obj_changed_extra:
+            obj._obj_changed_extra = obj._obj_changed_extra - {name}
+
+    def clear(self) -> None:
+        self._obj._obj_changed_mask = 0
+        if self._obj._obj_changed_extra:
+            self._obj._obj_changed_extra = frozenset()
+
+    def update(self, *others: Iterable[str]) -> None:
+        for names in others:
+            for name in names:
+                self.add(name)
+
+
 def _make_class_properties(cls: type[VersionedObject]) -> None:
     # NOTE(danms/comstud): Inherit fields from super classes.
     # mro() returns the current class first and returns 'object' last, so
@@ -77,54 +420,1664 @@ def _make_class_properties(cls: type[VersionedObject]) -> None:
         for name, field in supercls.fields.items():
             if name not in cls.fields:
                 cls.fields[name] = field
+    if cls.OBJ_SLOT_STORAGE:
+        cls._obj_slots = {name: i for i, name in enumerate(cls.fields)}
+    else:
+        cls._obj_slots = None
+    cls._obj_field_index = _make_field_index(cls)
     for name, field in cls.fields.items():
         if not isinstance(field, obj_fields.Field):
             raise exception.ObjectFieldInvalid(
                 field=name, objname=cls.obj_name()
             )
+    if cls.OBJ_LAZY_HYDRATION:
+        cls._obj_checked_access = True
+    _make_field_properties(cls)
 
-        def getter(self: VersionedObject, name: str = name) -> Any:
-            attrname = _get_attrname(name)
-            if not hasattr(self, attrname):
-                self.obj_load_attr(name)
-            return getattr(self, attrname)
-
-        def setter(
-            self: VersionedObject,
-            value: Any,
-            name: str = name,
-            field: obj_fields.Field[Any] = field,
-        ) -> None:
-            attrname = _get_attrname(name)
-            field_value = field.coerce(self, name, value)
-            if field.read_only and hasattr(self, attrname):
-                # Note(yjiang5): _from_db_object() may iterate
-                # every field and write, no exception in such situation.
-                if getattr(self, attrname) != field_value:
-                    raise exception.ReadOnlyFieldError(field=name)
-                else:
+
+def _make_field_properties(cls: type[VersionedObject]) -> None:
+    """Set the properties of the fields of a registered class."""
+    index = cls._obj_field_index
+    assert index is not None
+    checked = cls._obj_checked_access
+    for name, field in cls.fields.items():
+        if cls._obj_slots is not None:
+            prop = _make_slot_property(
+                cls, name, field, cls._obj_slots[name], checked
+            )
+        else:
+            prop = _make_dict_property(
+                cls,
+                name,
+                field,
+                index.attrnames[name],
+                index.bits[name],
+                checked,
+            )
+        setattr(cls, name, prop)
+
+
+def _check_field_access(cls: type[VersionedObject]) -> None:
+    """Make the field properties of cls check each access.
+
+    This is done before an object of the class defers fields or shares
+    them with copy-on-write clones. The properties are replaced for the
+    class they were made for and for all of its subclasses.
+    """
+    if cls._obj_checked_access:
+        return
+    for owner in cls.__mro__:
+        if '_obj_field_index' in vars(owner):
+            break
+    else:
+        return
+    cast(type[VersionedObject], owner)._obj_checked_access = True
+    classes = [owner]
+    while classes:
+        subcls = classes.pop()
+        classes.extend(subcls.__subclasses__())
+        if '_obj_field_index' in vars(subcls):
+            _make_field_properties(subcls)
+
+
+def _primitive_has_changes(obj: VersionedObject, value: Any) -> bool:
+    """Return whether value is the primitive of an object with changes."""
+    return isinstance(value, dict) and bool(
+        value.get(obj._obj_primitive_key('changes'))
+    )
+
+
+def _split_projection_paths(paths: Iterable[str]) -> _ProjectionPaths:
+    """Group dotted field paths by the field name they start with.
+
+    Fields named without anything below them map to None, otherwise to the
+    list of the remaining paths.
+    """
+    split: _ProjectionPaths = {}
+    for path in paths:
+        name, sep, rest = path.partition('.')
+        if not rest:
+            split[name] = None
+        else:
+            subpaths = split.setdefault(name, [])
+            if subpaths is not None:
+                subpaths.append(rest)
+    return split
+
+
+def _project_primitive(
+    obj: VersionedObject,
+    name: str,
+    value: Any,
+    fields: list[str] | None,
+    exclude: list[str] | None,
+) -> Any:
+    """Return the primitive of a field with a projection of its objects."""
+    field = obj.fields[name]
+    field_type = field._type
+    if value is not None:
+        if isinstance(field_type, obj_fields.Object):
+            return value.obj_to_primitive(fields=fields, exclude=exclude)
+        if isinstance(field_type, obj_fields.List) and isinstance(
+            field_type._element_type._type, obj_fields.Object
+        ):
+            return [
+                element.obj_to_primitive(fields=fields, exclude=exclude)
+                for element in value
+            ]
+    # NOTE: Paths below fields which don't hold objects select nothing more
+    return field.to_primitive(obj, name, value)
+
+
+# Types of field values which can't be modified in place, so copies of an
+# object can always share them
+_IMMUTABLE_TYPES = frozenset(
+    [str, int, float, bool, bytes, type(None), datetime.datetime]
+)
+
+
+class _CowShare:
+    """A field value shared by an object and its copy-on-write clones.
+
+    Every object sharing the value keeps this in its ``_obj_cow`` mapping,
+    and the value itself (a coerced collection) refers back to it. Reading
+    the field returns the shared value. The other objects get their own
+    copy before it is modified in place, or before an object held in it is
+    modified, while one object keeps the value: the one which last read
+    the field, as the change is most likely made through the reference it
+    was given, or else the object the value was coerced for, whose
+    references to it may have been handed out before it was cloned.
+    """
+
+    __slots__ = ('name', 'value', 'refs', 'reader', 'objects', '__weakref__')
+
+    def __init__(
+        self,
+        name: str,
+        value: obj_fields.CoercedCollectionMixin[Any],
+        source: VersionedObject,
+    ) -> None:
+        self.name = name
+        self.value = value
+        self.refs: list[weakref.ref[VersionedObject]] = [weakref.ref(source)]
+        self.reader: weakref.ref[VersionedObject] | None = None
+        # Identities of the objects held in the value, once looked up
+        self.objects: frozenset[int] | None = None
+        value._cow_share = self
+        if _holds_objects(source.fields[name]):
+            _cow_object_shares.add(self)
+
+    def holders(self) -> list[VersionedObject]:
+        holders = []
+        for ref in self.refs:
+            obj = ref()
+            if obj is not None and obj._obj_cow is not None:
+                if obj._obj_cow.get(self.name) is self:
+                    holders.append(obj)
+        return holders
+
+    def holds(self, obj: VersionedObject) -> bool:
+        """Return whether obj is one of the objects held in the value."""
+        if self.objects is None:
+            self.objects = frozenset(map(id, _iter_objects(self.value)))
+        return id(obj) in self.objects
+
+    def _keeper(
+        self, holders: list[VersionedObject]
+    ) -> VersionedObject | None:
+        reader = self.reader() if self.reader is not None else None
+        for obj in (reader, self.value._obj):
+            if obj is not None and any(obj is other for other in holders):
+                return obj
+        return None
+
+    def _end(self) -> None:
+        self.value._cow_share = None
+        self.refs = []
+        self.reader = None
+        _cow_object_shares.discard(self)
+
+    def before_write(self) -> None:
+        """Give every object but the one keeping the value its own copy."""
+        holders = self.holders()
+        keeper = self._keeper(holders)
+        for obj in holders:
+            del obj._obj_cow[self.name]  # type: ignore[union-attr]
+        self._end()
+        for obj in holders:
+            if obj is not keeper:
+                obj._obj_set_value(
+                    self.name, _copy_cow_value(obj, self.name, self.value)
+                )
+        if keeper is not None:
+            _take_cow_value(keeper, self.name, self.value)
+
+    def release(self, obj: VersionedObject) -> None:
+        """Stop sharing the value with obj."""
+        del obj._obj_cow[self.name]  # type: ignore[union-attr]
+        self.refs = [ref for ref in self.refs if ref() is not obj]
+        holders = self.holders()
+        if len(holders) < 2:
+            for other in holders:
+                del other._obj_cow[self.name]  # type: ignore[union-attr]
+                _take_cow_value(other, self.name, self.value)
+            self._end()
+        elif self.value._obj is obj:
+            # NOTE: Objects held in the value find it through the object
+            # they were coerced for, so that must be one still sharing it
+            _take_cow_value(holders[0], self.name, self.value)
+
+
+# Shares of collections holding objects, which the objects below them look
+# for before they are modified
+_cow_object_shares: weakref.WeakSet[_CowShare] = weakref.WeakSet()
+
+# Classes whose objects may be held in a collection shared with a
+# copy-on-write clone, or be below such an object
+_cow_checked_classes: weakref.WeakSet[type[VersionedObject]] = (
+    weakref.WeakSet()
+)
+
+
+def _check_object_access(field: obj_fields.Field[Any]) -> None:
+    """Check field access for the objects which may be held by field.
+
+    This is done before a value of the field is shared with copy-on-write
+    clones, for the classes of the objects it may hold and of the objects
+    below them.
+    """
+    registered = VersionedObjectRegistry()._obj_classes
+    names = list(_object_names(field))
+    while names:
+        classes = list(registered.get(names.pop(), ()))
+        while classes:
+            cls = classes.pop()
+            if cls in _cow_checked_classes:
+                continue
+            _cow_checked_classes.add(cls)
+            _check_field_access(cls)
+            classes.extend(cls.__subclasses__())
+            for subfield in cls.fields.values():
+                names.extend(_object_names(subfield))
+
+
+def _iter_objects(value: Any) -> Iterator[VersionedObject]:
+    """Yield the objects held in a collection and the ones it holds."""
+    values = [value]
+    while values:
+        value = values.pop()
+        if isinstance(value, VersionedObject):
+            yield value
+        elif isinstance(value, dict):
+            values.extend(value.values())
+        elif isinstance(value, (list, set, tuple)):
+            values.extend(value)
+
+
+def _copy_cow_value(
+    obj: VersionedObject,
+    name: str,
+    value: obj_fields.CoercedCollectionMixin[Any],
+) -> Any:
+    """Copy a shared collection for the field name of obj."""
+    plain: Any
+    if isinstance(value, dict):
+        plain = dict(value)
+    elif isinstance(value, set):
+        plain = set(value)
+    else:
+        plain = list(cast(list[Any], value))
+    memo = {id(value._obj): obj}
+    return obj.fields[name].coerce(obj, name, _cow_clone_value(plain, memo))
+
+
+def _cow_clone_value(value: Any, memo: dict[int, Any]) -> Any:
+    """Clone the objects in value, copying the collections holding them."""
+    if isinstance(value, VersionedObject):
+        if id(value) not in memo:
+            return value._obj_cow_clone(memo)
+        return memo[id(value)]
+    if isinstance(value, dict):
+        return {k: _cow_clone_value(v, memo) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_cow_clone_value(v, memo) for v in value]
+    return copy.deepcopy(value, memo)
+
+
+def _take_cow_value(
+    obj: VersionedObject,
+    name: str,
+    value: obj_fields.CoercedCollectionMixin[Any],
+) -> None:
+    """Make obj the owner of a collection it shared."""
+    if value._obj is obj:
+        return
+    if value._element_type is not None:
+        value.enable_coercing(value._element_type, obj, name)
+    if value._cow_share is not None:
+        # The objects in the value must know they may be shared
+        for child in _iter_objects(value):
+            obj._obj_adopt_child(child)
+    else:
+        # Sub-objects in the collection are adopted on the next change scan
+        obj._obj_mark_child_dirty()
+
+
+class _PrimitiveCodec(NamedTuple):
+    """Serializer and deserializer generated for an object class.
+
+    Either function is None when the class customizes that direction of
+    the conversion, in which case the generic code path is used.
+    """
+
+    # The class these functions were generated for
+    owner: type[VersionedObject]
+    to_primitive: Callable[[VersionedObject], dict[str, Any]] | None
+    # Same as to_primitive, but serializing fields with to_native()
+    to_native: Callable[[VersionedObject], dict[str, Any]] | None
+    from_primitive: (
+        Callable[
+            [type[VersionedObject], Any, str, dict[str, Any]],
+            VersionedObject,
+        ]
+        | None
+    )
+
+
+# Field type coerce() implementations which return a value of the given
+# type unchanged, so deserialized values of exactly that type can be stored
+# directly
+_TRIVIAL_COERCE_TYPES: dict[Callable[..., Any], type] = {
+    obj_fields.String.coerce: str,
+    obj_fields.Integer.coerce: int,
+    obj_fields.Float.coerce: float,
+    obj_fields.Boolean.coerce: bool,
+}
+
+
+def _is_overridden(cls: type[VersionedObject], name: str) -> bool:
+    """Return whether cls replaces the VersionedObject implementation."""
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return klass is not VersionedObject
+    return False
+
+
+# Set while hydrating primitives which are trusted to have been made by
+# obj_to_primitive(), so that nested objects are hydrated the same way
+_trusted_hydration: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'oslo_versionedobjects_trusted_hydration', default=False
+)
+
+
+@contextlib.contextmanager
+def _trust_primitives(trusted: bool) -> Iterator[None]:
+    if not trusted or _trusted_hydration.get():
+        yield
+        return
+    token = _trusted_hydration.set(True)
+    try:
+        yield
+    finally:
+        _trusted_hydration.reset(token)
+
+
+# Set while making a primitive whose repeated sub-objects are shared, to map
+# the id of each object dehydrated to the object and its primitive
+_shared_primitives: contextvars.ContextVar[
+    dict[int, tuple[VersionedObject, dict[str, Any]]] | None
+] = contextvars.ContextVar('oslo_versionedobjects_shared', default=None)
+
+# Set while making a primitive for a codec encoding native values, so that
+# fields are serialized with to_native() rather than to_primitive()
+_native_primitives: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'oslo_versionedobjects_native_primitives', default=False
+)
+
+
+@contextlib.contextmanager
+def _native_values(native: bool) -> Iterator[None]:
+    if _native_primitives.get() == native:
+        yield
+        return
+    token = _native_primitives.set(native)
+    try:
+        yield
+    finally:
+        _native_primitives.reset(token)
+
+
+def _json_shallow_value(value: Any) -> Any:
+    """Return the primitive of a value holding objects, without theirs.
+
+    The objects are left in it as they are, for the JSON encoder to pass
+    them to _json_default() in turn.
+    """
+    if isinstance(value, dict):
+        return {key: _json_shallow_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_json_shallow_value(item) for item in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Return the primitive of an object reached by obj_to_json().
+
+    This is the primitive obj_to_primitive() returns, but with the
+    sub-objects left in it, so that the primitive of each is only made when
+    the JSON encoder reaches it.
+    """
+    if not isinstance(value, VersionedObject):
+        raise TypeError(
+            f'Object of type {type(value).__name__} is not JSON serializable'
+        )
+    if value._obj_shallow_owner is not type(value):
+        # NOTE: The sub-objects of objects which override obj_to_primitive()
+        # are dehydrated with them, as the override may expect their
+        # primitives
+        return value.obj_to_primitive()
+    primitive: dict[str, Any] = {}
+    lazy = value._obj_lazy
+    for name, field in value.fields.items():
+        if lazy and name in lazy:
+            primitive[name] = lazy[name]
+        elif value.obj_attr_is_set(name):
+            field_value = value._obj_get_value(name)
+            if _holds_objects(field):
+                primitive[name] = _json_shallow_value(field_value)
+            else:
+                primitive[name] = field.to_primitive(value, name, field_value)
+    obj = {
+        value._obj_primitive_key('name'): value.obj_name(),
+        value._obj_primitive_key('namespace'): value.OBJ_PROJECT_NAMESPACE,
+        value._obj_primitive_key('version'): value.VERSION,
+        value._obj_primitive_key('data'): primitive,
+    }
+    changes = [name for name in value.obj_what_changed() if name in primitive]
+    if changes:
+        obj[value._obj_primitive_key('changes')] = changes
+    return obj
+
+
+class _JSONFallback(Exception):
+    """Raised when obj_from_json() must hydrate the whole primitive."""
+
+
+def _object_names(field: obj_fields.Field[Any]) -> Iterator[str]:
+    """Yield the names of the objects the values of field may hold."""
+    field_type = field._type
+    if isinstance(field_type, obj_fields.CompoundFieldType):
+        yield from _object_names(field_type._element_type)
+    elif isinstance(field_type, obj_fields.Object):
+        yield field_type._obj_name
+
+
+def _holds_objects(field: obj_fields.Field[Any]) -> bool:
+    """Return whether the values of field are or contain objects."""
+    field_type = field._type
+    if isinstance(field_type, obj_fields.CompoundFieldType):
+        return _holds_objects(field_type._element_type)
+    return isinstance(field_type, obj_fields.Object)
+
+
+def _count_objects(value: Any) -> int:
+    """Return the number of objects value is or directly contains."""
+    if isinstance(value, VersionedObject):
+        return 1
+    if type(value) is dict:
+        value = value.values()
+    elif type(value) is not list:
+        return 0
+    return sum(isinstance(item, VersionedObject) for item in value)
+
+
+# Set while hydrating primitives whose field values can't be kept as deferred
+# field primitives, as they hold shared object instances or compact
+# primitives which obj_to_primitive() would return as they are
+_eager_hydration: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'oslo_versionedobjects_eager_hydration', default=False
+)
+
+
+@contextlib.contextmanager
+def _hydrate_eagerly() -> Iterator[None]:
+    if _eager_hydration.get():
+        yield
+        return
+    token = _eager_hydration.set(True)
+    try:
+        yield
+    finally:
+        _eager_hydration.reset(token)
+
+
+def _share_primitives(
+    primitive: dict[str, Any],
+    name_key: str,
+    ref_key: str,
+    by_content: bool,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Move the repeated object primitives below primitive to a table.
+
+    Object primitives are the same if they are the same dict, or if they
+    have the same contents when by_content is set. Each one found more
+    than once is replaced by a reference to its index in the table. The
+    containers holding them are copied rather than modified, as they may
+    be held by objects with deferred fields.
+
+    :returns: The new primitive, and the table
+    """
+    content_keys: dict[int, str] = {}
+
+    def get_key(value: dict[str, Any]) -> int | str:
+        if not by_content:
+            return id(value)
+        key = content_keys.get(id(value))
+        if key is None:
+            key = content_keys[id(value)] = repr(value)
+        return key
+
+    counts: dict[int | str, int] = {}
+
+    def count(value: Any) -> None:
+        if isinstance(value, dict):
+            if name_key in value and value is not primitive:
+                key = get_key(value)
+                counts[key] = counts.get(key, 0) + 1
+                if counts[key] > 1:
                     return
+            for item in value.values():
+                count(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                count(item)
+
+    refs: dict[int | str, int] = {}
+    table: list[dict[str, Any]] = []
+
+    def share(value: Any) -> Any:
+        if isinstance(value, dict):
+            if name_key in value and value is not primitive:
+                key = get_key(value)
+                if counts[key] > 1:
+                    index = refs.get(key)
+                    if index is None:
+                        entry = share_items(value)
+                        index = refs[key] = len(table)
+                        table.append(entry)
+                    return {ref_key: index}
+            return share_items(value)
+        elif isinstance(value, (list, tuple)):
+            items = [share(item) for item in value]
+            if any(new is not old for new, old in zip(items, value)):
+                return type(value)(items)
+        return value
+
+    def share_items(value: dict[str, Any]) -> dict[str, Any]:
+        copy = None
+        for name, item in value.items():
+            new = share(item)
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[name] = new
+        return value if copy is None else copy
+
+    count(primitive)
+    if all(n == 1 for n in counts.values()):
+        return primitive, table
+    return share_items(primitive), table
+
+
+# Suffixes of the keys of the compact primitive envelope, by the name of the
+# full key
+_COMPACT_KEYS = {
+    'name': '~n',
+    'namespace': '~s',
+    'version': '~v',
+    'data': '~d',
+    'changes': '~c',
+    'shared': '~t',
+    'ref': '~r',
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _compact_keys(serial_namespace: str) -> dict[str, str]:
+    """Return the keys of the compact envelope of a namespace, by name."""
+    return {
+        name: f'{serial_namespace}.{suffix}'
+        for name, suffix in _COMPACT_KEYS.items()
+    }
 
-            self._changed_fields.add(name)
-            try:
-                setattr(self, attrname, field_value)
-            except Exception:
-                with excutils.save_and_reraise_exception():
-                    attr = f"{self.obj_name()}.{name}"
-                    LOG.exception('Error setting %(attr)s', {'attr': attr})
-
-        def deleter(self: VersionedObject, name: str = name) -> None:
-            attrname = _get_attrname(name)
-            if not hasattr(self, attrname):
-                raise AttributeError(f"No such attribute `{name}'")
-            delattr(self, attrname)
 
-        setattr(cls, name, property(getter, setter, deleter))
+def _is_compact_primitive(
+    value: dict[str, Any], serial_namespace: str
+) -> bool:
+    """Return whether value is a compact primitive of the given namespace.
+
+    Dicts which only have some of the keys of the envelope are not.
+    """
+    keys = _compact_keys(serial_namespace)
+    return (
+        keys['name'] in value
+        and keys['version'] in value
+        and keys['data'] in value
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _envelope_keys(cls: type[VersionedObject]) -> dict[str, str]:
+    """Return the full keys of the primitives of cls, by name."""
+    return {name: cls._obj_primitive_key(name) for name in _COMPACT_KEYS}
+
+
+def _expand_primitive(
+    primitive: dict[str, Any],
+    keys: dict[str, str],
+    compact_keys: dict[str, str],
+    namespace: str,
+) -> dict[str, Any]:
+    """Return the full envelope of a compact primitive.
+
+    The primitives of sub-objects are left compact.
+
+    :param keys: Full keys of the primitives, by name
+    :param compact_keys: Compact keys of the primitives, by name
+    :param namespace: Project namespace of the object holding this one
+    """
+    expanded = {
+        keys['name']: primitive[compact_keys['name']],
+        keys['namespace']: primitive.get(compact_keys['namespace'], namespace),
+        keys['version']: primitive[compact_keys['version']],
+        keys['data']: primitive[compact_keys['data']],
+    }
+    for name in ('changes', 'shared'):
+        if compact_keys[name] in primitive:
+            expanded[keys[name]] = primitive[compact_keys[name]]
+    return expanded
+
+
+def _compact_primitive(
+    value: Any, serial_namespace: str, namespace: str | None
+) -> Any:
+    """Return value with its object primitives in the compact envelope.
+
+    :param serial_namespace: Serialization namespace of the primitives
+    :param namespace: Project namespace of the object holding value, which
+                      is left out of the objects of the same namespace
+    """
+    keys = {name: f'{serial_namespace}.{name}' for name in _COMPACT_KEYS}
+    return _compact_value(
+        value, keys, _compact_keys(serial_namespace), namespace
+    )
+
+
+def _compact_value(
+    value: Any,
+    keys: dict[str, str],
+    compact_keys: dict[str, str],
+    namespace: str | None,
+) -> Any:
+    if isinstance(value, dict):
+        if keys['name'] in value:
+            objns = value[keys['namespace']]
+            compact = {compact_keys['name']: value[keys['name']]}
+            if objns != namespace:
+                compact[compact_keys['namespace']] = objns
+            compact[compact_keys['version']] = value[keys['version']]
+            compact[compact_keys['data']] = _compact_value(
+                value[keys['data']], keys, compact_keys, objns
+            )
+            if keys['changes'] in value:
+                compact[compact_keys['changes']] = value[keys['changes']]
+            if keys['shared'] in value:
+                compact[compact_keys['shared']] = _compact_value(
+                    value[keys['shared']], keys, compact_keys, objns
+                )
+            return compact
+        if keys['ref'] in value:
+            return {compact_keys['ref']: value[keys['ref']]}
+        copy = None
+        for name, item in value.items():
+            new = _compact_value(item, keys, compact_keys, namespace)
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[name] = new
+        return value if copy is None else copy
+    elif isinstance(value, (list, tuple)):
+        items = [
+            _compact_value(item, keys, compact_keys, namespace)
+            for item in value
+        ]
+        if any(new is not old for new, old in zip(items, value)):
+            return type(value)(items)
+    return value
+
+
+def _resolve_shared(
+    value: Any, ref_key: str, resolve: Callable[[int], VersionedObject]
+) -> Any:
+    """Replace the references to shared objects below value.
+
+    The containers holding them are copied rather than modified.
+    """
+    if isinstance(value, dict):
+        if ref_key in value:
+            return resolve(value[ref_key])
+        copy = None
+        for name, item in value.items():
+            new = _resolve_shared(item, ref_key, resolve)
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[name] = new
+        return value if copy is None else copy
+    elif isinstance(value, (list, tuple)):
+        items = [_resolve_shared(item, ref_key, resolve) for item in value]
+        if any(new is not old for new, old in zip(items, value)):
+            return type(value)(items)
+    return value
+
+
+def _estimate_json_size(value: Any, limit: int) -> int:
+    """Estimate the size in bytes of the JSON text of a primitive.
+
+    This counts the strings and the separators of the containers, and a
+    fixed size for other values, so that it is cheaper than encoding the
+    primitive. The estimate stops growing once it reaches limit.
+    """
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type is str:
+            size += len(item) + 2
+        elif item_type is dict:
+            size += 2 + 4 * len(item) + sum(map(len, item))
+            stack.extend(item.values())
+        elif item_type is list or item_type is tuple:
+            size += 2 + 2 * len(item)
+            stack.extend(item)
+        else:
+            size += 8
+        if size >= limit:
+            break
+    return size
+
+
+class ObjectVersion(tuple[int, ...]):
+    """A parsed object version.
+
+    This compares as the tuple of the integers of the version, like
+    versionutils.convert_version_to_tuple() returns, and converts to the
+    version string it was parsed from. Use parse() to get the one shared
+    for a version string, rather than parsing it again.
+    """
+
+    _string: str
+
+    def __new__(cls, version: str) -> ObjectVersion:
+        self = super().__new__(cls, vutils.convert_version_to_tuple(version))
+        self._string = version
+        return self
+
+    def __str__(self) -> str:
+        return self._string
+
+    def __repr__(self) -> str:
+        return f'ObjectVersion({self._string!r})'
+
+    def __getnewargs__(self) -> tuple[str]:
+        return (self._string,)
+
+    @staticmethod
+    def parse(version: str) -> ObjectVersion:
+        """Return the ObjectVersion of a version string."""
+        return _parse_version(version)
+
+    def is_compatible(self, current: ObjectVersion) -> bool:
+        """Return whether the current version satisfies this one.
+
+        This is as versionutils.is_compatible() with same_major set.
+        """
+        return vutils.is_compatible(self._string, current._string)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_version(version: str) -> ObjectVersion:
+    return ObjectVersion(version)
+
+
+# Largest number of lookups kept by obj_class_from_name()
+_MAX_CLASS_LOOKUPS = 4096
+
+
+def _find_class(
+    objname: str, objver: str
+) -> type[VersionedObject] | Callable[[], exception.VersionedObjectsException]:
+    """Find the class of an object, or the function making the error."""
+    objclasses = _registered_classes(objname)
+    if not objclasses:
+        return functools.partial(_unsupported_object, objname)
+
+    # NOTE(comstud): If there's not an exact match, return the highest
+    # compatible version. The objects stored in the class are sorted
+    # such that highest version is first, so only set compatible_match
+    # once below.
+    compatible_match: type[VersionedObject] | None = None
+
+    for objclass in objclasses:
+        if objclass.VERSION == objver:
+            return objclass
+        if not compatible_match and ObjectVersion.parse(objver).is_compatible(
+            ObjectVersion.parse(objclass.VERSION)
+        ):
+            compatible_match = objclass
+
+    if compatible_match:
+        return compatible_match
+
+    # As mentioned above, latest version is always first in the list.
+    return functools.partial(
+        exception.IncompatibleObjectVersion,
+        objname=objname,
+        objver=objver,
+        supported=objclasses[0].VERSION,
+    )
+
+
+def _is_trivial_to_primitive(field: obj_fields.Field[Any]) -> bool:
+    return (
+        type(field).to_primitive is obj_fields.Field.to_primitive
+        and type(field._type).to_primitive is obj_fields.FieldType.to_primitive
+    )
+
+
+def _is_trivial_to_native(field: obj_fields.Field[Any]) -> bool:
+    return (
+        _is_trivial_to_primitive(field)
+        and _is_type_to_native(field)
+        and type(field._type).to_native
+        is obj_fields.AbstractFieldType.to_native
+    )
+
+
+def _is_type_to_native(field: obj_fields.Field[Any]) -> bool:
+    """Return whether field.to_native() only calls its type's."""
+    cls = type(field)
+    return (
+        cls.to_native is obj_fields.Field.to_native
+        and cls.to_primitive is obj_fields.Field.to_primitive
+        and cls.from_primitive is obj_fields.Field.from_primitive
+    )
+
+
+def _trivial_coerce_type(field: obj_fields.Field[Any]) -> type | None:
+    if type(field).coerce is not obj_fields.Field.coerce:
+        return None
+    return _TRIVIAL_COERCE_TYPES.get(type(field._type).coerce)
+
+
+def _trivial_from_primitive_type(
+    field: obj_fields.Field[Any],
+) -> type | None:
+    if (
+        field.read_only
+        or type(field).from_primitive is not obj_fields.Field.from_primitive
+        or type(field._type).from_primitive
+        is not obj_fields.FieldType.from_primitive
+    ):
+        return None
+    return _trivial_coerce_type(field)
+
+
+def _compile_codec_function(
+    cls: type[VersionedObject],
+    name: str,
+    lines: list[str],
+    env: dict[str, Any],
+) -> Any:
+    source = '\n'.join(lines)
+    filename = f'<oslo.versionedobjects {name} for {cls.obj_name()}>'
+    # NOTE: The source only embeds identifiers chosen here and repr() of
+    # field names and keys, never arbitrary data.
+    exec(compile(source, filename, 'exec'), env)  # noqa: S102
+    return env[name]
+
+
+def _make_to_primitive_function(
+    cls: type[VersionedObject],
+    method: str,
+    values: str,
+    storage: Callable[[str], str],
+    env: dict[str, Any],
+) -> Any:
+    """Generate the function dehydrating cls with method of the fields."""
+    native = method == 'to_native'
+    lines = [f'def {method}(self):', '    ' + values]
+    lines.append('    primitive = {}')
+    for i, (name, field) in enumerate(cls.fields.items()):
+        if cls._obj_slots is not None:
+            lines.append(f'    value = values[{storage(name)}]')
+        else:
+            lines.append(f'    value = values.get({storage(name)}, _unset)')
+        lines.append('    if value is not _unset:')
+        if native:
+            trivial = _is_trivial_to_native(field)
+            by_type = _is_type_to_native(field)
+        else:
+            trivial = _is_trivial_to_primitive(field)
+            by_type = type(field).to_primitive is obj_fields.Field.to_primitive
+        if trivial:
+            expr = 'value'
+        elif by_type:
+            env[f'type_{i}'] = field._type
+            expr = (
+                f'None if value is None else '
+                f'type_{i}.{method}(self, {name!r}, value)'
+            )
+        else:
+            env[f'field_{i}'] = field
+            expr = f'field_{i}.{method}(self, {name!r}, value)'
+        lines.append(f'        primitive[{name!r}] = {expr}')
+    name_key, ns_key, version_key, data_key, changes_key = (
+        repr(cls._obj_primitive_key(key))
+        for key in ('name', 'namespace', 'version', 'data', 'changes')
+    )
+    lines += [
+        '    obj = {',
+        f'        {name_key}: {cls.obj_name()!r},',
+        f'        {ns_key}: self.OBJ_PROJECT_NAMESPACE,',
+        f'        {version_key}: self.VERSION,',
+        f'        {data_key}: primitive,',
+        '    }',
+        '    changed = self.obj_what_changed()',
+        '    if changed:',
+        '        changes = [x for x in changed if x in primitive]',
+        '        if changes:',
+        f'            obj[{changes_key}] = changes',
+        '    return obj',
+    ]
+    return _compile_codec_function(cls, method, lines, env)
+
+
+def _make_primitive_codec(cls: type[VersionedObject]) -> _PrimitiveCodec:
+    """Generate straight-line primitive conversion functions for cls.
+
+    The generated functions produce exactly the same primitives as the
+    generic loops in :meth:`VersionedObject.obj_to_primitive` and
+    :meth:`VersionedObject._obj_from_primitive`, but unroll the loop over
+    the fields, use prebuilt keys and inline the conversion of fields
+    whose type passes values through unchanged.
+    """
+    slots = cls._obj_slots
+    env: dict[str, Any] = {'_unset': _UnsetFieldSentinel}
+    data_key, changes_key = (
+        repr(cls._obj_primitive_key(key)) for key in ('data', 'changes')
+    )
+    fields = list(cls.fields.items())
+
+    def storage(name: str) -> str:
+        if slots is not None:
+            return repr(slots[name])
+        return repr(_get_attrname(name))
+
+    if slots is not None:
+        values = 'values = self._obj_values'
+    else:
+        values = 'values = self.__dict__'
+
+    to_functions: dict[str, Any] = {'to_primitive': None, 'to_native': None}
+    if not any(
+        _is_overridden(cls, name)
+        for name in (
+            'obj_to_primitive',
+            'obj_make_compatible',
+            'obj_attr_is_set',
+            '_obj_primitive_key',
+        )
+    ):
+        for method in to_functions:
+            to_functions[method] = _make_to_primitive_function(
+                cls, method, values, storage, env
+            )
+
+    from_primitive = None
+    if not any(
+        _is_overridden(cls, name)
+        for name in (
+            '_obj_from_primitive',
+            '_obj_primitive_field',
+            '_obj_primitive_key',
+        )
+    ):
+        env['field_names'] = frozenset(cls.fields)
+        lines = [
+            'def from_primitive(cls, context, objver, primitive):',
+            '    self = cls()',
+            '    self._context = context',
+            '    self.VERSION = objver',
+            f'    objdata = primitive[{data_key}]',
+            '    ' + values,
+        ]
+        for i, (name, field) in enumerate(fields):
+            env[f'field_{i}'] = field
+            setter = (
+                f'values[{storage(name)}] = field_{i}.coerce(self, {name!r}, '
+                f'field_{i}.from_primitive(self, {name!r}, value))'
+            )
+            lines += [
+                f'    if {name!r} in objdata:',
+                f'        value = objdata[{name!r}]',
+            ]
+            value_type = _trivial_from_primitive_type(field)
+            if value_type is None:
+                lines.append(f'        {setter}')
+                continue
+            env[f'value_type_{i}'] = value_type
+            check = f'type(value) is value_type_{i}'
+            if field.nullable:
+                check = f'value is None or {check}'
+            lines += [
+                f'        if {check}:',
+                f'            values[{storage(name)}] = value',
+                '        else:',
+                f'            {setter}',
+            ]
+        lines += [
+            f'    changes = primitive.get({changes_key}, [])',
+            '    self._changed_fields = {',
+            '        x for x in changes if x in field_names',
+            '    }',
+            '    return self',
+        ]
+        from_primitive = _compile_codec_function(
+            cls, 'from_primitive', lines, env
+        )
+
+    return _PrimitiveCodec(
+        owner=cls,
+        to_primitive=to_functions['to_primitive'],
+        to_native=to_functions['to_native'],
+        from_primitive=from_primitive,
+    )
+
+
+class _DbMapper(NamedTuple):
+    """Function generated to build objects of a class from database rows."""
+
+    # The class this function was generated for
+    owner: type[VersionedObject]
+    from_db_rows: Callable[
+        [type[VersionedObject], Any, Iterable[Any]], list[VersionedObject]
+    ]
+
+
+def _make_db_mapper(cls: type[VersionedObject]) -> _DbMapper:
+    """Generate a function loading the columns of rows into objects of cls.
+
+    The loop over the columns is unrolled, and values which would be
+    returned unchanged by coercing them are stored directly. The objects
+    are built without marking their fields as changed.
+    """
+    assert cls.obj_db_columns is not None
+    slots = cls._obj_slots
+    env: dict[str, Any] = {}
+    if slots is not None:
+        values = 'values = self._obj_values'
+    else:
+        values = 'values = self.__dict__'
+    lines = [
+        'def from_db_rows(cls, context, rows):',
+        '    objects = []',
+        '    for row in rows:',
+        '        self = cls(context)',
+        '        ' + values,
+    ]
+    for i, (column, name) in enumerate(cls.obj_db_columns.items()):
+        field = cls.fields.get(name)
+        if field is None:
+            raise ValueError(
+                f'Column {column} of {cls.obj_name()} is mapped to unknown '
+                f'field {name}'
+            )
+        if slots is not None:
+            storage = repr(slots[name])
+        else:
+            storage = repr(_get_attrname(name))
+        env[f'field_{i}'] = field
+        value = f'row[{column!r}]'
+        if name in cls.obj_db_converters:
+            env[f'convert_{i}'] = cls.obj_db_converters[name]
+            value = f'convert_{i}({value})'
+        lines.append(f'        value = {value}')
+        coerce = f'values[{storage}] = field_{i}.coerce(self, {name!r}, value)'
+        value_type = _trivial_coerce_type(field)
+        if value_type is None:
+            lines.append(f'        {coerce}')
+            continue
+        env[f'value_type_{i}'] = value_type
+        check = f'type(value) is value_type_{i}'
+        if field.nullable:
+            check = f'value is None or {check}'
+        lines += [
+            f'        if {check}:',
+            f'            values[{storage}] = value',
+            '        else:',
+            f'            {coerce}',
+        ]
+    lines += [
+        '        objects.append(self)',
+        '    return objects',
+    ]
+    return _DbMapper(
+        owner=cls,
+        from_db_rows=_compile_codec_function(cls, 'from_db_rows', lines, env),
+    )
+
+
+class _BinaryLayout(NamedTuple):
+    """Binary encoding generated for an object class, for SchemaCodec."""
+
+    # The class this layout was generated for
+    owner: type[VersionedObject]
+    # Fingerprint of the class, as computed by ObjectVersionChecker
+    fingerprint: str
+    # Description of the layout sent before the objects of the class
+    header: bytes
+    # Called with an object, the list of bytes to append its fields to, and
+    # the functions writing a sub-object and any other value. Returns
+    # whether the object fits the layout, in which case nothing is written.
+    encode: Callable[
+        [
+            VersionedObject,
+            list[bytes],
+            Callable[[Any], None],
+            Callable[[Any], None],
+        ],
+        bool,
+    ]
+    # Called with the context, the bytes and offset of the fields, and the
+    # functions reading a sub-object and any other value. Returns the object
+    # and the offset following it.
+    decode: Callable[
+        [
+            Any,
+            bytes,
+            int,
+            Callable[[int], tuple[Any, int]],
+            Callable[[int], tuple[Any, int]],
+        ],
+        tuple[VersionedObject, int],
+    ]
+
+
+# Kinds of the binary layout fields of the field types which serialize
+# their values unchanged, with the exact type of those values
+_LAYOUT_KINDS: tuple[tuple[tuple[type, ...], str, type], ...] = (
+    (
+        (
+            obj_fields.String,
+            obj_fields.UUID,
+            obj_fields.MACAddress,
+            obj_fields.PCIAddress,
+        ),
+        obj_codec._KIND_STR,
+        str,
+    ),
+    (
+        (obj_fields.Integer, obj_fields.NonNegativeInteger),
+        obj_codec._KIND_INT,
+        int,
+    ),
+    (
+        (obj_fields.Float, obj_fields.NonNegativeFloat),
+        obj_codec._KIND_FLOAT,
+        float,
+    ),
+    ((obj_fields.Boolean,), obj_codec._KIND_BOOL, bool),
+)
+
+
+def _layout_kind(field: obj_fields.Field[Any]) -> tuple[str, type | None]:
+    """Return the layout kind of field, and the type of its values."""
+    if _is_trivial_to_native(field):
+        for field_types, kind, value_type in _LAYOUT_KINDS:
+            if isinstance(field._type, field_types):
+                return kind, value_type
+    if _is_type_to_native(field):
+        field_type = field._type
+        if type(field_type) is obj_fields.Object:
+            return obj_codec._KIND_OBJECT, None
+        if (
+            type(field_type) is obj_fields.List
+            and _is_type_to_native(field_type._element_type)
+            and type(field_type._element_type._type) is obj_fields.Object
+        ):
+            return obj_codec._KIND_OBJECTS, None
+    return obj_codec._KIND_VALUE, None
+
+
+def _make_binary_layout(cls: type[VersionedObject]) -> _BinaryLayout | None:
+    """Generate the functions encoding objects of cls to a fixed layout.
+
+    The fixed part of the layout is packed and unpacked with a single
+    struct, and the other fields follow it in their order. Values which do
+    not fit the layout, such as integers of more than 64 bits, make the
+    encoding function return False so that the primitive of the object is
+    encoded instead. None is returned for classes which customize their
+    primitives.
+    """
+    if any(
+        _is_overridden(cls, name)
+        for name in (
+            'obj_to_primitive',
+            'obj_from_primitive',
+            '_obj_from_primitive',
+            'obj_attr_is_set',
+            '_obj_primitive_key',
+            '_obj_primitive_field',
+        )
+    ):
+        return None
+    slots = cls._obj_slots
+    fields = list(cls.fields.items())
+    kinds = [_layout_kind(field) for _, field in fields]
+    head = obj_codec._layout_struct(''.join(kind for kind, _ in kinds))
+    fingerprint = _get_fingerprint(cls)
+    env: dict[str, Any] = {
+        '_unset': _UnsetFieldSentinel,
+        'cls': cls,
+        'head': head,
+        'length': obj_codec._LENGTH,
+        'struct_error': struct.error,
+        'trusted_hydration': _trusted_hydration,
+        'field_bits': {name: 1 << i for i, (name, _) in enumerate(fields)},
+    }
+
+    def storage(name: str) -> str:
+        if slots is not None:
+            return repr(slots[name])
+        return repr(_get_attrname(name))
+
+    if slots is not None:
+        values = 'values = self._obj_values'
+    else:
+        values = 'values = self.__dict__'
+    # NOTE: Bitmaps of more than 64 fields are packed as bytes
+    wide = len(fields) > 64
+    bitmap_size = (len(fields) + 7) // 8
+
+    def pack_bitmap(name: str) -> str:
+        if wide:
+            return f'{name}.to_bytes({bitmap_size}, "little")'
+        return name
+
+    encode = [
+        'def encode(self, out, write_record, write_value):',
+        f'    if self.VERSION != {cls.VERSION!r} or self._obj_lazy:',
+        '        return False',
+        '    ' + values,
+        '    present = 0',
+        '    nulls = 0',
+    ]
+    decode = [
+        'def decode(context, data, offset, read_record, read_value):',
+        '    self = cls()',
+        '    self._context = context',
+        '    ' + values,
+        '    trusted = trusted_hydration.get()',
+    ]
+    fixed = []
+    written = []
+    for i, ((name, field), (kind, value_type)) in enumerate(
+        zip(fields, kinds)
+    ):
+        bit = 1 << i
+        value = f'value_{i}'
+        env[f'field_{i}'] = field
+        if slots is not None:
+            encode.append(f'    {value} = values[{storage(name)}]')
+        else:
+            encode.append(f'    {value} = values.get({storage(name)}, _unset)')
+        if kind in obj_codec._FIXED_CODES:
+            env[f'value_type_{i}'] = value_type
+            fixed.append(value)
+            encode += [
+                f'    if {value} is _unset:',
+                f'        {value} = 0',
+                f'    elif {value} is None:',
+                f'        present |= {bit}',
+                f'        nulls |= {bit}',
+                f'        {value} = 0',
+                f'    elif type({value}) is value_type_{i}:',
+                f'        present |= {bit}',
+                '    else:',
+                '        return False',
+            ]
+        elif kind == obj_codec._KIND_VALUE:
+            encode += [
+                f'    if {value} is not _unset:',
+                f'        present |= {bit}',
+            ]
+        else:
+            encode += [
+                f'    if {value} is not _unset:',
+                f'        present |= {bit}',
+                f'        if {value} is None:',
+                f'            nulls |= {bit}',
+            ]
+            if kind == obj_codec._KIND_STR:
+                env[f'value_type_{i}'] = value_type
+                encode += [
+                    f'        elif type({value}) is not value_type_{i}:',
+                    '            return False',
+                ]
+
+        # Write the fields which are not in the fixed part
+        if kind == obj_codec._KIND_STR:
+            written += [
+                f'    if {value} is not _unset and {value} is not None:',
+                f"        data = {value}.encode('utf-8', 'surrogatepass')",
+                '        out.append(length.pack(len(data)))',
+                '        out.append(data)',
+            ]
+        elif kind == obj_codec._KIND_OBJECT:
+            written += [
+                f'    if {value} is not _unset and {value} is not None:',
+                f'        write_record({value})',
+            ]
+        elif kind == obj_codec._KIND_OBJECTS:
+            written += [
+                f'    if {value} is not _unset and {value} is not None:',
+                f'        out.append(length.pack(len({value})))',
+                f'        for item in {value}:',
+                '            write_record(item)',
+            ]
+        elif kind == obj_codec._KIND_VALUE:
+            if _is_trivial_to_native(field):
+                expr = value
+            elif _is_type_to_native(field):
+                env[f'type_{i}'] = field._type
+                expr = (
+                    f'None if {value} is None else '
+                    f'type_{i}.to_native(self, {name!r}, {value})'
+                )
+            else:
+                expr = f'field_{i}.to_native(self, {name!r}, {value})'
+            written += [
+                f'    if {value} is not _unset:',
+                f'        write_value({expr})',
+            ]
+
+        # Read the field
+        decode.append(f'    if present & {bit}:')
+        if kind in obj_codec._FIXED_CODES:
+            decode.append(
+                f'        value = None if nulls & {bit} else {value}'
+            )
+        elif kind == obj_codec._KIND_VALUE:
+            decode.append('        value, offset = read_value(offset)')
+        else:
+            decode += [
+                f'        if nulls & {bit}:',
+                '            value = None',
+            ]
+            if kind == obj_codec._KIND_STR:
+                decode += [
+                    '        else:',
+                    '            size = length.unpack_from(data, offset)[0]',
+                    '            offset += 4',
+                    '            value = data[offset : offset + size].decode(',
+                    "                'utf-8', 'surrogatepass'",
+                    '            )',
+                    '            offset += size',
+                ]
+            elif kind == obj_codec._KIND_OBJECT:
+                decode += [
+                    '        else:',
+                    '            value, offset = read_record(offset)',
+                ]
+            else:
+                decode += [
+                    '        else:',
+                    '            count = length.unpack_from(data, offset)[0]',
+                    '            offset += 4',
+                    '            value = []',
+                    '            for _ in range(count):',
+                    '                item, offset = read_record(offset)',
+                    '                value.append(item)',
+                ]
+        setter = (
+            f'setattr(self, {name!r}, '
+            f'field_{i}.from_primitive(self, {name!r}, value))'
+        )
+        if (
+            kind in obj_codec._FIXED_CODES or kind == obj_codec._KIND_STR
+        ) and _trivial_from_primitive_type(field) is not None:
+            if field.nullable:
+                decode.append(f'        values[{storage(name)}] = value')
+            else:
+                decode += [
+                    '        if value is None:',
+                    f'            {setter}',
+                    '        else:',
+                    f'            values[{storage(name)}] = value',
+                ]
+        else:
+            decode += [
+                '        if trusted:',
+                f'            value = field_{i}.from_primitive('
+                f'self, {name!r}, value)',
+                f'            values[{storage(name)}] = '
+                f'field_{i}.coerce_trusted(self, {name!r}, value)',
+                '        else:',
+                f'            {setter}',
+            ]
+
+    encode += [
+        '    changes = 0',
+        '    changed = self.obj_what_changed()',
+        '    if changed:',
+        '        for name in changed:',
+        '            changes |= field_bits.get(name, 0)',
+        '        changes &= present',
+        '    try:',
+        '        out.append(',
+        '            head.pack(',
+        *(
+            f'                {arg},'
+            for arg in [
+                pack_bitmap('present'),
+                pack_bitmap('changes'),
+                pack_bitmap('nulls'),
+                *fixed,
+            ]
+        ),
+        '            )',
+        '        )',
+        '    except struct_error:',
+        '        return False',
+        *written,
+        '    return True',
+    ]
+    unpacked = ['present', 'changes', 'nulls', *fixed]
+    decode[5:5] = [
+        f'    ({", ".join(unpacked)},) = head.unpack_from(data, offset)',
+        f'    offset += {head.size}',
+    ]
+    if wide:
+        decode[7:7] = [
+            f"    {name} = int.from_bytes({name}, 'little')"
+            for name in ('present', 'changes', 'nulls')
+        ]
+    decode += [
+        # NOTE: The bits of the layout are those of the changed fields mask
+        '    self._obj_changed_mask = changes',
+        '    return self, offset',
+    ]
+    return _BinaryLayout(
+        owner=cls,
+        fingerprint=fingerprint,
+        header=obj_codec._layout_header(
+            cls,
+            fingerprint,
+            [(name, kind) for (name, _), (kind, _) in zip(fields, kinds)],
+        ),
+        encode=_compile_codec_function(cls, 'encode', encode, env),
+        decode=_compile_codec_function(cls, 'decode', decode, env),
+    )
+
+
+class _OsloOrderedDict(collections.OrderedDict[str, str]):
+    """Oslo version of OrderedDict for Python consistency."""
+
+    @recursive_repr()
+    def __repr__(self) -> str:
+        if not self:
+            return f'{self.__class__.__bases__[0].__name__}()'
+        # NOTE(jamespage):
+        # Python >= 3.12 uses a dict instead of a list which changes the
+        # repr of the versioned object and its associated hash value
+        # Switch back to using list an use super class name.
+        return (
+            f'{self.__class__.__bases__[0].__name__}({list(self.items())!r})'
+        )
+
+
+# NOTE: The name is part of the repr() hashed by _get_fingerprint()
+_ArgSpec = collections.namedtuple(  # type: ignore[name-match]
+    'ArgSpec', ('args', 'varargs', 'keywords', 'defaults')
+)
+
+
+def _get_method_spec(
+    method: Callable[..., Any],
+) -> inspect.FullArgSpec | _ArgSpec:
+    """Get a stable and compatible method spec.
+
+    Newer features in Python3 (kw-only arguments and annotations) are
+    not supported or representable with inspect.getargspec() but many
+    object hashes are already recorded using that method. This attempts
+    to return something compatible with getargspec() when possible (i.e.
+    when those features are not used), and otherwise just returns the
+    newer getfullargspec() representation.
+    """
+    fullspec = inspect.getfullargspec(method)
+    if any(
+        [fullspec.kwonlyargs, fullspec.kwonlydefaults, fullspec.annotations]
+    ):
+        # Method uses newer-than-getargspec() features, so return the
+        # newer full spec
+        return fullspec
+    else:
+        return _ArgSpec(
+            fullspec.args, fullspec.varargs, fullspec.varkw, fullspec.defaults
+        )
+
+
+def _find_remotable_method(
+    cls: type[VersionedObject],
+    thing: Any,
+    parent_was_remotable: bool = False,
+) -> Callable[..., Any] | None:
+    """Follow a chain of remotable things down to the original function."""
+    if isinstance(thing, classmethod):
+        return _find_remotable_method(cls, thing.__get__(None, cls))
+    elif (inspect.ismethod(thing) or inspect.isfunction(thing)) and hasattr(
+        thing, 'remotable'
+    ):
+        return _find_remotable_method(
+            cls, getattr(thing, 'original_fn'), parent_was_remotable=True
+        )
+    elif parent_was_remotable:
+        # We must be the first non-remotable thing underneath a stack of
+        # remotable things (i.e. the actual implementation method)
+        return thing  # type: ignore[no-any-return]
+    else:
+        # This means the top-level thing never hit a remotable layer
+        return None
+
+
+def _get_fingerprint(
+    obj_class: type[VersionedObject],
+    extra_data_func: (
+        Callable[[type[VersionedObject]], tuple[Any, ...]] | None
+    ) = None,
+    find_remotable_method: Callable[
+        [type[VersionedObject], Any], Callable[..., Any] | None
+    ] = _find_remotable_method,
+    get_method_spec: Callable[[Callable[..., Any]], Any] = _get_method_spec,
+) -> str:
+    """Compute the fingerprint of the schema of an object class.
+
+    This is the hash checked by the ObjectVersionChecker test fixture. It
+    is computed here so that it is known at runtime too, without the
+    dependencies of the fixtures.
+    """
+    obj_fields = list(obj_class.fields.items())
+    obj_fields.sort()
+    methods = []
+    for name in dir(obj_class):
+        thing = getattr(obj_class, name)
+        if (
+            inspect.ismethod(thing)
+            or inspect.isfunction(thing)
+            or isinstance(thing, classmethod)
+        ):
+            method = find_remotable_method(obj_class, thing)
+            if method:
+                methods.append((name, get_method_spec(method)))
+    methods.sort()
+    # NOTE(danms): Things that need a version bump are any fields
+    # and their types, or the signatures of any remotable methods.
+    # Of course, these are just the mechanical changes we can detect,
+    # but many other things may require a version bump (method behavior
+    # and return value changes, for example).
+    if hasattr(obj_class, 'child_versions'):
+        relevant_data: tuple[Any, ...] = (
+            obj_fields,
+            methods,
+            _OsloOrderedDict(sorted(obj_class.child_versions.items())),
+        )
+    else:
+        relevant_data = (obj_fields, methods)
+
+    if extra_data_func:
+        relevant_data += extra_data_func(obj_class)
+
+    fingerprint = '{}-{}'.format(
+        obj_class.VERSION,
+        hashlib.md5(
+            bytes(repr(relevant_data).encode()), usedforsecurity=False
+        ).hexdigest(),
+    )
+    return fingerprint
+
+
+def _unsupported_object(objname: str) -> exception.UnsupportedObjectError:
+    LOG.error(
+        'Unable to instantiate unregistered object type %(objtype)s',
+        {'objtype': objname},
+    )
+    return exception.UnsupportedObjectError(objtype=objname)
+
+
+class RegistrySnapshot(NamedTuple):
+    """The registered classes, as frozen by the registry."""
+
+    # The classes of each object name, from the latest version
+    classes: Mapping[str, tuple[type[VersionedObject], ...]]
+    # The latest version of each object name
+    latest_versions: Mapping[str, str]
+    # The version manifest of each object name, as from
+    # obj_tree_get_versions(). Objects with unregistered sub-objects have
+    # none.
+    manifests: Mapping[str, Mapping[str, str]]
+
+
+def _registered_classes(objname: str) -> Sequence[type[VersionedObject]]:
+    """Return the registered classes of an object, from the latest."""
+    frozen = VersionedObjectRegistry._frozen
+    if frozen is not None:
+        return frozen.classes.get(objname, ())
+    # NOTE: obj_classes() would import the modules of every lazy object
+    registered = VersionedObjectRegistry()._obj_classes
+    objclasses = registered.get(objname)
+    if not objclasses and objname in VersionedObjectRegistry._obj_lazy_modules:
+        VersionedObjectRegistry._load_lazy(objname)
+        objclasses = registered.get(objname)
+    return objclasses or []
 
 
 class VersionedObjectRegistry:
     _registry: VersionedObjectRegistry | None = None
     _obj_classes: collections.defaultdict[str, list[type[VersionedObject]]]
+    # The snapshot lookups are served from once the registry is frozen
+    _frozen: RegistrySnapshot | None = None
+    # The modules to import to register the classes of an object, by object
+    # name, for the objects declared by register_lazy()
+    _obj_lazy_modules: dict[str, str] = {}
+    # The classes found by VersionedObject.obj_class_from_name(), or the
+    # functions making the error it raised, by object name and version.
+    # This is replaced by an empty dict whenever the registry changes, so
+    # the VERSION of registered classes must not be changed without calling
+    # _invalidate_caches().
+    _obj_class_cache: dict[
+        tuple[str, str],
+        type[VersionedObject]
+        | Callable[[], exception.VersionedObjectsException],
+    ] = {}
+    # The version and the names of the child objects of the latest class of
+    # each object name, and the manifests made by obj_tree_get_versions()
+    # from them, by object name. These are replaced with the cache above.
+    _obj_dependencies: dict[str, tuple[str, tuple[str, ...]]] = {}
+    _obj_manifests: dict[str, Mapping[str, str]] = {}
+    # Incremented with the caches above, to forget those held by the classes
+    _obj_cache_generation = 0
 
     def __new__(cls, *args: Any, **kwargs: Any) -> Self:
         if not VersionedObjectRegistry._registry:
@@ -146,10 +2099,24 @@ class VersionedObjectRegistry:
     def _register_class(self, cls: type[VersionedObject]) -> None:
         def _vers_tuple(
             obj: type[VersionedObject],
-        ) -> tuple[int, ...]:
-            return vutils.convert_version_to_tuple(obj.VERSION)
+        ) -> ObjectVersion:
+            return ObjectVersion.parse(obj.VERSION)
 
+        if VersionedObjectRegistry._frozen is not None:
+            raise exception.RegistryFrozen(objname=cls.obj_name())
         _make_class_properties(cls)
+        if cls.OBJ_COMPILED_PRIMITIVES:
+            cls._obj_primitive_codec = _make_primitive_codec(cls)
+        else:
+            cls._obj_primitive_codec = None
+        if cls.OBJ_BINARY_LAYOUT:
+            cls._obj_binary_layout = _make_binary_layout(cls)
+        else:
+            cls._obj_binary_layout = None
+        if _is_overridden(cls, 'obj_to_primitive'):
+            cls._obj_shallow_owner = None
+        else:
+            cls._obj_shallow_owner = cls
         obj_name = cls.obj_name()
         for i, obj in enumerate(self._obj_classes[obj_name]):
             self.registration_hook(cls, i)
@@ -165,6 +2132,127 @@ class VersionedObjectRegistry:
             # an older version than anything we'e seen.
             self._obj_classes[obj_name].append(cls)
             self.registration_hook(cls, 0)
+        self._invalidate_caches()
+
+    @staticmethod
+    def _invalidate_caches() -> None:
+        """Forget what was found from the registered classes.
+
+        This must be called after changing the registered classes. If the
+        registry is frozen, what its snapshot holds is known again.
+        """
+        frozen = VersionedObjectRegistry._frozen
+        if frozen is None:
+            VersionedObjectRegistry._obj_class_cache = {}
+            VersionedObjectRegistry._obj_manifests = {}
+        else:
+            VersionedObjectRegistry._obj_class_cache = {
+                (objname, objclass.VERSION): objclass
+                for objname, objclasses in frozen.classes.items()
+                for objclass in objclasses
+            }
+            VersionedObjectRegistry._obj_manifests = dict(frozen.manifests)
+        VersionedObjectRegistry._obj_dependencies = {}
+        VersionedObjectRegistry._obj_cache_generation += 1
+
+    @classmethod
+    def register_lazy(cls, objname: str, module: str) -> None:
+        """Declare the module registering the classes of an object.
+
+        The module is imported the first time a class of the object is
+        looked up by obj_class_from_name(), or is needed by
+        obj_tree_get_versions() or obj_classes(), rather than when the
+        service starts. Its classes are registered as usual when it is
+        imported.
+
+        :param objname: The name of the object
+        :param module: The name of the module defining its classes
+        """
+        if VersionedObjectRegistry._frozen is not None:
+            raise exception.RegistryFrozen(objname=objname)
+        VersionedObjectRegistry._obj_lazy_modules[objname] = module
+
+    @classmethod
+    def register_entry_points(cls, group: str) -> None:
+        """Declare the modules of objects from entry points.
+
+        Each entry point of the group is named after an object, and its
+        value is the module registering its classes, as for
+        register_lazy(). For example, in setup.cfg::
+
+            [entry_points]
+            myproject.objects =
+                Instance = myproject.objects.instance
+
+        :param group: The name of the entry point group
+        """
+        for entry_point in importlib_metadata.entry_points(group=group):
+            cls.register_lazy(entry_point.name, entry_point.module)
+
+    @classmethod
+    def load_lazy(cls) -> None:
+        """Import the modules of all objects declared by register_lazy()."""
+        for objname in list(VersionedObjectRegistry._obj_lazy_modules):
+            VersionedObjectRegistry._load_lazy(objname)
+
+    @staticmethod
+    def _load_lazy(objname: str) -> None:
+        module = VersionedObjectRegistry._obj_lazy_modules.get(objname)
+        if module is not None:
+            LOG.debug(
+                'Importing %(module)s to register %(objname)s',
+                {'module': module, 'objname': objname},
+            )
+            importlib.import_module(module)
+            # NOTE: The module is only forgotten once imported, so that it
+            # is imported again by the next lookup if this one failed
+            VersionedObjectRegistry._obj_lazy_modules.pop(objname, None)
+
+    @classmethod
+    def freeze(cls) -> RegistrySnapshot:
+        """Stop the registration of classes and take a snapshot of them.
+
+        This is meant to be called once a service has imported all of its
+        objects. The classes of each object, their latest version and the
+        version manifest of each object are then found in the snapshot
+        returned, which is also used to look up classes from then on.
+        Registering a class afterwards raises RegistryFrozen, except under
+        a VersionedObjectRegistryFixture. Calling this again returns the
+        same snapshot. The modules declared by register_lazy() are imported
+        first.
+
+        The mapping returned by obj_classes() must not be changed once the
+        registry is frozen.
+        """
+        frozen = VersionedObjectRegistry._frozen
+        if frozen is not None:
+            return frozen
+        cls.load_lazy()
+        classes = {
+            objname: tuple(objclasses)
+            for objname, objclasses in cls.obj_classes().items()
+            if objclasses
+        }
+        manifests = {}
+        for objname in classes:
+            try:
+                manifest = obj_tree_get_versions(objname)
+            except exception.UnregisteredSubobject:
+                continue
+            manifests[objname] = types.MappingProxyType(manifest)
+        frozen = RegistrySnapshot(
+            classes=types.MappingProxyType(classes),
+            latest_versions=types.MappingProxyType(
+                {
+                    objname: objclasses[0].VERSION
+                    for objname, objclasses in classes.items()
+                }
+            ),
+            manifests=types.MappingProxyType(manifests),
+        )
+        VersionedObjectRegistry._frozen = frozen
+        VersionedObjectRegistry._invalidate_caches()
+        return frozen
 
     @classmethod
     def register(cls, obj_cls: type[_VO]) -> type[_VO]:
@@ -191,6 +2279,13 @@ class VersionedObjectRegistry:
     def obj_classes(
         cls,
     ) -> collections.defaultdict[str, list[type[VersionedObject]]]:
+        """Return the registered classes by object name, from the latest.
+
+        The modules declared by register_lazy() are imported first, so that
+        the classes of every object are included.
+        """
+        if VersionedObjectRegistry._obj_lazy_modules:
+            cls.load_lazy()
         registry = cls()
         return registry._obj_classes
 
@@ -459,15 +2554,433 @@ class VersionedObject:
     #   since they were not added until version 1.2.
     obj_relationships: dict[str, list[tuple[str, str]]] = {}
 
-    _changed_fields: set[str]
+    # Mapping of database columns to the fields they are loaded into
+    #
+    # When this is set, obj_from_db_rows() builds objects from database
+    # rows, which obj_make_list() then uses instead of calling
+    # _from_db_object() for each row. The function doing so is generated
+    # for the class on first use. Values whose type is already that of
+    # their string, integer, float or boolean field are stored without
+    # coercing them.
+    #
+    # obj_db_columns = {'id': 'id', 'display_name': 'name'}
+    #
+    # Values can be converted before they are coerced, by field name:
+    #
+    # obj_db_converters = {'name': str.strip}
+    obj_db_columns: Mapping[str, str] | None = None
+    obj_db_converters: Mapping[str, Callable[[Any], Any]] = {}
+
+    # Function generated from obj_db_columns
+    _obj_db_mapper: _DbMapper | None = None
+
+    # Store field values in a fixed, per-class layout of slots
+    #
+    # By default each field value is kept in its own instance attribute.
+    # When this is set, registration assigns every field a position in a
+    # single list held by the instance, and unset fields are represented
+    # by a sentinel in that list. This reduces the memory used by each
+    # instance and turns field access and obj_attr_is_set() into a single
+    # indexed load, which matters for services holding many objects.
+    OBJ_SLOT_STORAGE: bool = False
+
+    # Mapping of field name to slot position, set at registration when
+    # OBJ_SLOT_STORAGE is enabled
+    _obj_slots: dict[str, int] | None = None
+    _obj_values: list[Any]
+
+    # Index of field names, computed when the class properties are made
+    _obj_field_index: _FieldIndex | None = None
+
+    # Whether the field properties check for deferred fields and values
+    # shared with copy-on-write clones. This is set for classes with lazy
+    # hydration, and for other classes before their objects first use
+    # either feature, so that classes which don't use them skip the checks.
+    _obj_checked_access: bool = False
+
+    # Generate specialized primitive conversion functions at registration
+    #
+    # When this is set, registering the class generates an obj_to_primitive()
+    # and _obj_from_primitive() implementation for its exact set of fields,
+    # which avoids the generic per-field loop and dynamic dispatch through
+    # the field types. The output is identical to the generic path, which is
+    # still used for backports, version manifests and for classes that
+    # override the conversion methods. Fields added to the class after
+    # registration are not seen by the generated functions.
+    OBJ_COMPILED_PRIMITIVES: bool = False
+
+    # Functions generated at registration when OBJ_COMPILED_PRIMITIVES is set
+    _obj_primitive_codec: _PrimitiveCodec | None = None
+
+    # Generate a binary layout of the fields of the class at registration
+    #
+    # The objects of classes with a layout are encoded with it by
+    # SchemaCodec, and built directly from it by the services with the same
+    # fingerprint for the class. Other objects are encoded as their
+    # primitive.
+    OBJ_BINARY_LAYOUT: bool = False
+
+    # Layout generated at registration when OBJ_BINARY_LAYOUT is set
+    _obj_binary_layout: _BinaryLayout | None = None
+
+    # Plans made by _obj_backport_plan(), for the rules they were made from
+    _obj_backport_plans: _BackportPlans | None = None
+
+    # The class itself once registered, unless it overrides
+    # obj_to_primitive(), in which case obj_to_json() dehydrates its objects
+    # with their sub-objects
+    _obj_shallow_owner: type[VersionedObject] | None = None
+
+    # Decode the fields of deserialized objects on first access
+    #
+    # When this is set, obj_from_primitive() keeps the primitive value of
+    # each field and only decodes it when the field is first read. Fields
+    # which are never read are serialized again from their original
+    # primitive, so objects which are only passed along are never fully
+    # hydrated. Errors in the primitive of a field are raised when the field
+    # is read rather than when the object is deserialized.
+    OBJ_LAZY_HYDRATION: bool = False
+
+    # Primitive values of the fields which have not been decoded yet, and
+    # the names of those holding sub-objects with changes
+    _obj_lazy: dict[str, Any] | None = None
+    _obj_lazy_changes: frozenset[str] = frozenset()
+
+    # Change tracking state
+    #
+    # Changed fields are kept as a mask with a bit per field, indexed by the
+    # field index of the class, plus a set of any other names which were
+    # marked as changed. Objects set as field values (or as elements of a
+    # list object) keep weak references to the objects holding them, and
+    # mark those as possibly having a changed child when they change. This
+    # lets obj_has_changes() answer in constant time for unchanged trees,
+    # and limits obj_what_changed() to the branches that were touched.
+    _obj_changed_mask: int = 0
+    _obj_changed_extra: frozenset[str] = frozenset()
+    _obj_child_dirty: bool = False
+    _obj_owners: dict[int, weakref.ref[VersionedObject]] | None = None
+
+    # Collections shared with copy-on-write clones, by field name
+    _obj_cow: dict[str, _CowShare] | None = None
+
     _context: Any
 
     def __init__(self, context: Any = None, **kwargs: Any) -> None:
-        self._changed_fields = set()
+        if self._obj_slots is not None:
+            self._obj_values = [_UnsetFieldSentinel] * len(self._obj_slots)
         self._context = context
         for key in kwargs.keys():
             setattr(self, key, kwargs[key])
 
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # NOTE: Copies must not share the value list of a slot-backed object
+        if '_obj_values' in state:
+            state['_obj_values'] = list(state['_obj_values'])
+        # NOTE: Owner references can't be pickled, and copies are not held
+        # by the owners of the original. Until a copy has looked at its
+        # children, it has to assume that any of them may have changed.
+        state.pop('_obj_owners', None)
+        state['_obj_child_dirty'] = True
+        state.pop('_obj_cow', None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        changed_fields = state.pop('_changed_fields', None)
+        self.__dict__.update(state)
+        if changed_fields is not None:
+            # Objects pickled before changes were tracked as a mask
+            self._changed_fields = changed_fields
+            self._obj_child_dirty = True
+
+    @property
+    def _changed_fields(self) -> _ChangedFields:
+        return _ChangedFields(self)
+
+    @_changed_fields.setter
+    def _changed_fields(self, names: Iterable[str]) -> None:
+        if isinstance(names, _ChangedFields) and names._obj is self:
+            return
+        bits = self._obj_get_field_index().bits
+        mask = 0
+        extra = set()
+        for name in names:
+            bit = bits.get(name)
+            if bit is None:
+                extra.add(name)
+            else:
+                mask |= bit
+        was_changed = self._obj_changed_mask or self._obj_changed_extra
+        self._obj_changed_mask = mask
+        if extra or self._obj_changed_extra:
+            self._obj_changed_extra = frozenset(extra)
+        if (
+            self._obj_owners
+            and (mask or extra)
+            and not was_changed
+            and not self._obj_child_dirty
+        ):
+            # This object just became changed
+            self._obj_notify_owners()
+
+    def _obj_is_marked(self) -> bool:
+        """Return whether this object may have changes.
+
+        This is False only when the object and everything below it is known
+        to be unchanged.
+        """
+        return bool(
+            self._obj_changed_mask
+            or self._obj_changed_extra
+            or self._obj_child_dirty
+            or not self._obj_get_field_index().tracks_changes
+        )
+
+    def _obj_mark_changed(self, name: str) -> None:
+        field_index = self._obj_field_index
+        if field_index is None or field_index.owner is not type(self):
+            field_index = self._obj_get_field_index()
+        mask = self._obj_changed_mask
+        bit = field_index.bits.get(name)
+        if bit is not None:
+            if mask & bit:
+                return
+            self._obj_changed_mask = mask | bit
+        elif name not in self._obj_changed_extra:
+            self._obj_changed_extra = self._obj_changed_extra | {name}
+        else:
+            return
+        if (
+            self._obj_owners
+            and not mask
+            and not self._obj_child_dirty
+            and len(self._obj_changed_extra) == (bit is None)
+        ):
+            # This object just became changed
+            self._obj_notify_owners()
+
+    def _obj_mark_child_dirty(self) -> None:
+        if self._obj_child_dirty:
+            return
+        self._obj_child_dirty = True
+        if self._obj_owners and not (
+            self._obj_changed_mask or self._obj_changed_extra
+        ):
+            self._obj_notify_owners()
+
+    def _obj_notify_owners(self) -> None:
+        owners = self._obj_owners
+        assert owners is not None
+        for key, ref in list(owners.items()):
+            owner = ref()
+            if owner is None:
+                del owners[key]
+            else:
+                owner._obj_mark_child_dirty()
+
+    def _obj_adopt_child(self, child: VersionedObject) -> None:
+        """Record that child is held by this object.
+
+        This is called when a sub-object is coerced for a field of this
+        object, so that changes to the sub-object are propagated here.
+        """
+        owners = child._obj_owners
+        if owners is None:
+            owners = child._obj_owners = {}
+        ref = owners.get(id(self))
+        if ref is None or ref() is not self:
+            owners[id(self)] = weakref.ref(self)
+        if child._obj_is_marked():
+            self._obj_mark_child_dirty()
+
+    def _obj_iter_children(self) -> Iterator[tuple[str, VersionedObject]]:
+        """Yield the field name and value of each sub-object."""
+        lazy = self._obj_lazy
+        for name in self.fields:
+            if lazy and name in lazy:
+                continue
+            if self.obj_attr_is_set(name):
+                value = self._obj_get_value(name)
+                if isinstance(value, VersionedObject):
+                    yield name, value
+
+    def _obj_get_value(self, name: str) -> Any:
+        """Return the stored value of a set field.
+
+        Unlike reading the field attribute, this does not load the field or
+        count as a read of a value shared with copy-on-write clones, so the
+        value must not be modified. Deferred fields are decoded.
+        """
+        if self._obj_lazy and name in self._obj_lazy:
+            self._obj_hydrate(name)
+        if self._obj_slots is not None:
+            return self._obj_values[self._obj_slots[name]]
+        return getattr(self, _get_attrname(name))
+
+    def _obj_set_value(self, name: str, value: Any) -> None:
+        """Store the value of a field without coercing or tracking it."""
+        if self._obj_slots is not None:
+            self._obj_values[self._obj_slots[name]] = value
+        else:
+            setattr(self, _get_attrname(name), value)
+
+    def _obj_del_value(self, name: str) -> None:
+        """Unset a field without tracking it."""
+        if self._obj_slots is not None:
+            self._obj_values[self._obj_slots[name]] = _UnsetFieldSentinel
+        elif hasattr(self, _get_attrname(name)):
+            delattr(self, _get_attrname(name))
+
+    def _obj_defer_fields(
+        self, values: dict[str, Any], changes: frozenset[str]
+    ) -> None:
+        """Keep the primitive values of fields to decode on first access.
+
+        :param values: Field primitives by field name, which are owned by
+                       this object from now on and must not be modified
+        :param changes: Names of the fields whose primitive is that of a
+                        sub-object with changes
+        """
+        for name in values:
+            self._obj_del_value(name)
+        if not values:
+            return
+        _check_field_access(type(self))
+        self._obj_lazy = values
+        self._obj_lazy_changes = changes
+        if changes:
+            self._obj_mark_child_dirty()
+
+    def _obj_primitive_child_changed(self, name: str, value: Any) -> bool:
+        """Return whether a field primitive holds a changed sub-object."""
+        return isinstance(
+            self.fields[name]._type, obj_fields.Object
+        ) and _primitive_has_changes(self, value)
+
+    def _obj_hydrate(self, name: str) -> None:
+        """Decode the deferred primitive value of a field."""
+        lazy = self._obj_lazy
+        assert lazy is not None
+        field = self.fields[name]
+        value = field.coerce(
+            self, name, field.from_primitive(self, name, lazy[name])
+        )
+        self._obj_drop_deferred(name)
+        self._obj_set_value(name, value)
+
+    def _obj_drop_deferred(self, name: str) -> None:
+        assert self._obj_lazy is not None
+        del self._obj_lazy[name]
+        if not self._obj_lazy:
+            self._obj_lazy = None
+            self._obj_lazy_changes = frozenset()
+
+    def _obj_undefer(self, name: str) -> None:
+        """Stop deferring a field which is being set."""
+        if self.fields[name].read_only:
+            # The current value is needed to check the new one
+            self._obj_hydrate(name)
+        else:
+            self._obj_drop_deferred(name)
+
+    def _obj_cow_before_write(self) -> None:
+        """Stop sharing the collections holding this object.
+
+        This is called before the object is modified. Objects held in a
+        collection shared with copy-on-write clones are shared too, so the
+        objects sharing a collection holding this one, or holding an object
+        above it, get their own copy first.
+        """
+        if not _cow_object_shares:
+            return
+        seen = {id(self)}
+        objs = [self]
+        while objs:
+            obj = objs.pop()
+            for ref in list((obj._obj_owners or {}).values()):
+                owner = ref()
+                if owner is None:
+                    continue
+                for share in list((owner._obj_cow or {}).values()):
+                    if share.holds(obj):
+                        share.before_write()
+                if id(owner) not in seen:
+                    seen.add(id(owner))
+                    objs.append(owner)
+
+    def _obj_cow_release(self, name: str) -> None:
+        """Stop sharing the value of a field which is being replaced."""
+        assert self._obj_cow is not None
+        self._obj_cow[name].release(self)
+
+    def _obj_cow_clone(self, memo: dict[int, Any]) -> Self:
+        _check_field_access(type(self))
+        nobj = self.__class__()
+        memo[id(self)] = nobj
+        nobj._context = self._context
+        lazy = self._obj_lazy
+        for name in self.fields:
+            if lazy and name in lazy or not self.obj_attr_is_set(name):
+                continue
+            value = self._obj_get_value(name)
+            if type(value) in _IMMUTABLE_TYPES:
+                pass
+            elif isinstance(value, VersionedObject):
+                value = _cow_clone_value(value, memo)
+            elif isinstance(value, obj_fields.CoercedCollectionMixin):
+                if self._obj_cow is None:
+                    self._obj_cow = {}
+                share = self._obj_cow.get(name)
+                if share is None:
+                    if _holds_objects(self.fields[name]):
+                        _check_object_access(self.fields[name])
+                    share = self._obj_cow[name] = _CowShare(name, value, self)
+                share.refs.append(weakref.ref(nobj))
+                if nobj._obj_cow is None:
+                    nobj._obj_cow = {}
+                nobj._obj_cow[name] = share
+            else:
+                value = copy.deepcopy(value, memo)
+            nobj._obj_set_value(name, value)
+        if lazy:
+            # Deferred primitives are never modified, so they can be shared
+            nobj._obj_defer_fields(dict(lazy), self._obj_lazy_changes)
+        nobj._obj_changed_mask = self._obj_changed_mask
+        nobj._obj_changed_extra = self._obj_changed_extra
+        # Sub-objects are adopted on the first change scan
+        nobj._obj_child_dirty = True
+        return nobj
+
+    def _obj_child_changes(self) -> set[str]:
+        """Return the names of the fields holding changed sub-objects.
+
+        Only objects marked as possibly having a changed child are scanned.
+        The mark is cleared when nothing below this object can change
+        without notifying it.
+        """
+        if not self._obj_child_dirty:
+            return set()
+        changes: set[str] = set()
+        keep_marked = False
+        lazy = self._obj_lazy
+        if lazy:
+            changes.update(
+                name for name in self._obj_lazy_changes if name in lazy
+            )
+        for name, child in self._obj_iter_children():
+            if name in changes:
+                continue
+            # NOTE: Children copied or unpickled along with this object
+            # are only adopted here.
+            self._obj_adopt_child(child)
+            if child.obj_has_changes():
+                changes.add(name)
+            elif child._obj_is_marked():
+                keep_marked = True
+        if not changes and not keep_marked:
+            self._obj_child_dirty = False
+        return changes
+
     def __repr__(self) -> str:
         repr_str = '{}({})'.format(
             self.obj_name(),
@@ -536,58 +3049,116 @@ class VersionedObject:
         cls, objname: str, objver: str
     ) -> type[VersionedObject]:
         """Returns a class from the registry based on a name and version."""
-        if objname not in VersionedObjectRegistry.obj_classes():
-            LOG.error(
-                'Unable to instantiate unregistered object type %(objtype)s',
-                {'objtype': objname},
-            )
-            raise exception.UnsupportedObjectError(objtype=objname)
-
-        # NOTE(comstud): If there's not an exact match, return the highest
-        # compatible version. The objects stored in the class are sorted
-        # such that highest version is first, so only set compatible_match
-        # once below.
-        compatible_match: type[VersionedObject] | None = None
-
-        for objclass in VersionedObjectRegistry.obj_classes()[objname]:
-            if objclass.VERSION == objver:
-                return objclass
-            if not compatible_match and vutils.is_compatible(
-                objver, objclass.VERSION
-            ):
-                compatible_match = objclass
-
-        if compatible_match:
-            return compatible_match
-
-        # As mentioned above, latest version is always first in the list.
-        latest_ver = VersionedObjectRegistry.obj_classes()[objname][0].VERSION
-        raise exception.IncompatibleObjectVersion(
-            objname=objname, objver=objver, supported=latest_ver
-        )
+        # NOTE: The cache is fetched first, so that a result found while
+        # a class is registered is stored in the cache being replaced
+        cache = VersionedObjectRegistry._obj_class_cache
+        objclass = cache.get((objname, objver))
+        if objclass is None:
+            # NOTE: The versions looked up come from the peers, so the
+            # cache is bounded
+            if len(cache) >= _MAX_CLASS_LOOKUPS:
+                cache.clear()
+            objclass = cache[objname, objver] = _find_class(objname, objver)
+        if isinstance(objclass, type):
+            return objclass
+        raise objclass()
 
     @classmethod
     def _obj_from_primitive(
         cls, context: Any, objver: str, primitive: dict[str, Any]
     ) -> Self:
+        codec = cls._obj_primitive_codec
+        trusted = _trusted_hydration.get()
+        lazy = cls.OBJ_LAZY_HYDRATION and not _eager_hydration.get()
+        if (
+            codec is not None
+            and codec.from_primitive is not None
+            and codec.owner is cls
+            and not lazy
+            and not trusted
+        ):
+            return cast(
+                'Self', codec.from_primitive(cls, context, objver, primitive)
+            )
         self = cls()
         self._context = context
         self.VERSION = objver
         objdata = cls._obj_primitive_field(primitive, 'data')
         changes = cls._obj_primitive_field(primitive, 'changes', [])
-        for name, field in self.fields.items():
-            if name in objdata:
-                setattr(
-                    self, name, field.from_primitive(self, name, objdata[name])
-                )
+        if lazy:
+            values = {
+                name: objdata[name] for name in self.fields if name in objdata
+            }
+            self._obj_defer_fields(
+                values,
+                frozenset(
+                    name
+                    for name, value in values.items()
+                    if self._obj_primitive_child_changed(name, value)
+                ),
+            )
+        elif trusted:
+            for name, field in self.fields.items():
+                if name in objdata:
+                    # NOTE: The value comes from obj_to_primitive() of a
+                    # valid object, so it is stored without validating it
+                    value = field.from_primitive(self, name, objdata[name])
+                    self._obj_set_value(
+                        name, field.coerce_trusted(self, name, value)
+                    )
+        else:
+            for name, field in self.fields.items():
+                if name in objdata:
+                    # NOTE: Nothing is set on the new object yet, so the
+                    # field setter has nothing to check, and the changed
+                    # fields are set once below
+                    value = field.from_primitive(self, name, objdata[name])
+                    self._obj_set_value(name, field.coerce(self, name, value))
         self._changed_fields = {x for x in changes if x in self.fields}
         return self
 
     @classmethod
     def obj_from_primitive(
-        cls, primitive: dict[str, Any], context: Any = None
+        cls,
+        primitive: dict[str, Any],
+        context: Any = None,
+        trusted: bool = False,
     ) -> Self:
-        """Object field-by-field hydration."""
+        """Object field-by-field hydration.
+
+        :param primitive: The primitive made by obj_to_primitive()
+        :param context: Request context to set on the objects
+        :param trusted: Whether the primitive is known to have been made by
+                        obj_to_primitive() of a valid object, such as one
+                        from a trusted peer. The values deserialized by the
+                        fields are then stored without being coerced again,
+                        for this object and the objects it contains.
+
+        Objects shared by a primitive made by obj_to_shared_primitive() are
+        hydrated once, and the same instance is set wherever they are
+        referenced. Primitives in the compact envelope made by
+        obj_compact_primitive() are accepted too.
+        """
+        compact = _is_compact_primitive(primitive, cls.OBJ_SERIAL_NAMESPACE)
+        if compact:
+            primitive = _expand_primitive(
+                primitive,
+                _envelope_keys(cls),  # type: ignore[arg-type]
+                _compact_keys(cls.OBJ_SERIAL_NAMESPACE),
+                cls.OBJ_PROJECT_NAMESPACE,
+            )
+        shared_key = cls._obj_primitive_key('shared')
+        if (compact and not _eager_hydration.get()) or shared_key in primitive:
+            with _trust_primitives(trusted), _hydrate_eagerly():
+                if shared_key in primitive:
+                    primitive = cls._obj_resolve_shared(
+                        primitive,
+                        _compact_keys(cls.OBJ_SERIAL_NAMESPACE)['ref']
+                        if compact
+                        else cls._obj_primitive_key('ref'),
+                        context,
+                    )
+                return cls.obj_from_primitive(primitive, context)
         objns = cls._obj_primitive_field(primitive, 'namespace')
         objname = cls._obj_primitive_field(primitive, 'name')
         objver = cls._obj_primitive_field(primitive, 'version')
@@ -598,7 +3169,204 @@ class VersionedObject:
                 objtype=f'{objns}.{objname}'
             )
         objclass = cls.obj_class_from_name(objname, objver)
-        return objclass._obj_from_primitive(context, objver, primitive)  # type: ignore[return-value]
+        with _trust_primitives(trusted):
+            return objclass._obj_from_primitive(context, objver, primitive)  # type: ignore[return-value]
+
+    @classmethod
+    def _obj_resolve_shared(
+        cls, primitive: dict[str, Any], ref_key: str, context: Any
+    ) -> dict[str, Any]:
+        """Hydrate the shared objects of a primitive.
+
+        :returns: The primitive without the shared objects, and with the
+                  references to them replaced by their instances
+        """
+        primitive = dict(primitive)
+        shared = primitive.pop(cls._obj_primitive_key('shared'))
+        objects: dict[int, VersionedObject] = {}
+
+        def resolve(index: int) -> VersionedObject:
+            obj = objects.get(index)
+            if obj is None:
+                obj = objects[index] = cls.obj_from_primitive(
+                    _resolve_shared(shared[index], ref_key, resolve), context
+                )
+            return obj
+
+        return cast(
+            'dict[str, Any]', _resolve_shared(primitive, ref_key, resolve)
+        )
+
+    @classmethod
+    def obj_compact_primitive(
+        cls, primitive: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Return a primitive in the compact envelope.
+
+        The primitive, made by obj_to_primitive() or
+        obj_to_shared_primitive() of an object of this base, is converted
+        to use short keys such as ``versioned_object.~n`` rather than
+        ``versioned_object.name`` in its envelope and in those of its
+        sub-objects, and to leave out the namespace of the sub-objects
+        which are in the same namespace as the objects holding them.
+        obj_from_primitive() accepts both forms, but releases before this
+        one only accept the full one.
+        """
+        return cast(
+            'dict[str, Any]',
+            _compact_primitive(primitive, cls.OBJ_SERIAL_NAMESPACE, None),
+        )
+
+    @classmethod
+    def obj_from_primitive_list(
+        cls,
+        primitives: Iterable[Any],
+        context: Any = None,
+        trusted: bool = False,
+    ) -> list[Any]:
+        """Hydrate a list of object primitives.
+
+        This is equivalent to calling obj_from_primitive() for each of the
+        primitives, but the namespace check and class lookup are done once
+        for each distinct object name and version, rather than for every
+        element. Values which are None or already objects are returned as
+        they are. trusted is as for obj_from_primitive().
+        """
+        with _trust_primitives(trusted):
+            return cls._obj_from_primitive_list(primitives, context)
+
+    @classmethod
+    def _obj_from_primitive_list(
+        cls, primitives: Iterable[Any], context: Any
+    ) -> list[Any]:
+        if _is_overridden(cls, 'obj_from_primitive'):
+            return [
+                value
+                if value is None or isinstance(value, VersionedObject)
+                else cls.obj_from_primitive(value, context)
+                for value in primitives
+            ]
+        ns_key = cls._obj_primitive_key('namespace')
+        name_key = cls._obj_primitive_key('name')
+        version_key = cls._obj_primitive_key('version')
+        keys = _envelope_keys(cls)  # type: ignore[arg-type]
+        compact_keys = _compact_keys(cls.OBJ_SERIAL_NAMESPACE)
+        hydrators: dict[
+            tuple[str, str, str], Callable[[dict[str, Any]], VersionedObject]
+        ] = {}
+        objects = []
+        for value in primitives:
+            if value is None or isinstance(value, VersionedObject):
+                objects.append(value)
+                continue
+            if ns_key not in value:
+                if (
+                    not _eager_hydration.get()
+                    or not _is_compact_primitive(
+                        value, cls.OBJ_SERIAL_NAMESPACE
+                    )
+                    or compact_keys['shared'] in value
+                ):
+                    objects.append(cls.obj_from_primitive(value, context))
+                    continue
+                value = _expand_primitive(
+                    value, keys, compact_keys, cls.OBJ_PROJECT_NAMESPACE
+                )
+            key = (value[ns_key], value[name_key], value[version_key])
+            hydrate = hydrators.get(key)
+            if hydrate is None:
+                hydrate = hydrators[key] = cls._obj_find_hydrator(
+                    *key, context
+                )
+            objects.append(hydrate(value))
+        return objects
+
+    @classmethod
+    def _obj_find_hydrator(
+        cls, objns: str, objname: str, objver: str, context: Any
+    ) -> Callable[[dict[str, Any]], VersionedObject]:
+        """Return the function hydrating primitives of an object version."""
+        if objns != cls.OBJ_PROJECT_NAMESPACE:
+            raise exception.UnsupportedObjectError(
+                objtype=f'{objns}.{objname}'
+            )
+        objclass = cls.obj_class_from_name(objname, objver)
+        return objclass._obj_make_hydrator(context, objver)
+
+    @classmethod
+    def obj_from_db_rows(cls, context: Any, rows: Iterable[Any]) -> list[Self]:
+        """Build objects from database rows, as mapped by obj_db_columns.
+
+        :param context: Request context to set on the objects
+        :param rows: The rows, which are indexed by column name
+        :returns: A list of objects, one for each row, without changes
+        """
+        mapper = cls._obj_db_mapper
+        if mapper is None or mapper.owner is not cls:
+            if cls.obj_db_columns is None:
+                raise NotImplementedError(
+                    _('%s does not map database columns') % cls.obj_name()
+                )
+            mapper = cls._obj_db_mapper = _make_db_mapper(cls)
+        return cast('list[Self]', mapper.from_db_rows(cls, context, rows))
+
+    @classmethod
+    def _obj_make_hydrator(
+        cls, context: Any, objver: str
+    ) -> Callable[[dict[str, Any]], VersionedObject]:
+        """Return a function hydrating primitives of a version of this class.
+
+        The function does the same as _obj_from_primitive(), with the work
+        which does not depend on the primitive done up front.
+        """
+        codec = cls._obj_primitive_codec
+        trusted = _trusted_hydration.get()
+        if (
+            cls.OBJ_LAZY_HYDRATION
+            or (
+                codec is not None
+                and codec.from_primitive is not None
+                and codec.owner is cls
+                and not trusted
+            )
+            or any(
+                _is_overridden(cls, name)
+                for name in (
+                    '_obj_from_primitive',
+                    '_obj_primitive_field',
+                    '_obj_primitive_key',
+                )
+            )
+        ):
+            return functools.partial(cls._obj_from_primitive, context, objver)
+        data_key = cls._obj_primitive_key('data')
+        changes_key = cls._obj_primitive_key('changes')
+        fields = tuple(
+            (
+                name,
+                field.from_primitive,
+                field.coerce_trusted if trusted else field.coerce,
+            )
+            for name, field in cls.fields.items()
+        )
+        field_names = frozenset(cls.fields)
+
+        def hydrate(primitive: dict[str, Any]) -> VersionedObject:
+            self = cls()
+            self._context = context
+            self.VERSION = objver
+            objdata = primitive[data_key]
+            for name, from_primitive, coerce in fields:
+                if name in objdata:
+                    # NOTE: The object is new and the changes are replaced
+                    # below, so the value is stored without tracking it
+                    value = from_primitive(self, name, objdata[name])
+                    self._obj_set_value(name, coerce(self, name, value))
+            changes = primitive.get(changes_key, [])
+            self._changed_fields = [x for x in changes if x in field_names]
+            return self
+
+        return hydrate
 
     def __deepcopy__(self, memo: dict[int, Any]) -> Self:
         """Efficiently make a deep copy of this object."""
@@ -616,15 +3384,40 @@ class VersionedObject:
         # See launchpad bug #1602314 for more details
         memo[id(self)] = nobj
         nobj._context = self._context
+        lazy = self._obj_lazy
         for name in self.fields:
+            if lazy and name in lazy:
+                continue
             if self.obj_attr_is_set(name):
-                nval = copy.deepcopy(getattr(self, name), memo)
+                nval = copy.deepcopy(self._obj_get_value(name), memo)
                 setattr(nobj, name, nval)
+        if lazy:
+            nobj._obj_defer_fields(
+                copy.deepcopy(lazy, memo), self._obj_lazy_changes
+            )
         nobj._changed_fields = set(self._changed_fields)
         return nobj
 
-    def obj_clone(self) -> Self:
-        """Create a copy."""
+    def obj_clone(self, copy_on_write: bool = False) -> Self:
+        """Create a copy.
+
+        :param copy_on_write: Share the values of list, dict and set fields,
+                              and the objects they hold, with the copy
+                              instead of copying them up front. Reading a
+                              shared value does not copy it. Before it is
+                              modified in place, or an object held in it is
+                              modified, the other objects sharing it get
+                              their own copy, while the object which last
+                              read the field keeps the value. Setting the
+                              field stops sharing it. Other sub-objects are
+                              cloned the same way. This makes cloning cheap
+                              when the copy is only kept to compare against
+                              later. A shared value must not be modified
+                              through a reference obtained from one object
+                              after the field was read from another.
+        """
+        if copy_on_write:
+            return self._obj_cow_clone({})
         return copy.deepcopy(self)
 
     def _obj_relationship_for(
@@ -668,6 +3461,21 @@ class VersionedObject:
         :param:field: The name of the field in this object containing the
                       sub-object to be backported
         """
+        if self._obj_uses_backport_plan():
+            plan = self._obj_backport_plan(target_version)
+            if field in plan.missing:
+                raise exception.ObjectActionError(
+                    action='obj_make_compatible', reason=f'No rule for {field}'
+                )
+            if field not in plan.versions:
+                return
+            version = plan.versions[field]
+            if version is None:
+                del primitive[field]
+            else:
+                _do_subobject_backport(version, self, field, primitive)
+            return
+
         relationship_map = self._obj_relationship_for(field, target_version)
         if not relationship_map:
             # NOTE(danms): This means the field was not specified in the
@@ -687,6 +3495,100 @@ class VersionedObject:
             # Subobject did not exist, so delete it from the primitive
             del primitive[field]
 
+    def _obj_uses_backport_plan(self) -> bool:
+        """Return whether the sub-objects follow the rules of the class.
+
+        The plans made by _obj_backport_plan() are shared by the objects of
+        a class, so they are not used for objects which set their own rules.
+        """
+        if _is_overridden(type(self), '_obj_relationship_for'):
+            return False
+        attrs = getattr(self, '__dict__', None) or {}
+        return (
+            'obj_relationships' not in attrs and 'child_versions' not in attrs
+        )
+
+    def _obj_backport_plan(self, target_version: str) -> _BackportPlan:
+        """Return the plan backporting the sub-objects to a version."""
+        cls = type(self)
+        plans = cls._obj_backport_plans
+        if (
+            plans is None
+            or plans.owner is not cls
+            or plans.generation
+            != VersionedObjectRegistry._obj_cache_generation
+            or plans.fields is not cls.fields
+            or plans.relationships is not cls.obj_relationships
+            or plans.child_versions is not getattr(cls, 'child_versions', None)
+        ):
+            # NOTE: The plans are made again when the rules they were made
+            # from are replaced, as by mock.patch.object() in tests
+            plans = cls._obj_backport_plans = _BackportPlans(
+                owner=cls,
+                generation=VersionedObjectRegistry._obj_cache_generation,
+                fields=cls.fields,
+                relationships=cls.obj_relationships,
+                child_versions=getattr(cls, 'child_versions', None),
+                object_fields=_object_fields(cls),
+                plans={},
+            )
+        manifest = getattr(self, '_obj_version_manifest', None)
+        manifest_versions = None
+        if manifest is not None:
+            # NOTE: Only the versions of the sub-objects are used, so these
+            # identify the plan rather than the whole manifest
+            manifest_versions = tuple(
+                manifest.get(objname) for _name, objname in plans.object_fields
+            )
+        key = (target_version, manifest_versions)
+        plan = plans.plans.get(key)
+        if plan is None:
+            # NOTE: Target versions and manifests come from the peers, so
+            # the plans are bounded
+            if len(plans.plans) >= _MAX_BACKPORT_PLANS:
+                plans.plans.clear()
+            plan = plans.plans[key] = cls._obj_compile_backport_plan(
+                target_version, manifest_versions
+            )
+        return plan
+
+    @classmethod
+    def _obj_compile_backport_plan(
+        cls,
+        target_version: str,
+        manifest_versions: tuple[str | None, ...] | None,
+    ) -> _BackportPlan:
+        """Work out how to backport the sub-objects to a version.
+
+        :param target_version: The version of this object to backport to
+        :param manifest_versions: The versions given by the manifest for the
+                                  objects of the fields in _object_fields(),
+                                  or None to use obj_relationships
+        """
+        versions: dict[str, str | None] = {}
+        missing = set()
+        object_fields = _object_fields(cls)
+        for index, (name, _objname) in enumerate(object_fields):
+            if manifest_versions is None:
+                relationships = cls.obj_relationships.get(name)
+                if relationships is None:
+                    missing.add(name)
+                    continue
+            else:
+                version = manifest_versions[index]
+                if version is None:
+                    continue
+                relationships = [(target_version, version)]
+            try:
+                _get_subobject_version(
+                    target_version,
+                    relationships,
+                    functools.partial(versions.__setitem__, name),
+                )
+            except exception.TargetBeforeSubobjectExistedException:
+                versions[name] = None
+        return _BackportPlan(versions, frozenset(missing))
+
     def obj_make_compatible(
         self, primitive: dict[str, Any], target_version: str
     ) -> None:
@@ -747,48 +3649,394 @@ class VersionedObject:
         self,
         target_version: str | None = None,
         version_manifest: dict[str, str] | None = None,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
     ) -> dict[str, Any]:
         """Simple base-case dehydration.
 
-        This calls to_primitive() for each item in fields.
+        This calls to_primitive() for each item in fields.
+
+        The fields included can be narrowed with a projection, given as
+        dotted paths of field names. ``fields`` lists the only fields to
+        include and ``exclude`` the fields to leave out. A path like
+        ``foo.bar`` selects ``bar`` in the objects held by the ``foo``
+        field, which can be an ObjectField or a ListOfObjectsField, and the
+        paths given for a list object apply to its elements. Names which are
+        not fields of the object are ignored, so that the same projection
+        can be used with every version of it. Fields which are left out are
+        unset in the objects hydrated from the primitive.
+        """
+        memo = _shared_primitives.get()
+        if memo is not None:
+            if (
+                target_version is None
+                and not version_manifest
+                and fields is None
+                and not exclude
+            ):
+                shared = memo.get(id(self))
+                if shared is not None:
+                    return shared[1]
+            else:
+                memo = None
+        native = _native_primitives.get()
+        if native and (
+            version_manifest
+            or (target_version is not None and target_version != self.VERSION)
+        ):
+            # NOTE: obj_make_compatible() expects the primitive form of the
+            # field values, of this object as of its sub-objects
+            with _native_values(False):
+                return self.obj_to_primitive(
+                    target_version, version_manifest, fields, exclude
+                )
+        codec = self._obj_primitive_codec
+        if (
+            codec is not None
+            and codec.to_primitive is not None
+            and codec.owner is type(self)
+            and not version_manifest
+            and (target_version is None or target_version == self.VERSION)
+            and not self._obj_lazy
+            and fields is None
+            and not exclude
+        ):
+            if native:
+                assert codec.to_native is not None
+                result = codec.to_native(self)
+            else:
+                result = codec.to_primitive(self)
+            if memo is not None:
+                memo[id(self)] = (self, result)
+            return result
+        if target_version is None:
+            target_version = self.VERSION
+        if ObjectVersion.parse(target_version) > ObjectVersion.parse(
+            self.VERSION
+        ):
+            raise exception.InvalidTargetVersion(version=target_version)
+        primitive: dict[str, Any] = dict()
+        # NOTE: Deferred fields are still in the primitive form of this
+        # version. They are decoded if the compat step may modify them.
+        lazy = self._obj_lazy
+        if target_version != self.VERSION or version_manifest:
+            lazy = None
+        if fields is not None or exclude:
+            self._obj_project_fields(primitive, lazy, fields, exclude)
+        else:
+            for name, field in self.fields.items():
+                if lazy and name in lazy:
+                    primitive[name] = lazy[name]
+                elif self.obj_attr_is_set(name):
+                    to_primitive = (
+                        field.to_native if native else field.to_primitive
+                    )
+                    primitive[name] = to_primitive(
+                        self, name, self._obj_get_value(name)
+                    )
+        # NOTE(danms): If we know we're being asked for a different version,
+        # then do the compat step. However, even if we think we're not,
+        # we may have sub-objects that need it, so if we have a manifest we
+        # have to traverse this object just in case. Previously, we
+        # required a parent version bump for any child, so the target
+        # check was enough.
+        if target_version != self.VERSION or version_manifest:
+            self.obj_make_compatible_from_manifest(
+                primitive, target_version, version_manifest
+            )
+        obj = {
+            self._obj_primitive_key('name'): self.obj_name(),
+            self._obj_primitive_key('namespace'): (self.OBJ_PROJECT_NAMESPACE),
+            self._obj_primitive_key('version'): target_version,
+            self._obj_primitive_key('data'): primitive,
+        }
+        what_changed = self.obj_what_changed()
+        if what_changed:
+            # NOTE(cfriesen): if we're downgrading to a lower version, then
+            # it's possible that self.obj_what_changed() includes fields that
+            # no longer exist in the lower version.  If so, filter them out.
+            changes = [field for field in what_changed if field in primitive]
+            if changes:
+                obj[self._obj_primitive_key('changes')] = changes
+        if memo is not None:
+            memo[id(self)] = (self, obj)
+        return obj
+
+    def obj_to_json(self) -> str:
+        """Return the JSON text of the primitive of this object.
+
+        The text is the same as json.dumps(self.obj_to_primitive()), but the
+        primitive of each sub-object is only made when the JSON encoder
+        reaches it, so that the primitive of the whole tree of objects is
+        never held in memory at once. obj_from_json() hydrates the objects
+        back from the text.
+        """
+        with _native_values(False):
+            return json.dumps(self, default=_json_default)
+
+    @classmethod
+    def obj_from_json(
+        cls,
+        data: str | bytes,
+        context: Any = None,
+        trusted: bool = False,
+    ) -> Self:
+        """Hydrate an object from the JSON text of its primitive.
+
+        Each object is hydrated as soon as the JSON decoder has parsed its
+        primitive, so that the primitive of the whole tree of objects is
+        never held in memory at once. The text made by obj_to_json(), or by
+        json.dumps() from any primitive accepted by obj_from_primitive(), is
+        accepted. Texts holding dicts shaped like object primitives in
+        fields which do not hold objects are hydrated by
+        obj_from_primitive() once parsed instead.
+
+        :param data: The JSON text
+        :param context: Request context to set on the objects
+        :param trusted: Whether the primitive is trusted, as for
+                        obj_from_primitive()
+        """
+        if _is_overridden(cls, 'obj_from_primitive'):
+            return cls.obj_from_primitive(json.loads(data), context, trusted)
+        ns_key = cls._obj_primitive_key('namespace')
+        name_key = cls._obj_primitive_key('name')
+        version_key = cls._obj_primitive_key('version')
+        data_key = cls._obj_primitive_key('data')
+        ref_key = cls._obj_primitive_key('ref')
+        shared_key = cls._obj_primitive_key('shared')
+        # NOTE: As in obj_from_primitive_list(), the class of each object
+        # name and version is looked up once, along with its fields which
+        # can hold objects
+        hydrators: dict[
+            tuple[str, str, str],
+            tuple[
+                Callable[[dict[str, Any]], VersionedObject], tuple[str, ...]
+            ],
+        ] = {}
+        # Number of the objects hydrated which are not held by the object
+        # fields of the objects hydrated since
+        unclaimed = 0
+
+        def object_pairs_hook(pairs: list[tuple[str, Any]]) -> Any:
+            nonlocal unclaimed
+            value = dict(pairs)
+            if ref_key in value or shared_key in value:
+                raise _JSONFallback()
+            if name_key not in value:
+                return value
+            key = (value[ns_key], value[name_key], value[version_key])
+            objdata = value[data_key]
+            if (
+                type(objdata) is not dict
+                or key[0] != cls.OBJ_PROJECT_NAMESPACE
+            ):
+                raise _JSONFallback()
+            found = hydrators.get(key)
+            if found is None:
+                objclass = cls.obj_class_from_name(key[1], key[2])
+                found = hydrators[key] = (
+                    objclass._obj_make_hydrator(context, key[2]),
+                    tuple(
+                        name
+                        for name, field in objclass.fields.items()
+                        if _holds_objects(field)
+                    ),
+                )
+            hydrate, object_fields = found
+            for name in object_fields:
+                if name in objdata:
+                    unclaimed -= _count_objects(objdata[name])
+            unclaimed += 1
+            return hydrate(value)
+
+        try:
+            with _trust_primitives(trusted), _hydrate_eagerly():
+                obj = json.loads(data, object_pairs_hook=object_pairs_hook)
+        except Exception:
+            # NOTE: Such as for the dicts shaped like object primitives but
+            # which are not, or the primitives with shared objects, which
+            # must be hydrated before the objects referencing them. The
+            # whole primitive is hydrated from its field types instead,
+            # which also raises the error of the primitives which are
+            # invalid.
+            obj = _JSONFallback
+        if isinstance(obj, VersionedObject) and unclaimed == 1:
+            return obj  # type: ignore[return-value]
+        if obj is _JSONFallback or unclaimed != 0:
+            # NOTE: Objects were hydrated from dicts of fields which do not
+            # hold objects otherwise
+            obj = json.loads(data)
+        # NOTE: The objects of compact primitives are hydrated once parsed
+        return cls.obj_from_primitive(obj, context, trusted)
+
+    def obj_to_shared_primitive(
+        self,
+        target_version: str | None = None,
+        version_manifest: dict[str, str] | None = None,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        by_content: bool = False,
+    ) -> dict[str, Any]:
+        """Dehydrate this object, sharing its repeated sub-objects.
+
+        This is like obj_to_primitive(), but each sub-object held more than
+        once in this object, such as the same flavor in every element of a
+        list, is dehydrated once into a table of shared objects, and
+        referenced by its index in that table. obj_from_primitive() then
+        hydrates it once and sets the same instance in every place it is
+        referenced.
+
+        :param by_content: Whether to also share the sub-objects which are
+                           different instances with the same primitive,
+                           rather than only the same instances
+        """
+        token = None
+        if (
+            target_version is None or target_version == self.VERSION
+        ) and not version_manifest:
+            # NOTE: Primitives which may be backported in place are not
+            # shared, as their parents could backport them differently
+            token = _shared_primitives.set({})
+        try:
+            primitive = self.obj_to_primitive(
+                target_version, version_manifest, fields, exclude
+            )
+        finally:
+            if token is not None:
+                _shared_primitives.reset(token)
+        primitive, shared = _share_primitives(
+            primitive,
+            self._obj_primitive_key('name'),
+            self._obj_primitive_key('ref'),
+            by_content,
+        )
+        if shared:
+            primitive[self._obj_primitive_key('shared')] = shared
+        return primitive
+
+    def _obj_split_projection(
+        self, fields: Iterable[str] | None, exclude: Iterable[str] | None
+    ) -> tuple[_ProjectionPaths | None, _ProjectionPaths]:
+        """Split projection paths by the field name they start with."""
+        return (
+            None if fields is None else _split_projection_paths(fields),
+            _split_projection_paths(exclude) if exclude else {},
+        )
+
+    def _obj_project_fields(
+        self,
+        primitive: dict[str, Any],
+        lazy: dict[str, Any] | None,
+        fields: Iterable[str] | None,
+        exclude: Iterable[str] | None,
+    ) -> None:
+        """Add the primitives of the fields selected by a projection."""
+        include, excluded = self._obj_split_projection(fields, exclude)
+        for name, field in self.fields.items():
+            if include is not None and name not in include:
+                continue
+            sub_fields = None if include is None else include[name]
+            sub_exclude = excluded.get(name, [])
+            if sub_exclude is None:
+                continue
+            if sub_fields is None and not sub_exclude:
+                if lazy and name in lazy:
+                    primitive[name] = lazy[name]
+                elif self.obj_attr_is_set(name):
+                    to_primitive = (
+                        field.to_native
+                        if _native_primitives.get()
+                        else field.to_primitive
+                    )
+                    primitive[name] = to_primitive(
+                        self, name, self._obj_get_value(name)
+                    )
+            elif self.obj_attr_is_set(name):
+                primitive[name] = _project_primitive(
+                    self,
+                    name,
+                    self._obj_get_value(name),
+                    sub_fields,
+                    sub_exclude,
+                )
+
+    def obj_to_delta_primitive(self) -> dict[str, Any]:
+        """Dehydrate only the changes of this object.
+
+        This includes the fields which were set in full. Fields which only
+        changed because the sub-objects they hold were modified in place
+        carry a delta of those instead. The result can be applied with
+        obj_apply_delta() to an object of the same version in the state
+        this one was in when its changes were last reset.
         """
-        if target_version is None:
-            target_version = self.VERSION
-        if vutils.convert_version_to_tuple(
-            target_version
-        ) > vutils.convert_version_to_tuple(self.VERSION):
-            raise exception.InvalidTargetVersion(version=target_version)
-        primitive = dict()
+        changed = self.obj_what_changed()
+        data = {}
+        delta_fields = []
         for name, field in self.fields.items():
-            if self.obj_attr_is_set(name):
-                primitive[name] = field.to_primitive(
-                    self, name, getattr(self, name)
+            if name not in changed or not self.obj_attr_is_set(name):
+                continue
+            field_delta = None
+            if name not in self._changed_fields:
+                field_delta = self._obj_field_delta(name)
+            if field_delta is None:
+                data[name] = field.to_primitive(
+                    self, name, self._obj_get_value(name)
                 )
-        # NOTE(danms): If we know we're being asked for a different version,
-        # then do the compat step. However, even if we think we're not,
-        # we may have sub-objects that need it, so if we have a manifest we
-        # have to traverse this object just in case. Previously, we
-        # required a parent version bump for any child, so the target
-        # check was enough.
-        if target_version != self.VERSION or version_manifest:
-            self.obj_make_compatible_from_manifest(
-                primitive, target_version, version_manifest
-            )
-        obj = {
+            else:
+                data[name] = field_delta
+                delta_fields.append(name)
+        return {
             self._obj_primitive_key('name'): self.obj_name(),
-            self._obj_primitive_key('namespace'): (self.OBJ_PROJECT_NAMESPACE),
-            self._obj_primitive_key('version'): target_version,
-            self._obj_primitive_key('data'): primitive,
+            self._obj_primitive_key('namespace'): self.OBJ_PROJECT_NAMESPACE,
+            self._obj_primitive_key('version'): self.VERSION,
+            self._obj_primitive_key('data'): data,
+            self._obj_primitive_key('changes'): list(data),
+            self._obj_primitive_key('delta'): delta_fields,
         }
-        if self.obj_what_changed():
-            # NOTE(cfriesen): if we're downgrading to a lower version, then
-            # it's possible that self.obj_what_changed() includes fields that
-            # no longer exist in the lower version.  If so, filter them out.
-            what_changed = self.obj_what_changed()
-            changes = [field for field in what_changed if field in primitive]
-            if changes:
-                obj[self._obj_primitive_key('changes')] = changes
-        return obj
+
+    def _obj_field_delta(self, name: str) -> Any:
+        """Return the delta of a field changed in place, or None."""
+        value = getattr(self, name)
+        if isinstance(value, VersionedObject):
+            return value.obj_to_delta_primitive()
+        return None
+
+    def obj_apply_delta(self, delta: dict[str, Any]) -> None:
+        """Apply a delta from obj_to_delta_primitive() to this object.
+
+        The fields in the delta are set on this object, or patched in the
+        sub-objects they hold, so they are marked as changed here as well.
+
+        :param delta: The delta primitive, of an object of the same name
+                      and version as this one
+        :raises: IncompatibleObjectVersion if the delta is of a different
+                 version of the object
+        """
+        objname = self._obj_primitive_field(delta, 'name', None)
+        if objname != self.obj_name():
+            raise exception.ObjectActionError(
+                action='obj_apply_delta',
+                reason=f'delta is for a {objname} object',
+            )
+        objver = self._obj_primitive_field(delta, 'version')
+        if objver != self.VERSION:
+            raise exception.IncompatibleObjectVersion(
+                objname=objname, objver=objver, supported=self.VERSION
+            )
+        delta_fields = self._obj_primitive_field(delta, 'delta', None)
+        if delta_fields is None:
+            raise exception.ObjectActionError(
+                action='obj_apply_delta', reason='not a delta primitive'
+            )
+        for name, value in self._obj_primitive_field(delta, 'data').items():
+            if name in delta_fields:
+                self._obj_apply_field_delta(name, value)
+            else:
+                field = self.fields[name]
+                setattr(self, name, field.from_primitive(self, name, value))
+
+    def _obj_apply_field_delta(self, name: str, field_delta: Any) -> None:
+        getattr(self, name).obj_apply_delta(field_delta)
 
     def obj_set_defaults(self, *attrs: str) -> None:
         if not attrs:
@@ -828,18 +4076,29 @@ class VersionedObject:
 
     def obj_what_changed(self) -> set[str]:
         """Returns a set of fields that have been modified."""
-        changes = {
-            field for field in self._changed_fields if field in self.fields
-        }
-        for field in self.fields:
-            if (
-                self.obj_attr_is_set(field)
-                and isinstance(getattr(self, field), VersionedObject)
-                and getattr(self, field).obj_what_changed()
-            ):
-                changes.add(field)
+        changes = set()
+        mask = self._obj_changed_mask
+        if mask:
+            for name, bit in self._obj_get_field_index().bits.items():
+                if mask & bit:
+                    changes.add(name)
+        changes.update(self._obj_child_changes())
         return changes
 
+    def obj_has_changes(self) -> bool:
+        """Returns whether obj_what_changed() would return any fields.
+
+        Unlike obj_what_changed(), this does not need to look at unchanged
+        sub-objects.
+        """
+        if not self._obj_get_field_index().tracks_changes:
+            return bool(self.obj_what_changed())
+        if self._obj_changed_mask:
+            return True
+        if self._obj_changed_extra:
+            return bool(self.obj_what_changed())
+        return bool(self._obj_child_changes())
+
     def obj_get_changes(self) -> dict[str, Any]:
         """Returns a dict of changed fields and their new values."""
         changes: dict[str, Any] = {}
@@ -862,6 +4121,8 @@ class VersionedObject:
         Specifying fields on recursive resets will only be honored at the top
         level. Everything below the top will reset all.
         """
+        if self._obj_checked_access:
+            self._obj_cow_before_write()
         if recursive:
             for field in self.obj_get_changes():
                 # Ignore fields not in requested set (if applicable)
@@ -885,7 +4146,14 @@ class VersionedObject:
                     self.fields[field], obj_fields.ListOfObjectsField
                 ):
                     for thing in value:
-                        thing.obj_reset_changes(recursive=True)
+                        # Skip branches which are known to be unchanged
+                        if thing._obj_is_marked():
+                            thing.obj_reset_changes(recursive=True)
+
+            if not fields:
+                # All changed sub-objects were reset, so rescan them to
+                # clear the mark if they were the only reason for it
+                self._obj_child_changes()
 
         if fields:
             self._changed_fields -= set(fields)
@@ -899,16 +4167,34 @@ class VersionedObject:
         False if not. Raises AttributeError if attrname is not
         a valid attribute for this object.
         """
-        if attrname not in self.obj_fields:
+        field_index = self._obj_field_index
+        if field_index is None or field_index.owner is not type(self):
+            field_index = self._obj_get_field_index()
+        if attrname not in field_index.name_set:
             raise AttributeError(
                 _("%(objname)s object has no attribute '%(attrname)s'")
                 % {'objname': self.obj_name(), 'attrname': attrname}
             )
-        return hasattr(self, _get_attrname(attrname))
+        if self._obj_lazy is not None and attrname in self._obj_lazy:
+            return True
+        if self._obj_slots is not None:
+            index = self._obj_slots.get(attrname)
+            if index is not None:
+                return self._obj_values[index] is not _UnsetFieldSentinel
+        return hasattr(self, field_index.attrnames[attrname])
+
+    @classmethod
+    def _obj_get_field_index(cls) -> _FieldIndex:
+        # NOTE: Classes which were never registered or objectified (or which
+        # inherit the index of a parent) get an index computed on first use.
+        field_index = cls._obj_field_index
+        if field_index is None or field_index.owner is not cls:
+            field_index = cls._obj_field_index = _make_field_index(cls)
+        return field_index
 
     @property
     def obj_fields(self) -> list[str]:
-        return list(self.fields.keys()) + list(self.obj_extra_fields)
+        return list(self._obj_get_field_index().names)
 
     @property
     def obj_context(self) -> Any:
@@ -974,8 +4260,9 @@ class VersionedObjectDictCompat:
     def __iter__(self) -> Iterator[str]:
         # This mixin is always combined with VersionedObject
         vo = cast(VersionedObject, self)
-        for name in vo.obj_fields:
-            if vo.obj_attr_is_set(name) or name in vo.obj_extra_fields:
+        field_index = vo._obj_get_field_index()
+        for name in field_index.names:
+            if name in field_index.extra_names or vo.obj_attr_is_set(name):
                 yield name
 
     keys = __iter__
@@ -997,7 +4284,7 @@ class VersionedObjectDictCompat:
     def get(self, key: str, value: Any = _NotSpecifiedSentinel) -> Any:
         # This mixin is always combined with VersionedObject
         vo = cast(VersionedObject, self)
-        if key not in vo.obj_fields:
+        if key not in vo._obj_get_field_index().name_set:
             raise AttributeError(
                 f"'{self.__class__}' object has no attribute '{key}'"
             )
@@ -1075,49 +4362,242 @@ class ObjectListBase(Sequence[_VO]):
     def obj_make_compatible(
         self, primitive: dict[str, Any], target_version: str
     ) -> None:
+        version = self._obj_element_version(target_version)
+        if version is None:
+            # Child did not exist, so delete it from the primitive
+            del primitive['objects']
+        else:
+            _do_subobject_backport(version, self, 'objects', primitive)
+
+    def _obj_element_version(self, target_version: str) -> str | None:
+        """Return the version of the elements in a version of this list.
+
+        :returns: The version to backport the elements to, or None if they
+                  did not exist in target_version
+        """
+        # This mixin is always combined with VersionedObject
+        vo = cast(VersionedObject, self)
+        if vo._obj_uses_backport_plan():
+            return vo._obj_backport_plan(target_version).versions['objects']
+
         # Give priority to using child_versions, if that isn't set, try
         # obj_relationships
         if self.child_versions:
             relationships: Any = self.child_versions.items()
         else:
             try:
-                # This mixin is always combined with VersionedObject
-                relationships = cast(
-                    VersionedObject, self
-                )._obj_relationship_for('objects', target_version)
+                relationships = vo._obj_relationship_for(
+                    'objects', target_version
+                )
             except exception.ObjectActionError:
                 # No relationship for this found in manifest or
                 # in obj_relationships
                 relationships = {}
 
-        try:
-            # NOTE(rlrossit): If we have no version information, just
-            # backport to child version 1.0 (maintaining default
-            # behavior)
-            if relationships:
+        # NOTE(rlrossit): If we have no version information, just
+        # backport to child version 1.0 (maintaining default
+        # behavior)
+        versions = ['1.0']
+        if relationships:
+            try:
                 _get_subobject_version(
                     target_version,
                     relationships,
-                    lambda ver: _do_subobject_backport(
-                        ver,
-                        self,
-                        'objects',
-                        primitive,
-                    ),
+                    functools.partial(versions.__setitem__, 0),
                 )
-            else:
-                _do_subobject_backport('1.0', self, 'objects', primitive)
-        except exception.TargetBeforeSubobjectExistedException:
-            # Child did not exist, so delete it from the primitive
-            del primitive['objects']
+            except exception.TargetBeforeSubobjectExistedException:
+                return None
+        return versions[0]
+
+    def _obj_stream_header(self) -> VersionedObject:
+        """Return a copy of this list without its elements.
+
+        The copy holds the other fields, the context and the changes of this
+        list, so that its primitive is the one of this list without the
+        primitives of the elements.
+        """
+        # This mixin is always combined with VersionedObject
+        vo = cast(VersionedObject, self)
+        header = cast(VersionedObject, self.__class__())
+        header._context = self._context
+        for name in vo.fields:
+            if name != 'objects' and vo.obj_attr_is_set(name):
+                setattr(header, name, getattr(self, name))
+        if not vo.obj_attr_is_set('objects'):
+            delattr(header, 'objects')
+        header._changed_fields = vo.obj_what_changed()
+        return header
+
+    def iter_primitives(
+        self,
+        target_version: str | None = None,
+        version_manifest: dict[str, str] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Dehydrate this list one element at a time.
+
+        This yields the primitive of the list without its elements, as made
+        by obj_to_primitive() with an empty list, followed by the primitive
+        of each element. The primitive of each element is only made when it
+        is requested, so that the primitives of a long list do not all have
+        to be held in memory at once. from_primitive_stream() hydrates the
+        list from them.
+
+        The elements are backported as they are dehydrated, to the version
+        which obj_make_compatible() would backport them to. Nothing follows
+        the first primitive if the elements did not exist in target_version.
+        """
+        vo = cast(VersionedObject, self)
+        header = self._obj_stream_header()
+        primitive = header.obj_to_primitive(target_version, version_manifest)
+        yield primitive
+        if 'objects' not in vo._obj_primitive_field(primitive, 'data'):
+            return
+        version = None
+        manifest = version_manifest or None
+        if manifest or (
+            target_version is not None and target_version != vo.VERSION
+        ):
+            # NOTE: The manifest is stashed as obj_make_compatible() expects
+            vo._obj_version_manifest = manifest
+            try:
+                version = self._obj_element_version(
+                    target_version or vo.VERSION
+                )
+            finally:
+                delattr(vo, '_obj_version_manifest')
+        for element in self.objects:
+            primitive = element.obj_to_primitive()
+            # NOTE: As in _do_subobject_backport(), there is nothing to do
+            # for an element already at the version without a manifest
+            if version is not None and (
+                element.VERSION != version or manifest is not None
+            ):
+                element.obj_make_compatible_from_manifest(
+                    element._obj_primitive_field(primitive, 'data'),
+                    version,
+                    version_manifest=manifest,
+                )
+                primitive[element._obj_primitive_key('version')] = version
+            yield primitive
+
+    @classmethod
+    def from_primitive_stream(
+        cls,
+        primitives: Iterable[dict[str, Any]],
+        context: Any = None,
+        trusted: bool = False,
+    ) -> Self:
+        """Hydrate a list from the primitives yielded by iter_primitives().
+
+        The elements are hydrated and appended to the list one at a time, as
+        primitives is iterated, so it may be a generator receiving them.
+
+        :param primitives: The primitives made by iter_primitives()
+        :param context: Request context to set on the objects
+        :param trusted: Whether the primitives are trusted, as for
+                        obj_from_primitive()
+        """
+        base_class = cast(type[VersionedObject], cls)
+        primitives = iter(primitives)
+        objlist = base_class.obj_from_primitive(
+            next(primitives), context, trusted
+        )
+        # NOTE: obj_from_primitive_list() hydrates each primitive as it is
+        # iterated, looking up the class of the elements once
+        cast(ObjectListBase[Any], objlist).objects.extend(
+            base_class.obj_from_primitive_list(primitives, context, trusted)
+        )
+        return objlist  # type: ignore[return-value]
+
+    @classmethod
+    def _obj_compile_backport_plan(
+        cls,
+        target_version: str,
+        manifest_versions: tuple[str | None, ...] | None,
+    ) -> _BackportPlan:
+        # Give priority to using child_versions, if that isn't set, try
+        # obj_relationships or the manifest
+        relationships: Any
+        if cls.child_versions:
+            relationships = cls.child_versions.items()
+        elif manifest_versions is None:
+            relationships = cast(
+                type[VersionedObject], cls
+            ).obj_relationships.get('objects')
+        else:
+            # NOTE: 'objects' is the only field of the list object
+            version = manifest_versions[0]
+            relationships = version and [(target_version, version)]
+        # NOTE(rlrossit): If we have no version information, just
+        # backport to child version 1.0 (maintaining default
+        # behavior)
+        versions: dict[str, str | None] = {'objects': '1.0'}
+        if relationships:
+            try:
+                _get_subobject_version(
+                    target_version,
+                    relationships,
+                    functools.partial(versions.__setitem__, 'objects'),
+                )
+            except exception.TargetBeforeSubobjectExistedException:
+                versions['objects'] = None
+        return _BackportPlan(versions, frozenset())
+
+    def _obj_iter_children(self) -> Iterator[tuple[str, VersionedObject]]:
+        # This mixin is always combined with VersionedObject
+        vo = cast(VersionedObject, self)
+        if vo._obj_lazy and 'objects' in vo._obj_lazy:
+            return
+        for child in vo._obj_get_value('objects'):
+            yield 'objects', child
+
+    def _obj_primitive_child_changed(self, name: str, value: Any) -> bool:
+        return (
+            name == 'objects'
+            and isinstance(value, list)
+            and any(
+                _primitive_has_changes(cast(VersionedObject, self), item)
+                for item in value
+            )
+        )
+
+    def _obj_split_projection(
+        self, fields: Iterable[str] | None, exclude: Iterable[str] | None
+    ) -> tuple[_ProjectionPaths | None, _ProjectionPaths]:
+        # NOTE: The paths given for a list apply to its elements
+        include: _ProjectionPaths | None = None
+        if fields is not None:
+            include = dict.fromkeys(cast(VersionedObject, self).fields)
+            include['objects'] = list(fields)
+        return include, {'objects': list(exclude)} if exclude else {}
+
+    def _obj_field_delta(self, name: str) -> Any:
+        vo = cast(VersionedObject, self)
+        if name != 'objects':
+            return VersionedObject._obj_field_delta(vo, name)
+        # NOTE: Elements changed in place are sent by their position, since
+        # the list they are applied to must be the same as this one was
+        return {
+            str(index): element.obj_to_delta_primitive()
+            for index, element in enumerate(vo._obj_get_value('objects'))
+            if element.obj_has_changes()
+        }
+
+    def _obj_apply_field_delta(self, name: str, field_delta: Any) -> None:
+        vo = cast(VersionedObject, self)
+        if name != 'objects':
+            return VersionedObject._obj_apply_field_delta(
+                vo, name, field_delta
+            )
+        objects = getattr(vo, 'objects')
+        for index, element_delta in field_delta.items():
+            objects[int(index)].obj_apply_delta(element_delta)
 
     def obj_what_changed(self) -> set[str]:
-        # NOTE: This mixin expects to be combined with VersionedObject
         # This mixin is always combined with VersionedObject
-        changes = set(cast(VersionedObject, self)._changed_fields)
-        for child in self.objects:
-            if child.obj_what_changed():
-                changes.add('objects')
+        vo = cast(VersionedObject, self)
+        changes = set(vo._changed_fields)
+        changes.update(vo._obj_child_changes())
         return changes
 
     def __add__(self, other: ObjectListBase[_VO]) -> ObjectListBase[_VO]:
@@ -1150,6 +4630,180 @@ class ObjectListBase(Sequence[_VO]):
             )
 
 
+class ObjectProjection(NamedTuple):
+    """Fields requested for the objects returned by remote calls."""
+
+    # Paths of the fields to include, or None for all fields
+    fields: list[str] | None
+    # Paths of the fields to leave out
+    exclude: list[str] | None
+
+
+_projection: contextvars.ContextVar[ObjectProjection | None] = (
+    contextvars.ContextVar('oslo_versionedobjects_projection', default=None)
+)
+
+
+@contextlib.contextmanager
+def obj_projection(
+    fields: Iterable[str] | None = None, exclude: Iterable[str] | None = None
+) -> Iterator[ObjectProjection]:
+    """Request a projection of the objects returned by remote calls.
+
+    Objects returned by remotable methods called within this context are
+    serialized with only the given fields, as with the arguments of the
+    same name of obj_to_primitive(). This relies on the indirection API,
+    which gets the current projection with obj_get_projection() and passes
+    it to serialize_entity() of the serializer handling the result.
+    """
+    projection = ObjectProjection(
+        None if fields is None else list(fields),
+        list(exclude) if exclude else None,
+    )
+    token = _projection.set(projection)
+    try:
+        yield projection
+    finally:
+        _projection.reset(token)
+
+
+def obj_get_projection() -> ObjectProjection | None:
+    """Return the projection requested with obj_projection(), if any."""
+    return _projection.get()
+
+
+# Kinds of the entities handled by VersionedObjectSerializer. The kinds from
+# _ENTITY_DICT on are containers whose contents are processed in turn.
+_ENTITY_VALUE = 0
+_ENTITY_OBJECT = 1
+_ENTITY_HANDLER = 2
+# Entities of types whose instances may or may not have obj_to_primitive()
+_ENTITY_UNKNOWN = 3
+_ENTITY_DICT = 4
+_ENTITY_LIST = 5
+_ENTITY_TUPLE = 6
+_ENTITY_SET = 7
+
+# Types of entities which are never objects nor containers
+_VALUE_TYPES: frozenset[type] = frozenset(
+    [str, int, float, bool, bytes, type(None), datetime.datetime]
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _container_kind(entity_type: type) -> int:
+    """Return the kind of container of entity_type, if it is one."""
+    if issubclass(entity_type, dict):
+        return _ENTITY_DICT
+    elif issubclass(entity_type, set):
+        return _ENTITY_SET
+    elif issubclass(entity_type, tuple):
+        return _ENTITY_TUPLE
+    elif issubclass(entity_type, list):
+        return _ENTITY_LIST
+    return _ENTITY_VALUE
+
+
+class _SerializerDispatch(NamedTuple):
+    """Dispatch table computed for a serializer class.
+
+    The kinds of the entities met are added to ``kinds`` by type as they
+    are found, so that each entity then only needs a dict lookup.
+    """
+
+    # The class this table was computed for
+    owner: type[VersionedObjectSerializer]
+    # Whether entities can be processed without calling the methods which
+    # the class may override for each one of them
+    iterative: bool
+    kinds: dict[type, int]
+    # Mapping of the types with a handler to the handler found for them
+    handlers: dict[type, Callable[[Any, Any], Any]]
+
+
+# Set while a serializer overriding serialize_entity() processes the
+# contents of a container, to the projection arguments and the codec given
+# for the container, as the override is only called with the context and
+# each entity
+_serialize_options: contextvars.ContextVar[
+    tuple[dict[str, Any], obj_codec.Codec | None] | None
+] = contextvars.ContextVar('oslo_versionedobjects_serialize', default=None)
+
+
+def _make_serializer_dispatch(
+    cls: type[VersionedObjectSerializer],
+) -> _SerializerDispatch:
+    base = VersionedObjectSerializer
+    return _SerializerDispatch(
+        owner=cls,
+        iterative=all(
+            getattr(cls, name) is getattr(base, name)
+            for name in (
+                'serialize_entity',
+                'deserialize_entity',
+                '_process_iterable',
+            )
+        ),
+        kinds={value_type: _ENTITY_VALUE for value_type in _VALUE_TYPES},
+        handlers={},
+    )
+
+
+def _walk_entity(entity: Any, visit: Callable[[Any], tuple[int, Any]]) -> Any:
+    """Process entity and the contents of its containers, depth first.
+
+    visit() returns the kind of each entity, and the result of its
+    processing when it is not a container. Containers are rebuilt as
+    _process_iterable() does, using a stack rather than recursion.
+    """
+    kind, result = visit(entity)
+    if kind < _ENTITY_DICT:
+        return result
+    results: list[Any] = []
+    stack = [
+        (
+            kind,
+            entity,
+            iter(entity.values() if kind == _ENTITY_DICT else entity),
+            results,
+        )
+    ]
+    while True:
+        kind, container, values, results = stack[-1]
+        for value in values:
+            value_kind, result = visit(value)
+            if value_kind >= _ENTITY_DICT:
+                stack.append(
+                    (
+                        value_kind,
+                        value,
+                        iter(
+                            value.values()
+                            if value_kind == _ENTITY_DICT
+                            else value
+                        ),
+                        [],
+                    )
+                )
+                break
+            results.append(result)
+        else:
+            stack.pop()
+            if kind == _ENTITY_DICT:
+                if type(container) is dict:
+                    result = dict(zip(container, results))
+                else:
+                    result = type(container)(list(zip(container, results)))
+            elif kind == _ENTITY_TUPLE:
+                result = tuple(results)
+            else:
+                # NOTE: Sets become lists, see _process_iterable()
+                result = results
+            if not stack:
+                return result
+            stack[-1][3].append(result)
+
+
 class VersionedObjectSerializer(messaging.NoOpSerializer):  # type: ignore[misc]
     """A VersionedObject-aware Serializer.
 
@@ -1162,6 +4816,105 @@ class VersionedObjectSerializer(messaging.NoOpSerializer):  # type: ignore[misc]
     # Base class to use for object hydration
     OBJ_BASE_CLASS = VersionedObject
 
+    # Set to True to trust that the objects received were serialized by
+    # obj_to_primitive(), and to store the deserialized field values without
+    # coercing them again. Only use this between trusted services.
+    OBJ_TRUSTED_HYDRATION = False
+
+    # Set to True to dehydrate objects with obj_to_shared_primitive(), so
+    # that the sub-objects they hold several times are sent once. Objects
+    # are hydrated from such primitives whatever this is set to.
+    OBJ_SHARE_OBJECTS = False
+
+    # Set to True to also share the different sub-objects with the same
+    # primitive, when OBJ_SHARE_OBJECTS is set
+    OBJ_SHARE_BY_CONTENT = False
+
+    # Set to True to send objects in the compact envelope made by
+    # obj_compact_primitive(), once every service receiving them supports
+    # it. This can be set on an instance, for example when the RPC version
+    # negotiated with the peers is recent enough. Objects are hydrated from
+    # either envelope whatever this is set to.
+    OBJ_COMPACT_PRIMITIVES = False
+
+    # Codec encoding the primitives of the objects sent, or None to send the
+    # primitives themselves. As with OBJ_COMPACT_PRIMITIVES, this must only
+    # be set once every service receiving them supports it, and can also be
+    # given for each call to serialize_entity().
+    OBJ_CODEC: obj_codec.Codec | None = None
+
+    # Codecs of the objects received, keyed by name. Objects encoded by any
+    # of them are hydrated whatever OBJ_CODEC is set to.
+    OBJ_CODECS: dict[str, obj_codec.Codec] = {
+        codec.name: codec
+        for codec in (
+            obj_codec.BinaryCodec(),
+            obj_codec.JSONCodec(),
+            obj_codec.SchemaCodec(),
+        )
+    }
+
+    # Whether the transport carrying the entities can carry bytes. The
+    # bytes of the objects encoded by a codec are otherwise sent as base64
+    # text, as the oslo.messaging drivers sending messages as JSON require.
+    # Objects are hydrated from either form whatever this is set to.
+    OBJ_BINARY_TRANSPORT = False
+
+    # Compressor of the objects sent, or None to send them uncompressed.
+    # Objects whose bytes are at least OBJ_COMPRESSION_THRESHOLD long are
+    # compressed, after being encoded by the codec, or by JSONCodec if
+    # there is none. As with OBJ_CODEC, this must only be set once every
+    # service receiving them supports it.
+    OBJ_COMPRESSOR: obj_codec.Compressor | None = None
+
+    # Size in bytes from which objects are compressed, or None to use the
+    # compression_threshold option
+    OBJ_COMPRESSION_THRESHOLD: int | None = None
+
+    # Compressors of the objects received, keyed by name. Objects compressed
+    # by any of them are decompressed whatever OBJ_COMPRESSOR is set to.
+    OBJ_COMPRESSORS: dict[str, obj_codec.Compressor] = {
+        compressor.name: compressor
+        for compressor in (obj_codec.ZlibCompressor(),)
+    }
+
+    # Size in bytes of the largest object decompressed from the objects
+    # received, or None to use the max_decompressed_size option
+    OBJ_MAX_DECOMPRESSED_SIZE: int | None = None
+
+    # Functions serializing the entities of other types, keyed by type and
+    # called with the context and the entity. They apply to the subclasses
+    # of these types too, and the value returned is sent as is. This must
+    # be set on the class before it is used.
+    OBJ_SERIALIZE_HANDLERS: dict[type, Callable[[Any, Any], Any]] = {}
+
+    _obj_dispatch: _SerializerDispatch | None = None
+
+    @classmethod
+    def _obj_get_dispatch(cls) -> _SerializerDispatch:
+        dispatch = cls._obj_dispatch
+        if dispatch is None or dispatch.owner is not cls:
+            cls._obj_dispatch = dispatch = _make_serializer_dispatch(cls)
+        return dispatch
+
+    @classmethod
+    def _obj_entity_kind(cls, entity_type: type) -> int:
+        """Return the kind of the entities of entity_type when serialized."""
+        dispatch = cls._obj_get_dispatch()
+        for klass in entity_type.__mro__:
+            handler = cls.OBJ_SERIALIZE_HANDLERS.get(klass)
+            if handler is not None:
+                dispatch.handlers[entity_type] = handler
+                return _ENTITY_HANDLER
+        kind = _container_kind(entity_type)
+        if kind != _ENTITY_VALUE:
+            return kind
+        # NOTE: Instances of other classes may still get an
+        # obj_to_primitive() attribute of their own, as mocks do
+        if callable(getattr(entity_type, 'obj_to_primitive', None)):
+            return _ENTITY_OBJECT
+        return _ENTITY_UNKNOWN
+
     def _do_backport(
         self,
         context: Any,
@@ -1188,28 +4941,43 @@ class VersionedObjectSerializer(messaging.NoOpSerializer):  # type: ignore[misc]
             )
 
     def _process_object(
-        self, context: Any, objprim: dict[str, Any]
+        self,
+        context: Any,
+        objprim: dict[str, Any],
+        encoded: dict[str, Any] | None = None,
     ) -> VersionedObject | None:
         try:
+            if self.OBJ_TRUSTED_HYDRATION:
+                return self.OBJ_BASE_CLASS.obj_from_primitive(
+                    objprim, context=context, trusted=True
+                )
             return self.OBJ_BASE_CLASS.obj_from_primitive(
                 objprim, context=context
             )
         except exception.IncompatibleObjectVersion:
             with excutils.save_and_reraise_exception(reraise=False) as ctxt:
-                verkey = f'{self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE}.version'
+                serial_namespace = self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE
+                verkey = f'{serial_namespace}.version'
+                namekey = f'{serial_namespace}.name'
+                if _is_compact_primitive(objprim, serial_namespace):
+                    verkey = _compact_keys(serial_namespace)['version']
+                    namekey = _compact_keys(serial_namespace)['name']
                 objver = objprim[verkey]
                 if objver.count('.') == 2:
                     # NOTE(danms): For our purposes, the .z part of the version
                     # should be safe to accept without requiring a backport
                     objprim[verkey] = '.'.join(objver.split('.')[:2])
-                    return self._process_object(context, objprim)
-                namekey = f'{self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE}.name'
+                    return self._process_object(context, objprim, encoded)
                 objname = objprim[namekey]
-                supported = VersionedObjectRegistry.obj_classes().get(
-                    objname, []
-                )
+                supported = _registered_classes(objname)
                 if self.OBJ_BASE_CLASS.indirection_api and supported:
-                    return self._do_backport(context, objprim, supported[0])
+                    # NOTE: Encoded objects are backported as they were
+                    # received, as their primitive may hold native values
+                    return self._do_backport(
+                        context,
+                        objprim if encoded is None else encoded,
+                        supported[0],
+                    )
                 else:
                     ctxt.reraise = True
         return None
@@ -1245,27 +5013,316 @@ class VersionedObjectSerializer(messaging.NoOpSerializer):  # type: ignore[misc]
             # list
             return list([action_fn(context, value) for value in values])
 
-    def serialize_entity(self, context: Any, entity: Any) -> Any:
-        if isinstance(entity, (tuple, list, set, dict)):
-            entity = self._process_iterable(
+    def serialize_entity(
+        self,
+        context: Any,
+        entity: Any,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] | None = None,
+        codec: obj_codec.Codec | None = None,
+    ) -> Any:
+        """Serialize the objects in entity.
+
+        :param fields: Paths of the only fields to include in the objects
+        :param exclude: Paths of the fields to leave out of the objects
+        :param codec: Codec encoding the objects, rather than OBJ_CODEC
+
+        See obj_to_primitive() for the form of the paths.
+        """
+        kwargs: dict[str, Any] = {}
+        options = None
+        if fields is not None or exclude or codec is not None:
+            if fields is not None or exclude:
+                kwargs = {
+                    'fields': None if fields is None else list(fields),
+                    'exclude': list(exclude) if exclude else None,
+                }
+            options = (kwargs, codec)
+        else:
+            # NOTE: The contents of a container are processed with the
+            # arguments given for the container
+            options = _serialize_options.get()
+            if options is not None:
+                kwargs, codec = options
+        if codec is None:
+            codec = self.OBJ_CODEC
+        dispatch = self._obj_get_dispatch()
+        if dispatch.iterative:
+            return _walk_entity(
+                entity,
+                functools.partial(
+                    self._obj_serialize_value, dispatch, context, kwargs, codec
+                ),
+            )
+        kind, result = self._obj_serialize_value(
+            dispatch, context, kwargs, codec, entity
+        )
+        if kind < _ENTITY_DICT:
+            return result
+        if options is None:
+            return self._process_iterable(
+                context, self.serialize_entity, entity
+            )
+        token = _serialize_options.set(options)
+        try:
+            return self._process_iterable(
                 context, self.serialize_entity, entity
             )
-        elif hasattr(entity, 'obj_to_primitive') and callable(
-            entity.obj_to_primitive
+        finally:
+            _serialize_options.reset(token)
+
+    def _obj_serialize_value(
+        self,
+        dispatch: _SerializerDispatch,
+        context: Any,
+        kwargs: dict[str, Any],
+        codec: obj_codec.Codec | None,
+        entity: Any,
+    ) -> tuple[int, Any]:
+        """Return the kind of entity, and its primitive if not a container."""
+        entity_type = type(entity)
+        kind = dispatch.kinds.get(entity_type)
+        if kind is None:
+            kind = self._obj_entity_kind(entity_type)
+            dispatch.kinds[entity_type] = kind
+        if kind == _ENTITY_OBJECT:
+            if (
+                codec is not None
+                or self.OBJ_SHARE_OBJECTS
+                or self.OBJ_COMPACT_PRIMITIVES
+                or self.OBJ_COMPRESSOR is not None
+            ) and isinstance(entity, VersionedObject):
+                return kind, self._obj_to_primitive(entity, kwargs, codec)
+            return kind, entity.obj_to_primitive(**kwargs)
+        elif kind == _ENTITY_HANDLER:
+            return kind, dispatch.handlers[entity_type](context, entity)
+        elif kind == _ENTITY_UNKNOWN:
+            if hasattr(entity, 'obj_to_primitive') and callable(
+                entity.obj_to_primitive
+            ):
+                return kind, entity.obj_to_primitive(**kwargs)
+        return kind, entity
+
+    def _obj_to_primitive(
+        self,
+        obj: VersionedObject,
+        kwargs: dict[str, Any],
+        codec: obj_codec.Codec | None,
+    ) -> dict[str, Any]:
+        """Dehydrate an object as the class attributes request."""
+        with _native_values(codec is not None and codec.native):
+            if (
+                codec is not None
+                and not kwargs
+                and not self.OBJ_SHARE_OBJECTS
+                and not self.OBJ_COMPACT_PRIMITIVES
+            ):
+                return self._obj_encoded_entity(
+                    codec, codec.encode_object(obj)
+                )
+            if self.OBJ_SHARE_OBJECTS:
+                primitive = obj.obj_to_shared_primitive(
+                    by_content=self.OBJ_SHARE_BY_CONTENT, **kwargs
+                )
+            else:
+                primitive = obj.obj_to_primitive(**kwargs)
+        if self.OBJ_COMPACT_PRIMITIVES:
+            primitive = obj.obj_compact_primitive(primitive)
+        if codec is None:
+            if self.OBJ_COMPRESSOR is None:
+                return primitive
+            threshold = self._obj_compression_threshold()
+            # NOTE: Most objects are below the threshold, so their size is
+            # estimated rather than encoding them only to measure it
+            if _estimate_json_size(primitive, threshold) < threshold:
+                return primitive
+            json_codec = obj_codec.JSONCodec()
+            data = json_codec.encode(primitive)
+            if len(data) < threshold:
+                return primitive
+            return self._obj_encoded_entity(json_codec, data)
+        return self._obj_encoded_entity(codec, codec.encode(primitive))
+
+    def _obj_compression_threshold(self) -> int:
+        threshold = self.OBJ_COMPRESSION_THRESHOLD
+        if threshold is None:
+            threshold = CONF.oslo_versionedobjects.compression_threshold
+        return threshold
+
+    def _obj_encoded_entity(
+        self, codec: obj_codec.Codec, data: bytes
+    ) -> dict[str, Any]:
+        """Return the entity of the bytes of an object encoded by codec."""
+        serial_namespace = self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE
+        entity: dict[str, Any] = {f'{serial_namespace}.codec': codec.name}
+        compressor = self.OBJ_COMPRESSOR
+        if (
+            compressor is not None
+            and len(data) >= self._obj_compression_threshold()
         ):
-            entity = entity.obj_to_primitive()
+            compressed = compressor.compress(data)
+            # NOTE: Data which does not compress is sent as it is
+            if len(compressed) < len(data):
+                entity[f'{serial_namespace}.compressor'] = compressor.name
+                data = compressed
+        if self.OBJ_BINARY_TRANSPORT:
+            entity[f'{serial_namespace}.encoded'] = data
+        else:
+            entity[f'{serial_namespace}.encoded'] = base64.b64encode(
+                data
+            ).decode('ascii')
         return entity
 
+    def _obj_process_encoded(
+        self, context: Any, serial_namespace: str, entity: dict[str, Any]
+    ) -> VersionedObject | None:
+        """Hydrate an object from the primitive encoded by a codec."""
+        name = entity[f'{serial_namespace}.codec']
+        codec = self.OBJ_CODECS.get(name)
+        if codec is None:
+            raise exception.UnsupportedCodec(codec=name)
+        try:
+            return self._obj_decode_entity(
+                context, serial_namespace, codec, entity
+            )
+        except (
+            ValueError,
+            KeyError,
+            IndexError,
+            TypeError,
+            struct.error,
+            zlib.error,
+        ) as e:
+            # NOTE: Codecs and compressors may fail in many ways on data
+            # which was truncated or corrupted on the way, as may the
+            # hydration of what they decode from it
+            raise exception.InvalidEncodedObject(
+                reason=f'{type(e).__name__}: {e}'
+            )
+
+    def _obj_decode_entity(
+        self,
+        context: Any,
+        serial_namespace: str,
+        codec: obj_codec.Codec,
+        entity: dict[str, Any],
+    ) -> VersionedObject | None:
+        data = entity[f'{serial_namespace}.encoded']
+        if isinstance(data, str):
+            data = base64.b64decode(data, validate=True)
+        compressor_name = entity.get(f'{serial_namespace}.compressor')
+        if compressor_name is not None:
+            compressor = self.OBJ_COMPRESSORS.get(compressor_name)
+            if compressor is None:
+                raise exception.UnsupportedCompressor(
+                    compressor=compressor_name
+                )
+            limit = self.OBJ_MAX_DECOMPRESSED_SIZE
+            if limit is None:
+                limit = CONF.oslo_versionedobjects.max_decompressed_size
+            data = compressor.decompress(data, limit)
+            # NOTE: The limit is checked again for the compressors which
+            # do not stop at it
+            if len(data) > limit:
+                raise exception.DecompressedSizeExceeded(limit=limit)
+        with _trust_primitives(self.OBJ_TRUSTED_HYDRATION):
+            obj = codec.decode_object(self.OBJ_BASE_CLASS, data, context)
+        if obj is not None:
+            return obj
+        primitive = codec.decode(data)
+        if not isinstance(primitive, dict):
+            raise exception.InvalidEncodedObject(
+                reason=f'expected an object primitive, got '
+                f'{type(primitive).__name__}'
+            )
+        return self._process_object(context, primitive, encoded=entity)
+
     def deserialize_entity(self, context: Any, entity: Any) -> Any:
-        namekey = f'{self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE}.name'
-        if isinstance(entity, dict) and namekey in entity:
+        serial_namespace = self.OBJ_BASE_CLASS.OBJ_SERIAL_NAMESPACE
+        namekey = f'{serial_namespace}.name'
+        codeckey = f'{serial_namespace}.codec'
+        if self._obj_get_dispatch().iterative:
+            return _walk_entity(
+                entity,
+                functools.partial(
+                    self._obj_deserialize_value,
+                    namekey,
+                    codeckey,
+                    serial_namespace,
+                    context,
+                ),
+            )
+        if isinstance(entity, dict) and (
+            namekey in entity
+            or _is_compact_primitive(entity, serial_namespace)
+        ):
             entity = self._process_object(context, entity)
+        elif isinstance(entity, dict) and codeckey in entity:
+            entity = self._obj_process_encoded(
+                context, serial_namespace, entity
+            )
         elif isinstance(entity, (tuple, list, set, dict)):
             entity = self._process_iterable(
                 context, self.deserialize_entity, entity
             )
         return entity
 
+    def _obj_deserialize_value(
+        self,
+        namekey: str,
+        codeckey: str,
+        serial_namespace: str,
+        context: Any,
+        entity: Any,
+    ) -> tuple[int, Any]:
+        """Return the kind of entity, and the object it holds if any."""
+        kind = _container_kind(type(entity))  # type: ignore[arg-type]
+        if kind == _ENTITY_DICT:
+            if namekey in entity or _is_compact_primitive(
+                entity, serial_namespace
+            ):
+                return _ENTITY_OBJECT, self._process_object(context, entity)
+            if codeckey in entity:
+                return _ENTITY_OBJECT, self._obj_process_encoded(
+                    context, serial_namespace, entity
+                )
+        return kind, entity
+
+    def serialize_stream(
+        self,
+        context: Any,
+        objlist: ObjectListBase[Any],
+        codec: obj_codec.Codec | None = None,
+    ) -> Iterator[Any]:
+        """Serialize a list of objects one element at a time.
+
+        This yields the serialized list without its elements, followed by
+        each element serialized as serialize_entity() would, so that they
+        can be sent as they are made. deserialize_stream() deserializes the
+        list from them.
+
+        :param codec: Codec encoding the objects, rather than OBJ_CODEC
+        """
+        if codec is None:
+            codec = self.OBJ_CODEC
+        yield self._obj_to_primitive(objlist._obj_stream_header(), {}, codec)
+        if cast(VersionedObject, objlist).obj_attr_is_set('objects'):
+            for element in objlist.objects:
+                yield self._obj_to_primitive(element, {}, codec)
+
+    def deserialize_stream(self, context: Any, entities: Iterable[Any]) -> Any:
+        """Deserialize a list of objects made by serialize_stream().
+
+        The elements are deserialized and appended to the list one at a
+        time, as entities is iterated. Each of them is backported on its own
+        if its version is not supported, as deserialize_entity() does.
+        """
+        entities = iter(entities)
+        objlist = self.deserialize_entity(context, next(entities))
+        for entity in entities:
+            objlist.objects.append(self.deserialize_entity(context, entity))
+        return objlist
+
 
 class VersionedObjectIndirectionAPI(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -1354,6 +5411,11 @@ class VersionedObjectIndirectionAPI(metaclass=abc.ABCMeta):
         will fall back to object_class_action(). New implementations should
         provide this method instead of object_class_action()
 
+        If the caller requested a projection of the result with
+        obj_projection(), obj_get_projection() returns it while this is
+        called. Implementations should pass it along with the call and
+        serialize the result with it.
+
         :param context: The context within which to perform the action
         :param objname: The registry name of the object
         :param objmethod: The name of the action method to call
@@ -1447,7 +5509,9 @@ def obj_make_list(
     """Construct an object list from a list of primitives.
 
     This calls item_cls._from_db_object() on each item of db_list, and
-    adds the resulting object to list_obj.
+    adds the resulting object to list_obj. Classes which declare
+    obj_db_columns are built with obj_from_db_rows() instead, unless
+    extra_args are given.
 
     :param:context: Request context
     :param:list_obj: An ObjectListBase object
@@ -1456,15 +5520,33 @@ def obj_make_list(
     :param:extra_args: Extra arguments to pass to _from_db_object()
     :returns: list_obj
     """
-    list_obj.objects = []
-    for db_item in db_list:
-        # _from_db_object is a convention classmethod for VersionedObject
-        # subclasses that work with database backends; it is not declared in
-        # the VersionedObject base class since not all objects support it
-        item = getattr(item_cls, '_from_db_object')(
-            context, item_cls(), db_item, **extra_args
-        )
-        list_obj.objects.append(item)
+    if item_cls.obj_db_columns is not None and not extra_args:
+        list_obj.objects = []
+        objects = item_cls.obj_from_db_rows(context, db_list)
+        field_type = cast(VersionedObject, list_obj).fields['objects']._type
+        if (
+            isinstance(field_type, obj_fields.List)
+            and isinstance(field_type._element_type._type, obj_fields.Object)
+            and field_type._element_type._type._obj_name == item_cls.obj_name()
+        ):
+            # NOTE: The objects are of the element type of the list, so
+            # they are added without coercing each one. The list adopts
+            # them on its next change scan.
+            list.extend(list_obj.objects, objects)
+            cast(VersionedObject, list_obj)._obj_mark_child_dirty()
+        else:
+            list_obj.objects.extend(objects)
+    else:
+        list_obj.objects = []
+        for db_item in db_list:
+            # _from_db_object is a convention classmethod for VersionedObject
+            # subclasses that work with database backends; it is not declared
+            # in the VersionedObject base class since not all objects support
+            # it
+            item = getattr(item_cls, '_from_db_object')(
+                context, item_cls(), db_item, **extra_args
+            )
+            list_obj.objects.append(item)
     # list_obj is always an ObjectListBase combined with VersionedObject
     list_obj._context = context
     cast(VersionedObject, list_obj).obj_reset_changes()
@@ -1484,30 +5566,57 @@ def obj_tree_get_versions(
 
       {'MyObject': '1.23', ... }
 
+    The mapping is made once for each object name until a class is
+    registered, and a copy of it is returned.
+
     :param objname: The top-level object at which to start
     :param tree: Used internally, pass None here.
     :returns: A dictionary of object names and versions
     """
-    if tree is None:
-        tree = {}
+    # NOTE: The caches are fetched first, so that what is found while a
+    # class is registered is stored in the caches being replaced
+    manifests = VersionedObjectRegistry._obj_manifests
+    dependencies = VersionedObjectRegistry._obj_dependencies
+    if tree is not None:
+        return _obj_tree_versions(objname, tree, dependencies)
+    manifest = manifests.get(objname)
+    if manifest is None:
+        manifest = manifests[objname] = _obj_tree_versions(
+            objname, {}, dependencies
+        )
+    return dict(manifest)
+
+
+def _obj_dependencies(
+    objname: str, dependencies: dict[str, tuple[str, tuple[str, ...]]]
+) -> tuple[str, tuple[str, ...]]:
+    """Return the version and the child object names of an object."""
+    cached = dependencies.get(objname)
+    if cached is not None:
+        return cached
+    objclass = _registered_classes(objname)[0]
+    children = []
+    for field in objclass.fields.values():
+        if isinstance(
+            field, (obj_fields.ObjectField, obj_fields.ListOfObjectsField)
+        ):
+            # These store objname directly as an instance attribute
+            children.append(field.objname)
+    result = dependencies[objname] = (objclass.VERSION, tuple(children))
+    return result
+
+
+def _obj_tree_versions(
+    objname: str,
+    tree: dict[str, str],
+    dependencies: dict[str, tuple[str, tuple[str, ...]]],
+) -> dict[str, str]:
     if objname in tree:
         return tree
-    objclass = VersionedObjectRegistry.obj_classes()[objname][0]
-    tree[objname] = objclass.VERSION
-    for field_name in objclass.fields:
-        field = objclass.fields[field_name]
-        if isinstance(field, obj_fields.ObjectField):
-            # ObjectField stores objname directly as an instance attribute
-            child_cls = field.objname
-        elif isinstance(field, obj_fields.ListOfObjectsField):
-            # ListOfObjectsField stores objname directly as an instance
-            # attribute
-            child_cls = field.objname
-        else:
-            continue
-
+    tree[objname], children = _obj_dependencies(objname, dependencies)
+    for child_cls in children:
         try:
-            obj_tree_get_versions(child_cls, tree=tree)
+            _obj_tree_versions(child_cls, tree, dependencies)
         except IndexError:
             raise exception.UnregisteredSubobject(
                 child_objname=child_cls, parent_objname=objname
@@ -1515,6 +5624,47 @@ def obj_tree_get_versions(
     return tree
 
 
+class _BackportPlan(NamedTuple):
+    """How to backport the sub-objects of an object to a version."""
+
+    # The version to backport the sub-object of each field to, or None if
+    # the field did not exist in the version. Fields not included are left
+    # as they are.
+    versions: dict[str, str | None]
+    # The fields with no rule to backport them
+    missing: frozenset[str]
+
+
+# Largest number of backport plans kept for a class
+_MAX_BACKPORT_PLANS = 256
+
+
+class _BackportPlans(NamedTuple):
+    """The backport plans of a class, and the rules they were made from."""
+
+    owner: type[VersionedObject]
+    generation: int
+    fields: MutableMapping[str, obj_fields.Field[Any]]
+    relationships: dict[str, list[tuple[str, str]]]
+    child_versions: Mapping[str, str] | None
+    # The object fields of the class, as _object_fields() returns them
+    object_fields: tuple[tuple[str, str], ...]
+    # The plans, by target version and manifest versions
+    plans: dict[tuple[str, tuple[str | None, ...] | None], _BackportPlan]
+
+
+def _object_fields(cls: type[Any]) -> tuple[tuple[str, str], ...]:
+    """Return the names of the object fields of a class and their objects."""
+    return tuple(
+        # These store objname directly as an instance attribute
+        (name, cast(obj_fields.ObjectField, field).objname)
+        for name, field in cls.fields.items()
+        if isinstance(
+            field, (obj_fields.ObjectField, obj_fields.ListOfObjectsField)
+        )
+    )
+
+
 def _get_subobject_version(
     tgt_version: str,
     relationships: list[tuple[str, str]] | Any,
@@ -1535,10 +5685,10 @@ def _get_subobject_version(
                           version
     :returns: The version we need to convert the subobject to
     """
-    tgt = vutils.convert_version_to_tuple(tgt_version)
+    tgt = ObjectVersion.parse(tgt_version)
     for index, versions in enumerate(relationships):
         parent, child = versions
-        parent = vutils.convert_version_to_tuple(parent)
+        parent = ObjectVersion.parse(parent)
         if tgt < parent:
             if index == 0:
                 # We're backporting to a version of the parent that did
@@ -1580,6 +5730,10 @@ def _do_subobject_backport(
         primitive[field][ver_key] = to_version
     elif isinstance(obj, list):
         for i, element in enumerate(obj):
+            # NOTE: As in obj_to_primitive(), there is nothing to do for an
+            # element already at the version without a manifest
+            if element.VERSION == to_version and manifest is None:
+                continue
             element.obj_make_compatible_from_manifest(
                 element._obj_primitive_field(primitive[field][i], 'data'),
                 to_version,
@@ -0,0 +1,920 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Codecs encoding object primitives to bytes.
+
+A codec is given to the
+:class:`oslo_versionedobjects.base.VersionedObjectSerializer` to send each
+object as the bytes it encodes its primitive to, rather than as the primitive
+itself. Codecs whose ``native`` attribute is set are given
+primitives whose field values are serialized with ``to_native()`` rather
+than ``to_primitive()``, so that datetimes, IP addresses and sets are
+encoded in a form of their own rather than converted to strings and lists.
+
+Codecs may also encode the objects themselves rather than their primitives,
+as :class:`SchemaCodec` does with the layouts generated for object classes.
+
+The bytes of the objects may then be compressed by a compressor, such as
+:class:`ZlibCompressor`, when they are larger than a threshold.
+"""
+
+from __future__ import annotations
+
+import abc
+from collections.abc import Callable
+import datetime
+import json
+import struct
+import zlib
+from typing import Any, NamedTuple, TYPE_CHECKING
+
+import netaddr
+
+from oslo_versionedobjects import exception
+
+if TYPE_CHECKING:
+    from oslo_versionedobjects import base
+
+
+class Codec(metaclass=abc.ABCMeta):
+    """Encoding of object primitives to bytes."""
+
+    #: Name identifying the codec in the entities it encoded
+    name: str
+
+    #: Whether primitives given to encode() may hold the values returned by
+    #: the to_native() method of the field types
+    native = False
+
+    @abc.abstractmethod
+    def encode(self, primitive: Any) -> bytes:
+        """Encode a primitive to bytes."""
+        ...
+
+    @abc.abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode the bytes returned by encode() to a primitive."""
+        ...
+
+    def encode_object(self, obj: base.VersionedObject) -> bytes:
+        """Encode an object to bytes.
+
+        This is used for the objects sent whole, and encode() for the
+        primitives of the others. The bytes returned must be accepted by
+        decode() too.
+        """
+        return self.encode(obj.obj_to_primitive())
+
+    def decode_object(
+        self,
+        base_class: type[base.VersionedObject],
+        data: bytes,
+        context: Any,
+    ) -> base.VersionedObject | None:
+        """Hydrate the object encoded by encode_object().
+
+        :param base_class: Class to look up the classes of the objects from
+        :param data: The bytes returned by encode_object()
+        :param context: Request context to set on the objects
+        :returns: The object, or None if it must be hydrated from the
+                  primitive returned by decode() instead, as when its
+                  version is not the one supported here
+        """
+        return None
+
+
+class JSONCodec(Codec):
+    """Codec encoding primitives as JSON text."""
+
+    name = 'json'
+
+    def encode(self, primitive: Any) -> bytes:
+        return json.dumps(primitive).encode('utf-8')
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class DirectJSONCodec(JSONCodec):
+    """Codec encoding objects as JSON text without whole primitives.
+
+    The text is the same as the one of :class:`JSONCodec`, but the objects
+    sent whole are written with ``obj_to_json()`` and hydrated with
+    ``obj_from_json()``, which make and hydrate the primitive of one object
+    at a time rather than the primitive of the whole tree of objects. Its
+    name is the one of :class:`JSONCodec`, so either decodes the text of
+    the other.
+    """
+
+    def encode_object(self, obj: base.VersionedObject) -> bytes:
+        return obj.obj_to_json().encode('utf-8')
+
+    def decode_object(
+        self,
+        base_class: type[base.VersionedObject],
+        data: bytes,
+        context: Any,
+    ) -> base.VersionedObject | None:
+        try:
+            return base_class.obj_from_json(data, context)
+        except exception.VersionedObjectsException:
+            # NOTE: Objects of versions not supported here are hydrated
+            # from the primitive, so that they can be backported
+            return None
+
+
+_FORMAT_VERSION = 1
+
+# Tags of the values encoded by BinaryCodec
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT32 = 3
+_INT64 = 4
+_BIGINT = 5
+_FLOAT = 6
+_STR = 7
+_BYTES = 8
+_LIST = 9
+_TUPLE = 10
+_DICT = 11
+_SET = 12
+_DATETIME = 13
+_NAIVE_DATETIME = 14
+_IPV4_ADDRESS = 15
+_IPV6_ADDRESS = 16
+_IPV4_NETWORK = 17
+_IPV6_NETWORK = 18
+# A string already encoded in the same primitive, by its index
+_STR_REF = 19
+
+_INT32_MIN = -(2**31)
+_INT32_MAX = 2**31 - 1
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+# Strings of up to this many bytes are encoded once in each primitive, and
+# referenced by their index when repeated, as with field names and the keys
+# of the envelope of objects
+_MAX_SHARED_STR_SIZE = 64
+_MAX_SHARED_STRS = 65536
+
+_TAG = struct.Struct('<B')
+_SIZE = struct.Struct('<BI')
+_STR_REF_VALUE = struct.Struct('<BH')
+_INT32_VALUE = struct.Struct('<Bi')
+_INT64_VALUE = struct.Struct('<Bq')
+_FLOAT_VALUE = struct.Struct('<Bd')
+_DATETIME_VALUE = struct.Struct('<Bqi')
+_IPV4_VALUE = struct.Struct('<BI')
+_IPV4_NETWORK_VALUE = struct.Struct('<BIB')
+_IPV6_NETWORK_PREFIX = struct.Struct('<BB')
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_SECOND = datetime.timedelta(seconds=1)
+
+_ITEM_TAGS: dict[type, int] = {
+    list: _LIST,
+    tuple: _TUPLE,
+    set: _SET,
+    frozenset: _SET,
+}
+
+
+def _datetime_micros(value: datetime.datetime) -> int:
+    """Return the microseconds from the epoch to the wall time of value."""
+    seconds = (
+        (value.toordinal() - _EPOCH_ORDINAL) * 86400
+        + value.hour * 3600
+        + value.minute * 60
+        + value.second
+    )
+    return seconds * 1000000 + value.microsecond
+
+
+def _encode_large_int(value: int, out: list[bytes]) -> None:
+    if _INT64_MIN <= value <= _INT64_MAX:
+        out.append(_INT64_VALUE.pack(_INT64, value))
+    else:
+        data = value.to_bytes(
+            (value.bit_length() + 8) // 8, 'little', signed=True
+        )
+        out.append(_SIZE.pack(_BIGINT, len(data)))
+        out.append(data)
+
+
+def _encode_float(value: float, out: list[bytes]) -> None:
+    out.append(_FLOAT_VALUE.pack(_FLOAT, value))
+
+
+def _encode_bytes(value: bytes, out: list[bytes]) -> None:
+    out.append(_SIZE.pack(_BYTES, len(value)))
+    out.append(value)
+
+
+def _encode_datetime(value: datetime.datetime, out: list[bytes]) -> None:
+    offset = value.utcoffset()
+    if offset is None:
+        out.append(_INT64_VALUE.pack(_NAIVE_DATETIME, _datetime_micros(value)))
+    else:
+        out.append(
+            _DATETIME_VALUE.pack(
+                _DATETIME, _datetime_micros(value), offset // _SECOND
+            )
+        )
+
+
+def _encode_ip_address(value: netaddr.IPAddress, out: list[bytes]) -> None:
+    if value.version == 4:
+        out.append(_IPV4_VALUE.pack(_IPV4_ADDRESS, int(value)))
+    else:
+        out.append(_TAG.pack(_IPV6_ADDRESS))
+        out.append(value.packed)
+
+
+def _encode_ip_network(value: netaddr.IPNetwork, out: list[bytes]) -> None:
+    if value.version == 4:
+        out.append(
+            _IPV4_NETWORK_VALUE.pack(
+                _IPV4_NETWORK, int(value.ip), value.prefixlen
+            )
+        )
+    else:
+        out.append(_IPV6_NETWORK_PREFIX.pack(_IPV6_NETWORK, value.prefixlen))
+        out.append(value.ip.packed)
+
+
+# Encoders of the values which are not strings, containers, integers,
+# booleans or None, keyed by their exact type
+_VALUE_ENCODERS: dict[type, Callable[[Any, list[bytes]], None]] = {
+    float: _encode_float,
+    bytes: _encode_bytes,
+    datetime.datetime: _encode_datetime,
+    netaddr.IPAddress: _encode_ip_address,
+    netaddr.IPNetwork: _encode_ip_network,
+}
+
+
+def _exact_datetime(value: datetime.datetime) -> datetime.datetime:
+    return datetime.datetime(
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond,
+        value.tzinfo,
+    )
+
+
+# Conversions of the instances of subclasses of the types encoded to the
+# type itself, looked up in order
+_BASE_TYPES: tuple[
+    tuple[type | tuple[type, ...], Callable[[Any], Any]], ...
+] = (
+    (bool, bool),
+    (int, int),
+    (float, float),
+    (str, str.__str__),
+    ((bytes, bytearray, memoryview), bytes),
+    (list, list),
+    (tuple, tuple),
+    (dict, dict),
+    ((set, frozenset), set),
+    (datetime.datetime, _exact_datetime),
+    (netaddr.IPAddress, netaddr.IPAddress),
+    (netaddr.IPNetwork, netaddr.IPNetwork),
+)
+
+
+def _base_value(value: Any) -> Any:
+    for base_type, convert in _BASE_TYPES:
+        if isinstance(value, base_type):
+            return convert(value)
+    raise TypeError(f'{type(value).__name__} values can not be encoded')
+
+
+def _value_encoder(out: list[bytes]) -> Callable[[Any], None]:
+    """Return a function appending the encoding of values to out."""
+    append = out.append
+    strings: dict[str, bytes] = {}
+
+    def encode(value: Any) -> None:
+        value_type = type(value)
+        if value_type is str:
+            ref = strings.get(value)
+            if ref is not None:
+                append(ref)
+                return
+            data = value.encode('utf-8')
+            append(_SIZE.pack(_STR, len(data)))
+            append(data)
+            if (
+                len(data) <= _MAX_SHARED_STR_SIZE
+                and len(strings) < _MAX_SHARED_STRS
+            ):
+                strings[value] = _STR_REF_VALUE.pack(_STR_REF, len(strings))
+        elif value_type is dict:
+            append(_SIZE.pack(_DICT, len(value)))
+            for key, item in value.items():
+                encode(key)
+                encode(item)
+        elif value_type is int:
+            if _INT32_MIN <= value <= _INT32_MAX:
+                append(_INT32_VALUE.pack(_INT32, value))
+            else:
+                _encode_large_int(value, out)
+        elif value_type in _ITEM_TAGS:
+            append(_SIZE.pack(_ITEM_TAGS[value_type], len(value)))
+            for item in value:
+                encode(item)
+        elif value is None:
+            append(b'\x00')
+        elif value_type is bool:
+            append(b'\x02' if value else b'\x01')
+        else:
+            encoder = _VALUE_ENCODERS.get(value_type)
+            if encoder is None:
+                encode(_base_value(value))
+            else:
+                encoder(value, out)
+
+    return encode
+
+
+def _encode(primitive: Any) -> bytes:
+    out = [_TAG.pack(_FORMAT_VERSION)]
+    _value_encoder(out)(primitive)
+    return b''.join(out)
+
+
+def _value_decoder(data: bytes) -> Callable[[int], tuple[Any, int]]:
+    """Return a function decoding the value of data at an offset.
+
+    The function returns the value and the offset following it.
+    """
+    strings: list[str] = []
+
+    def decode(offset: int) -> tuple[Any, int]:
+        tag = data[offset]
+        if tag == _STR_REF:
+            index = _STR_REF_VALUE.unpack_from(data, offset)[1]
+            return strings[index], offset + 3
+        elif tag == _STR:
+            size = _SIZE.unpack_from(data, offset)[1]
+            end = offset + 5 + size
+            value = data[offset + 5 : end].decode('utf-8')
+            if (
+                size <= _MAX_SHARED_STR_SIZE
+                and len(strings) < _MAX_SHARED_STRS
+            ):
+                strings.append(value)
+            return value, end
+        elif tag == _DICT:
+            size = _SIZE.unpack_from(data, offset)[1]
+            offset += 5
+            result = {}
+            for _ in range(size):
+                key, offset = decode(offset)
+                result[key], offset = decode(offset)
+            return result, offset
+        elif tag == _INT32:
+            return _INT32_VALUE.unpack_from(data, offset)[1], offset + 5
+        elif tag == _NONE:
+            return None, offset + 1
+        elif tag == _TRUE:
+            return True, offset + 1
+        elif tag == _FALSE:
+            return False, offset + 1
+        elif tag == _LIST or tag == _TUPLE or tag == _SET:
+            size = _SIZE.unpack_from(data, offset)[1]
+            offset += 5
+            items = []
+            for _ in range(size):
+                item, offset = decode(offset)
+                items.append(item)
+            if tag == _TUPLE:
+                return tuple(items), offset
+            elif tag == _SET:
+                return set(items), offset
+            return items, offset
+        elif tag == _DATETIME:
+            _, micros, utcoffset = _DATETIME_VALUE.unpack_from(data, offset)
+            if utcoffset:
+                tzinfo = datetime.timezone(
+                    datetime.timedelta(seconds=utcoffset)
+                )
+            else:
+                tzinfo = datetime.timezone.utc
+            wall_time = _EPOCH + datetime.timedelta(microseconds=micros)
+            return wall_time.replace(tzinfo=tzinfo), offset + 13
+        elif tag == _NAIVE_DATETIME:
+            micros = _INT64_VALUE.unpack_from(data, offset)[1]
+            wall_time = _EPOCH + datetime.timedelta(microseconds=micros)
+            return wall_time, offset + 9
+        elif tag == _INT64:
+            return _INT64_VALUE.unpack_from(data, offset)[1], offset + 9
+        elif tag == _FLOAT:
+            return _FLOAT_VALUE.unpack_from(data, offset)[1], offset + 9
+        elif tag == _BYTES:
+            size = _SIZE.unpack_from(data, offset)[1]
+            offset += 5
+            return data[offset : offset + size], offset + size
+        elif tag == _BIGINT:
+            size = _SIZE.unpack_from(data, offset)[1]
+            offset += 5
+            number = int.from_bytes(
+                data[offset : offset + size], 'little', signed=True
+            )
+            return number, offset + size
+        elif tag == _IPV4_ADDRESS:
+            address = _IPV4_VALUE.unpack_from(data, offset)[1]
+            return netaddr.IPAddress(address, version=4), offset + 5
+        elif tag == _IPV6_ADDRESS:
+            address = int.from_bytes(data[offset + 1 : offset + 17], 'big')
+            return netaddr.IPAddress(address, version=6), offset + 17
+        elif tag == _IPV4_NETWORK:
+            _, address, prefixlen = _IPV4_NETWORK_VALUE.unpack_from(
+                data, offset
+            )
+            network = netaddr.IPNetwork((address, prefixlen), version=4)
+            return network, offset + 6
+        elif tag == _IPV6_NETWORK:
+            prefixlen = data[offset + 1]
+            address = int.from_bytes(data[offset + 2 : offset + 18], 'big')
+            network = netaddr.IPNetwork((address, prefixlen), version=6)
+            return network, offset + 18
+        raise ValueError(f'Unknown tag {tag} at offset {offset}')
+
+    return decode
+
+
+def _decode(data: bytes) -> Any:
+    if not data or data[0] != _FORMAT_VERSION:
+        raise ValueError('Unsupported binary primitive format')
+    try:
+        value, offset = _value_decoder(data)(1)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f'Truncated binary primitive: {e}')
+    except (OverflowError, netaddr.AddrFormatError) as e:
+        raise ValueError(f'Invalid value in binary primitive: {e}')
+    if offset != len(data):
+        raise ValueError('Unexpected data after the binary primitive')
+    return value
+
+
+class BinaryCodec(Codec):
+    """Codec encoding primitives in a tagged binary form.
+
+    Besides the types of JSON, this encodes bytes, tuples and sets, and
+    encodes datetimes as microseconds from the epoch with their UTC offset,
+    and IP addresses and networks as their packed integer value. It only
+    relies on the standard library, and is meant as a reference for codecs
+    based on faster libraries.
+    """
+
+    name = 'binary'
+    native = True
+
+    def encode(self, primitive: Any) -> bytes:
+        return _encode(primitive)
+
+    def decode(self, data: bytes) -> Any:
+        return _decode(bytes(data))
+
+
+_SCHEMA_FORMAT_VERSION = 1
+
+# Kinds of the fields of the object layouts of SchemaCodec
+_KIND_INT = 'i'
+_KIND_FLOAT = 'f'
+_KIND_BOOL = 'b'
+_KIND_STR = 's'
+_KIND_OBJECT = 'o'
+_KIND_OBJECTS = 'l'
+_KIND_VALUE = 'v'
+
+# Struct codes of the fields stored in the fixed part of the records
+_FIXED_CODES = {_KIND_INT: 'q', _KIND_FLOAT: 'd', _KIND_BOOL: '?'}
+
+# Index of the records holding the primitive of an object rather than the
+# fields of a layout
+_PRIMITIVE_RECORD = 0xFFFF
+
+_RECORD = struct.Struct('<H')
+_LENGTH = struct.Struct('<I')
+
+
+def _bitmap_code(count: int) -> str:
+    """Return the struct code of a bitmap of count bits."""
+    for code, bits in (('B', 8), ('H', 16), ('I', 32), ('Q', 64)):
+        if count <= bits:
+            return code
+    return f'{(count + 7) // 8}s'
+
+
+def _layout_struct(kinds: str) -> struct.Struct:
+    """Return the struct of the fixed part of the records of a layout.
+
+    The part holds the bitmaps of the fields set, changed and None, in the
+    order of the layout, followed by the value of each field of a fixed
+    size, which is 0 when the field is not set or None.
+    """
+    bitmap = _bitmap_code(len(kinds))
+    return struct.Struct(
+        '<'
+        + bitmap * 3
+        + ''.join(_FIXED_CODES[kind] for kind in kinds if kind in _FIXED_CODES)
+    )
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return _RECORD.pack(len(data)) + data
+
+
+def _layout_header(
+    obj_class: type[base.VersionedObject],
+    fingerprint: str,
+    fields: list[tuple[str, str]],
+) -> bytes:
+    """Return the description of a layout sent before its records.
+
+    :param fields: The name and kind of each field of the layout
+    """
+    header = [
+        _pack_str(value)
+        for value in (
+            obj_class.obj_name(),
+            obj_class.OBJ_PROJECT_NAMESPACE,
+            obj_class.OBJ_SERIAL_NAMESPACE,
+            obj_class.VERSION,
+            fingerprint,
+        )
+    ]
+    header.append(_RECORD.pack(len(fields)))
+    for name, kind in fields:
+        header.append(_pack_str(name))
+        header.append(kind.encode('ascii'))
+    return b''.join(header)
+
+
+class _Layout(NamedTuple):
+    """Layout described by the header of an encoded object."""
+
+    name: str
+    namespace: str
+    serial_namespace: str
+    version: str
+    fingerprint: str
+    fields: tuple[str, ...]
+    kinds: str
+    head: struct.Struct
+    # The bytes describing the layout
+    header: bytes
+
+
+def _invalid_records(e: Exception) -> exception.InvalidEncodedObject:
+    """Return the error to raise for the failure to decode records."""
+    if isinstance(e, (IndexError, struct.error)):
+        return exception.InvalidEncodedObject(reason=f'truncated: {e}')
+    return exception.InvalidEncodedObject(reason=str(e))
+
+
+# Errors raised by decoding bytes which were truncated or corrupted
+_DECODE_ERRORS = (
+    IndexError,
+    struct.error,
+    ValueError,
+    OverflowError,
+    netaddr.AddrFormatError,
+)
+
+
+def _read_layouts(data: bytes) -> tuple[list[_Layout], int]:
+    """Return the layouts described by data, and the offset of the record."""
+    if not data or data[0] != _SCHEMA_FORMAT_VERSION:
+        raise exception.InvalidEncodedObject(
+            reason='unsupported schema encoding format'
+        )
+    try:
+        return _read_layout_headers(data)
+    except _DECODE_ERRORS as e:
+        raise _invalid_records(e)
+
+
+def _read_layout_headers(data: bytes) -> tuple[list[_Layout], int]:
+    def read_str(offset: int) -> tuple[str, int]:
+        size = _RECORD.unpack_from(data, offset)[0]
+        offset += 2
+        if offset + size > len(data):
+            raise IndexError('string out of range')
+        return data[offset : offset + size].decode('utf-8'), offset + size
+
+    count = _RECORD.unpack_from(data, 1)[0]
+    offset = 3
+    layouts = []
+    for _ in range(count):
+        start = offset
+        values = []
+        for _ in range(5):
+            value, offset = read_str(offset)
+            values.append(value)
+        field_count = _RECORD.unpack_from(data, offset)[0]
+        offset += 2
+        fields = []
+        kinds = []
+        for _ in range(field_count):
+            name, offset = read_str(offset)
+            fields.append(name)
+            kinds.append(chr(data[offset]))
+            offset += 1
+        kind_codes = ''.join(kinds)
+        if not set(kind_codes) <= set('ifbsolv'):
+            raise ValueError(f'unknown field kind in {kind_codes}')
+        name, namespace, serial_namespace, version, fingerprint = values
+        layouts.append(
+            _Layout(
+                name,
+                namespace,
+                serial_namespace,
+                version,
+                fingerprint,
+                tuple(fields),
+                kind_codes,
+                _layout_struct(kind_codes),
+                data[start:offset],
+            )
+        )
+    return layouts, offset
+
+
+def _bitmap_value(value: int | bytes) -> int:
+    if isinstance(value, bytes):
+        return int.from_bytes(value, 'little')
+    return value
+
+
+def _decode_records(data: bytes) -> Any:
+    """Decode the object encoded by SchemaCodec to its primitive."""
+    layouts, offset = _read_layouts(data)
+    read_value = _value_decoder(data)
+
+    def read_record(offset: int) -> tuple[Any, int]:
+        index = _RECORD.unpack_from(data, offset)[0]
+        offset += 2
+        if index == _PRIMITIVE_RECORD:
+            return read_value(offset)
+        layout = layouts[index]
+        head = layout.head.unpack_from(data, offset)
+        offset += layout.head.size
+        present, changes, nulls = (_bitmap_value(x) for x in head[:3])
+        fixed = iter(head[3:])
+        objdata: dict[str, Any] = {}
+        for i, (name, kind) in enumerate(zip(layout.fields, layout.kinds)):
+            bit = 1 << i
+            value: Any = next(fixed) if kind in _FIXED_CODES else None
+            if not present & bit:
+                continue
+            if nulls & bit:
+                value = None
+            elif kind == _KIND_STR:
+                size = _LENGTH.unpack_from(data, offset)[0]
+                offset += 4
+                value = data[offset : offset + size].decode(
+                    'utf-8', 'surrogatepass'
+                )
+                offset += size
+            elif kind == _KIND_OBJECT:
+                value, offset = read_record(offset)
+            elif kind == _KIND_OBJECTS:
+                count = _LENGTH.unpack_from(data, offset)[0]
+                offset += 4
+                value = []
+                for _ in range(count):
+                    item, offset = read_record(offset)
+                    value.append(item)
+            elif kind == _KIND_VALUE:
+                value, offset = read_value(offset)
+            objdata[name] = value
+        ns = layout.serial_namespace
+        primitive = {
+            f'{ns}.name': layout.name,
+            f'{ns}.namespace': layout.namespace,
+            f'{ns}.version': layout.version,
+            f'{ns}.data': objdata,
+        }
+        if changes:
+            primitive[f'{ns}.changes'] = [
+                name
+                for i, name in enumerate(layout.fields)
+                if changes & (1 << i)
+            ]
+        return primitive, offset
+
+    try:
+        value, offset = read_record(offset)
+    except _DECODE_ERRORS as e:
+        raise _invalid_records(e)
+    if offset != len(data):
+        raise exception.InvalidEncodedObject(
+            reason='unexpected data after the encoded object'
+        )
+    return value
+
+
+def _encode_records(obj: Any) -> bytes:
+    """Encode an object with the layouts of the classes of its objects."""
+    out: list[bytes] = []
+    headers: list[bytes] = []
+    indexes: dict[type, int] = {}
+    write_value = _value_encoder(out)
+
+    def write_record(value: Any) -> None:
+        cls = type(value)
+        layout = getattr(cls, '_obj_binary_layout', None)
+        if layout is not None and layout.owner is cls:
+            index = indexes.get(cls)
+            added = index is None
+            if index is None and len(headers) < _PRIMITIVE_RECORD:
+                index = indexes[cls] = len(headers)
+                headers.append(layout.header)
+            if index is not None:
+                out.append(_RECORD.pack(index))
+                if layout.encode(value, out, write_record, write_value):
+                    return
+                # NOTE: Nothing else was written, so the layout is the
+                # last one added if it was added for this object
+                out.pop()
+                if added:
+                    del indexes[cls]
+                    headers.pop()
+        out.append(_RECORD.pack(_PRIMITIVE_RECORD))
+        write_value(None if value is None else value.obj_to_primitive())
+
+    write_record(obj)
+    return b''.join(
+        [
+            _TAG.pack(_SCHEMA_FORMAT_VERSION),
+            _RECORD.pack(len(headers)),
+            *headers,
+            *out,
+        ]
+    )
+
+
+class SchemaCodec(BinaryCodec):
+    """Codec encoding objects with the binary layouts of their classes.
+
+    The layout of a class is generated at registration when its
+    ``OBJ_BINARY_LAYOUT`` attribute is set. It stores the fields of its
+    objects after a bitmap of those which are set, with fixed size
+    integers, floats and booleans, length-prefixed strings, and the
+    sub-objects in the same form. Other values are encoded as by
+    :class:`BinaryCodec`, as are the primitives of the objects of the
+    other classes.
+
+    The layouts used are described in the bytes encoded, along with the
+    fingerprint of each class, as computed by the ObjectVersionChecker
+    fixture. When every class has the same fingerprint on the receiving
+    side, the objects are built directly from their fields. Otherwise
+    their primitive is decoded and hydrated as usual, which allows them to
+    be backported. Bytes which can't be decoded, or whose layouts don't
+    match their fingerprint, raise
+    :class:`oslo_versionedobjects.exception.InvalidEncodedObject`.
+    """
+
+    name = 'schema'
+
+    def encode(self, primitive: Any) -> bytes:
+        out = [
+            _TAG.pack(_SCHEMA_FORMAT_VERSION),
+            _RECORD.pack(0),
+            _RECORD.pack(_PRIMITIVE_RECORD),
+        ]
+        _value_encoder(out)(primitive)
+        return b''.join(out)
+
+    def decode(self, data: bytes) -> Any:
+        return _decode_records(bytes(data))
+
+    def encode_object(self, obj: base.VersionedObject) -> bytes:
+        return _encode_records(obj)
+
+    def decode_object(
+        self,
+        base_class: type[base.VersionedObject],
+        data: bytes,
+        context: Any,
+    ) -> base.VersionedObject | None:
+        data = bytes(data)
+        layouts, offset = _read_layouts(data)
+        if not layouts:
+            # The object was encoded as its primitive
+            return None
+        decoders: list[Callable[..., tuple[Any, int]]] = []
+        for layout in layouts:
+            try:
+                obj_class = base_class.obj_class_from_name(
+                    layout.name, layout.version
+                )
+            except exception.VersionedObjectsException:
+                return None
+            class_layout = obj_class._obj_binary_layout
+            if (
+                class_layout is None
+                or class_layout.owner is not obj_class
+                or class_layout.fingerprint != layout.fingerprint
+                or obj_class.OBJ_PROJECT_NAMESPACE != layout.namespace
+            ):
+                return None
+            if class_layout.header != layout.header:
+                # NOTE: The records would be read with another layout than
+                # the one they were written with
+                raise exception.InvalidEncodedObject(
+                    reason=f'layout of {layout.name} {layout.version} does '
+                    f'not match its fingerprint'
+                )
+            decoders.append(class_layout.decode)
+        read_value = _value_decoder(data)
+
+        def read_record(offset: int) -> tuple[Any, int]:
+            index: int = _RECORD.unpack_from(data, offset)[0]
+            offset += 2
+            if index == _PRIMITIVE_RECORD:
+                return read_value(offset)
+            return decoders[index](
+                context, data, offset, read_record, read_value
+            )
+
+        try:
+            obj, offset = read_record(offset)
+        except _DECODE_ERRORS as e:
+            raise _invalid_records(e)
+        if offset != len(data):
+            raise exception.InvalidEncodedObject(
+                reason='unexpected data after the encoded object'
+            )
+        return obj  # type: ignore[no-any-return]
+
+
+class Compressor(metaclass=abc.ABCMeta):
+    """Compression of the bytes of encoded objects."""
+
+    #: Name identifying the compressor in the entities it compressed
+    name: str
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress bytes."""
+        ...
+
+    @abc.abstractmethod
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        """Decompress the bytes returned by compress().
+
+        :param max_length: Size in bytes of the largest data returned
+        :raises: DecompressedSizeExceeded if the data is larger
+        """
+        ...
+
+
+class ZlibCompressor(Compressor):
+    """Compressor using zlib from the standard library.
+
+    :param level: Compression level, from 0 for none to 9 for the smallest
+                  output
+    """
+
+    name = 'zlib'
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        try:
+            # NOTE: One more byte than allowed is asked for, to tell data
+            # of exactly max_length bytes from larger data
+            result = decompressor.decompress(data, max_length + 1)
+        except zlib.error as e:
+            raise ValueError(f'Invalid compressed data: {e}')
+        if len(result) > max_length:
+            raise exception.DecompressedSizeExceeded(limit=max_length)
+        if not decompressor.eof:
+            raise ValueError('Invalid compressed data: truncated')
+        return result
@@ -210,3 +210,25 @@ class UnregisteredSubobject(VersionedObjectsException):
         "%(child_objname)s is referenced by %(parent_objname)s but "
         "is not registered"
     )
+
+
+class RegistryFrozen(VersionedObjectsException):
+    msg_fmt = _(
+        "Cannot register %(objname)s after the object registry was frozen"
+    )
+
+
+class UnsupportedCodec(VersionedObjectsException):
+    msg_fmt = _('Unsupported codec %(codec)s')
+
+
+class UnsupportedCompressor(VersionedObjectsException):
+    msg_fmt = _('Unsupported compressor %(compressor)s')
+
+
+class DecompressedSizeExceeded(VersionedObjectsException):
+    msg_fmt = _('Decompressed object is larger than %(limit)d bytes')
+
+
+class InvalidEncodedObject(VersionedObjectsException):
+    msg_fmt = _('Invalid encoded object: %(reason)s')
@@ -134,6 +134,25 @@ class AbstractFieldType(Generic[T], metaclass=abc.ABCMeta):
         """
         ...
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: T
+    ) -> object:
+        """This is called to serialize a value for a native codec.
+
+        Codecs such as :class:`oslo_versionedobjects.codec.BinaryCodec`
+        encode datetimes, IP addresses, sets and bytes in a form of their
+        own, so types can return such values rather than converting them to
+        strings. from_primitive() must accept the value returned as well as
+        the one returned by to_primitive(). By default, this returns the
+        form given by to_primitive().
+
+        :param:obj: The VersionedObject on which the value is set
+        :param:attr: The name of the attribute holding the value
+        :param:value: The natural form of the value
+        :returns: The serialized form of the value
+        """
+        return self.to_primitive(obj, attr, value)
+
     @abc.abstractmethod
     def describe(self) -> str:
         """Returns a string describing the type of the field."""
@@ -151,6 +170,18 @@ class FieldType(AbstractFieldType[T]):
     ) -> T:
         return cast(T, value)
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> T:
+        """Coerce a value deserialized from a trusted primitive.
+
+        The value was returned by from_primitive() for a primitive made by
+        to_primitive() from an already coerced value, so it does not need
+        to be validated or converted again. Types holding values which must
+        be set up to be used, such as collections, override this.
+        """
+        return cast(T, value)
+
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: object
     ) -> T:
@@ -263,6 +294,20 @@ class Field(Generic[T]):
 
         return self._type.coerce(obj, attr, value)
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> T | None:
+        """Coerce a value deserialized from a trusted primitive.
+
+        Unlike coerce(), this does not validate the value again, unless
+        the field customizes coerce().
+        """
+        if value is None:
+            return None
+        if type(self).coerce is not Field.coerce:
+            return self.coerce(obj, attr, value)
+        return self._type.coerce_trusted(obj, attr, value)
+
     @overload
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: None
@@ -311,6 +356,30 @@ class Field(Generic[T]):
 
         return self._type.to_primitive(obj, attr, value)
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: T
+    ) -> object:
+        """Serialize a value to the form encoded by native codecs.
+
+        This calls to_native() on the FieldType, unless this field
+        customizes its primitive form.
+
+        :param:obj: The object being acted upon
+        :param:attr: The name of the attribute/field being serialized
+        :param:value: The value to be serialized
+        :returns: The serialized value
+        """
+        cls = type(self)
+        if (
+            cls.to_primitive is not Field.to_primitive
+            or cls.from_primitive is not Field.from_primitive
+        ):
+            return self.to_primitive(obj, attr, value)
+        if value is None:
+            return None
+
+        return self._type.to_native(obj, attr, value)
+
     def describe(self) -> str:
         """Return a short string describing the type of this field."""
         name = self._type.describe()
@@ -600,6 +669,9 @@ class DateTime(FieldType[datetime.datetime]):
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: Any
     ) -> datetime.datetime:
+        if isinstance(value, datetime.datetime):
+            # NOTE: Native codecs decode datetimes themselves
+            return self.coerce(obj, attr, value)
         return self.coerce(obj, attr, timeutils.parse_isotime(value))
 
     def get_schema(self) -> dict[str, Any]:
@@ -610,6 +682,15 @@ class DateTime(FieldType[datetime.datetime]):
     ) -> object:
         return _utils.isotime(value)
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: datetime.datetime
+    ) -> object:
+        if type(self).from_primitive is not DateTime.from_primitive:
+            return self.to_primitive(obj, attr, value)
+        # NOTE: The primitive form has no microseconds, so that peers get
+        # the same value whatever the codec
+        return value.replace(microsecond=0)
+
     def stringify(self, value: datetime.datetime) -> str:
         return _utils.isotime(value)
 
@@ -633,6 +714,13 @@ class IPAddress(StringPattern[netaddr.IPAddress]):
     ) -> object:
         return str(value)
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: T
+    ) -> object:
+        if type(self).from_primitive is not IPAddress.from_primitive:
+            return self.to_primitive(obj, attr, value)
+        return value
+
 
 class IPV4Address(IPAddress):
     def coerce(
@@ -703,6 +791,13 @@ class IPNetwork(StringPattern[netaddr.IPNetwork]):
     ) -> object:
         return str(value)
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: T
+    ) -> object:
+        if type(self).from_primitive is not IPNetwork.from_primitive:
+            return self.to_primitive(obj, attr, value)
+        return value
+
 
 class IPV4Network(IPNetwork):
     PATTERN = (
@@ -785,12 +880,21 @@ class IPV6Network(IPNetwork):
 
 
 class CoercedCollectionMixin(Generic[T]):
+    # Set while this collection is shared by a copy-on-write clone of the
+    # object holding it, see base.VersionedObject.obj_clone()
+    _cow_share: Any = None
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._element_type: Field[T] | None = None
         self._obj: Any = None
         self._field: str | None = None
         super().__init__(*args, **kwargs)
 
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('_cow_share', None)
+        return state
+
     def enable_coercing(
         self, element_type: Field[T], obj: Any, field: str
     ) -> None:
@@ -798,6 +902,20 @@ class CoercedCollectionMixin(Generic[T]):
         self._obj = obj
         self._field = field
 
+    def _cow_before_write(self) -> None:
+        """Stop sharing this collection with copy-on-write clones.
+
+        This must be called before the collection is modified in place. The
+        object holding it may itself be shared, by being held in a shared
+        collection, so it is given the chance to stop sharing as well.
+        """
+        if self._cow_share is not None:
+            self._cow_share.before_write()
+        # The holder is not set yet while an unpickled list is restored
+        obj: Any = self.__dict__.get('_obj')
+        if getattr(obj, '_obj_checked_access', False):
+            obj._obj_cow_before_write()
+
 
 class CoercedList(CoercedCollectionMixin[T], list[T]):
     """List which coerces its elements
@@ -814,6 +932,7 @@ class CoercedList(CoercedCollectionMixin[T], list[T]):
         return item
 
     def __setitem__(self, i: int | slice, y: Any) -> None:  # type: ignore[override]
+        self._cow_before_write()
         if type(i) is slice:  # compatibility with py3 and [::] slices
             start = i.start or 0
             step = i.step or 1
@@ -825,10 +944,16 @@ class CoercedList(CoercedCollectionMixin[T], list[T]):
         else:
             super().__setitem__(i, self._coerce_item(i, y))
 
+    def __delitem__(self, i: SupportsIndex | slice) -> None:
+        self._cow_before_write()
+        super().__delitem__(i)
+
     def append(self, x: Any) -> None:
+        self._cow_before_write()
         super().append(self._coerce_item(len(self) + 1, x))
 
     def extend(self, t: Any) -> None:
+        self._cow_before_write()
         coerced_items = [
             self._coerce_item(len(self) + index, item)
             for index, item in enumerate(t)
@@ -836,10 +961,31 @@ class CoercedList(CoercedCollectionMixin[T], list[T]):
         super().extend(coerced_items)
 
     def insert(self, i: SupportsIndex, x: Any) -> None:
+        self._cow_before_write()
         # Convert SupportsIndex to int for _coerce_item which expects int
         index = int(i)
         super().insert(i, self._coerce_item(index, x))
 
+    def pop(self, i: SupportsIndex = -1) -> T:
+        self._cow_before_write()
+        return super().pop(i)
+
+    def remove(self, x: Any) -> None:
+        self._cow_before_write()
+        super().remove(x)
+
+    def clear(self) -> None:
+        self._cow_before_write()
+        super().clear()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._cow_before_write()
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._cow_before_write()
+        super().reverse()
+
     def __add__(  # type: ignore[override]
         self, y: Iterable[Any]
     ) -> Self:
@@ -856,6 +1002,7 @@ class CoercedList(CoercedCollectionMixin[T], list[T]):
     def __iadd__(  # type: ignore[override]
         self, y: Iterable[Any]
     ) -> Self:
+        self._cow_before_write()
         coerced_items = [
             self._coerce_item(len(self) + index, item)
             for index, item in enumerate(y)
@@ -863,6 +1010,10 @@ class CoercedList(CoercedCollectionMixin[T], list[T]):
         super().__iadd__(coerced_items)
         return self
 
+    def __imul__(self, n: SupportsIndex) -> Self:
+        self._cow_before_write()
+        return super().__imul__(n)
+
     def __setslice__(self, i: int, j: int, y: Any) -> None:
         coerced_items = [
             self._coerce_item(i + index, item) for index, item in enumerate(y)
@@ -894,11 +1045,17 @@ class CoercedDict(CoercedCollectionMixin[T], dict[str, T]):
         return item
 
     def __setitem__(self, key: str, value: Any) -> None:
+        self._cow_before_write()
         super().__setitem__(key, self._coerce_item(key, value))
 
+    def __delitem__(self, key: str) -> None:
+        self._cow_before_write()
+        super().__delitem__(key)
+
     def update(  # type: ignore[override]
         self, other: dict[str, Any] | None = None, **kwargs: Any
     ) -> None:
+        self._cow_before_write()
         if other is not None:
             super().update(
                 self._coerce_dict(other), **self._coerce_dict(kwargs)
@@ -907,8 +1064,25 @@ class CoercedDict(CoercedCollectionMixin[T], dict[str, T]):
             super().update(**self._coerce_dict(kwargs))
 
     def setdefault(self, key: str, default: Any = None) -> Any:
+        self._cow_before_write()
         return super().setdefault(key, self._coerce_item(key, default))
 
+    def pop(self, *args: Any) -> Any:
+        self._cow_before_write()
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[str, T]:
+        self._cow_before_write()
+        return super().popitem()
+
+    def clear(self) -> None:
+        self._cow_before_write()
+        super().clear()
+
+    def __ior__(self, other: Any) -> Self:  # type: ignore[override,misc]
+        self._cow_before_write()
+        return super().__ior__(other)
+
 
 class CoercedSet(CoercedCollectionMixin[T], set[T]):
     """Set which coerces its values
@@ -932,14 +1106,49 @@ class CoercedSet(CoercedCollectionMixin[T], set[T]):
         return coerced
 
     def add(self, value: Any) -> None:
+        self._cow_before_write()
         super().add(self._coerce_element(value))
 
     def update(self, values: Iterable[Any]) -> None:  # type: ignore[override]
+        self._cow_before_write()
         super().update(self._coerce_iterable(values))
 
     def symmetric_difference_update(self, values: Iterable[Any]) -> None:
+        self._cow_before_write()
         super().symmetric_difference_update(self._coerce_iterable(values))
 
+    def remove(self, value: Any) -> None:
+        self._cow_before_write()
+        super().remove(value)
+
+    def discard(self, value: Any) -> None:
+        self._cow_before_write()
+        super().discard(value)
+
+    def pop(self) -> T:
+        self._cow_before_write()
+        return super().pop()
+
+    def clear(self) -> None:
+        self._cow_before_write()
+        super().clear()
+
+    def difference_update(self, *values: Iterable[Any]) -> None:
+        self._cow_before_write()
+        super().difference_update(*values)
+
+    def intersection_update(self, *values: Iterable[Any]) -> None:
+        self._cow_before_write()
+        super().intersection_update(*values)
+
+    def __isub__(self, y: Any) -> Self:  # type: ignore[misc]
+        self._cow_before_write()
+        return super().__isub__(y)
+
+    def __iand__(self, y: Any) -> Self:  # type: ignore[misc]
+        self._cow_before_write()
+        return super().__iand__(y)
+
     def __or__(  # type: ignore[override]
         self, y: Iterable[Any]
     ) -> Self:
@@ -952,6 +1161,7 @@ class CoercedSet(CoercedCollectionMixin[T], set[T]):
     def __ior__(  # type: ignore[override]
         self, y: Iterable[Any]
     ) -> Self:
+        self._cow_before_write()
         return super().__ior__(self._coerce_iterable(y))
 
     def __xor__(  # type: ignore[override]
@@ -966,6 +1176,7 @@ class CoercedSet(CoercedCollectionMixin[T], set[T]):
     def __ixor__(  # type: ignore[override]
         self, y: Iterable[Any]
     ) -> Self:
+        self._cow_before_write()
         return super().__ixor__(self._coerce_iterable(y))
 
 
@@ -988,6 +1199,13 @@ class CompoundFieldType(FieldType[Any], Generic[E]):
         # descriptor (Field implements __get__/__set__ for VersionedObject)
         self._element_type: Field[E] = Field(element_type, **field_args)
 
+    def _elements_trusted(self) -> bool:
+        """Return whether trusted elements can be stored as they are."""
+        return (
+            type(self._element_type._type).coerce_trusted
+            is FieldType.coerce_trusted
+        )
+
 
 class List(CompoundFieldType[E]):
     """A field type for lists of elements of type E."""
@@ -1007,14 +1225,37 @@ class List(CompoundFieldType[E]):
         coerced_list.extend(value)
         return coerced_list
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> list[E]:
+        coerced_list: CoercedList[E] = CoercedList()
+        coerced_list.enable_coercing(self._element_type, obj, attr)
+        if not self._elements_trusted():
+            value = [
+                self._element_type.coerce_trusted(obj, f'{attr}[{index}]', x)
+                for index, x in enumerate(value)
+            ]
+        list.extend(coerced_list, value)
+        return coerced_list
+
     def to_primitive(
         self, obj: base.VersionedObject, attr: str, value: list[E]
     ) -> list[object]:
         return [self._element_type.to_primitive(obj, attr, x) for x in value]
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: list[E]
+    ) -> list[object]:
+        return [self._element_type.to_native(obj, attr, x) for x in value]
+
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: Any
     ) -> list[E]:
+        element_type = self._element_type._type
+        if isinstance(element_type, Object):
+            return cast(
+                list[E], element_type.from_primitive_list(obj, attr, value)
+            )
         return [self._element_type.from_primitive(obj, attr, x) for x in value]
 
     def stringify(self, value: list[E]) -> str:
@@ -1045,6 +1286,21 @@ class Dict(CompoundFieldType[E]):
         coerced_dict.update(value)
         return coerced_dict
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> dict[str, E]:
+        coerced_dict: CoercedDict[E] = CoercedDict()
+        coerced_dict.enable_coercing(self._element_type, obj, attr)
+        if not self._elements_trusted():
+            value = {
+                key: self._element_type.coerce_trusted(
+                    obj, f'{attr}[{key}]', element
+                )
+                for key, element in value.items()
+            }
+        dict.update(coerced_dict, value)
+        return coerced_dict
+
     def to_primitive(
         self, obj: base.VersionedObject, attr: str, value: dict[str, E]
     ) -> dict[str, object]:
@@ -1055,6 +1311,16 @@ class Dict(CompoundFieldType[E]):
             )
         return primitive
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: dict[str, E]
+    ) -> dict[str, object]:
+        native: dict[str, object] = {}
+        for key, element in value.items():
+            native[key] = self._element_type.to_native(
+                obj, f'{attr}["{key}"]', element
+            )
+        return native
+
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: Any
     ) -> dict[str, E]:
@@ -1134,6 +1400,19 @@ class Set(CompoundFieldType[E]):
         coerced_set.update(value)
         return coerced_set
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> set[E]:
+        coerced_set: CoercedSet[E] = CoercedSet()
+        coerced_set.enable_coercing(self._element_type, obj, attr)
+        if not self._elements_trusted():
+            value = {
+                self._element_type.coerce_trusted(obj, f'{attr}[{x}]', x)
+                for x in value
+            }
+        set.update(coerced_set, value)
+        return coerced_set
+
     def to_primitive(
         self, obj: base.VersionedObject, attr: str, value: set[E]
     ) -> tuple[object, ...]:
@@ -1141,6 +1420,11 @@ class Set(CompoundFieldType[E]):
             self._element_type.to_primitive(obj, attr, x) for x in value
         )
 
+    def to_native(
+        self, obj: base.VersionedObject, attr: str, value: set[E]
+    ) -> set[object]:
+        return {self._element_type.to_native(obj, attr, x) for x in value}
+
     def from_primitive(
         self, obj: base.VersionedObject, attr: str, value: Any
     ) -> set[E]:
@@ -1212,9 +1496,21 @@ class Object(FieldType['base.VersionedObject']):
                     'valtype': ''.join([val_mod, obj_name]),
                 }
             )
+        # NOTE: Let the object holding this one know about its changes
+        adopt_child = getattr(obj, '_obj_adopt_child', None)
+        if adopt_child is not None:
+            adopt_child(value)
         # We've validated value is the correct object type above
         return cast('base.VersionedObject', value)
 
+    def coerce_trusted(
+        self, obj: base.VersionedObject | None, attr: str, value: Any
+    ) -> base.VersionedObject:
+        adopt_child = getattr(obj, '_obj_adopt_child', None)
+        if adopt_child is not None:
+            adopt_child(value)
+        return cast('base.VersionedObject', value)
+
     def to_primitive(
         self, obj: base.VersionedObject, attr: str, value: base.VersionedObject
     ) -> object:
@@ -1232,6 +1528,16 @@ class Object(FieldType['base.VersionedObject']):
             return value
         return obj.obj_from_primitive(value, obj._context)
 
+    def from_primitive_list(
+        self, obj: base.VersionedObject, attr: str, values: Iterable[Any]
+    ) -> list[base.VersionedObject | None]:
+        """Deserialize the elements of a list of objects at once.
+
+        Elements of the same object name and version are hydrated without
+        looking up their class again.
+        """
+        return obj.obj_from_primitive_list(values, obj._context)
+
     def describe(self) -> str:
         return f"Object<{self._obj_name}>"
 
@@ -21,19 +21,13 @@
 """
 
 from collections.abc import Callable, Mapping
-from collections import namedtuple
-from collections import OrderedDict
 import copy
 import datetime
-import hashlib
-import inspect
 import logging
-from reprlib import recursive_repr
 from typing import Any
 from unittest import mock
 
 import fixtures
-from oslo_utils import versionutils as vutils
 
 from oslo_versionedobjects import base
 from oslo_versionedobjects import fields
@@ -112,20 +106,9 @@ def compare_obj(
             test.assertEqual(db_val, obj_val)
 
 
-class OsloOrderedDict(OrderedDict[str, str]):
-    """Oslo version of OrderedDict for Python consistency."""
-
-    @recursive_repr()
-    def __repr__(self) -> str:
-        if not self:
-            return f'{self.__class__.__bases__[0].__name__}()'
-        # NOTE(jamespage):
-        # Python >= 3.12 uses a dict instead of a list which changes the
-        # repr of the versioned object and its associated hash value
-        # Switch back to using list an use super class name.
-        return (
-            f'{self.__class__.__bases__[0].__name__}({list(self.items())!r})'
-        )
+# NOTE: These are computed by base, so that the fingerprints of objects are
+# known at runtime too
+OsloOrderedDict = base._OsloOrderedDict
 
 
 class FakeIndirectionAPI(base.VersionedObjectIndirectionAPI):
@@ -169,6 +152,20 @@ class FakeIndirectionAPI(base.VersionedObjectIndirectionAPI):
         }
         return args, kwargs
 
+    def _copy_result(self, context: Any, result: Any, objver: str) -> Any:
+        if not isinstance(result, base.VersionedObject):
+            return result
+        # NOTE: Results are sent with the projection requested by the caller
+        projection = base.obj_get_projection()
+        return base.VersionedObject.obj_from_primitive(
+            result.obj_to_primitive(
+                target_version=objver,
+                fields=projection.fields if projection else None,
+                exclude=projection.exclude if projection else None,
+            ),
+            context=context,
+        )
+
     def object_action(
         self,
         context: Any,
@@ -182,7 +179,7 @@ class FakeIndirectionAPI(base.VersionedObjectIndirectionAPI):
         )
         objmethod = str(objmethod)
         args, kwargs = self._canonicalize_args(context, args, kwargs)
-        original = objinst.obj_clone()
+        original = objinst.obj_clone(copy_on_write=True)
         with mock.patch(
             'oslo_versionedobjects.base.VersionedObject.indirection_api',
             new=None,
@@ -211,13 +208,7 @@ class FakeIndirectionAPI(base.VersionedObjectIndirectionAPI):
             new=None,
         ):
             result = getattr(cls, objmethod)(context, *args, **kwargs)
-        return (
-            base.VersionedObject.obj_from_primitive(
-                result.obj_to_primitive(target_version=objver), context=context
-            )
-            if isinstance(result, base.VersionedObject)
-            else result
-        )
+        return self._copy_result(context, result, objver)
 
     def object_class_action_versions(
         self,
@@ -239,13 +230,7 @@ class FakeIndirectionAPI(base.VersionedObjectIndirectionAPI):
             new=None,
         ):
             result = getattr(cls, objmethod)(context, *args, **kwargs)
-        return (
-            base.VersionedObject.obj_from_primitive(
-                result.obj_to_primitive(target_version=objver), context=context
-            )
-            if isinstance(result, base.VersionedObject)
-            else result
-        )
+        return self._copy_result(context, result, objver)
 
     def object_backport(
         self,
@@ -286,33 +271,9 @@ class ObjectHashMismatch(Exception):
         )
 
 
-ArgSpec = namedtuple('ArgSpec', ('args', 'varargs', 'keywords', 'defaults'))
+ArgSpec = base._ArgSpec
 CompatArgSpec = ArgSpec
-
-
-def get_method_spec(
-    method: Callable[..., Any],
-) -> inspect.FullArgSpec | CompatArgSpec:
-    """Get a stable and compatible method spec.
-
-    Newer features in Python3 (kw-only arguments and annotations) are
-    not supported or representable with inspect.getargspec() but many
-    object hashes are already recorded using that method. This attempts
-    to return something compatible with getargspec() when possible (i.e.
-    when those features are not used), and otherwise just returns the
-    newer getfullargspec() representation.
-    """
-    fullspec = inspect.getfullargspec(method)
-    if any(
-        [fullspec.kwonlyargs, fullspec.kwonlydefaults, fullspec.annotations]
-    ):
-        # Method uses newer-than-getargspec() features, so return the
-        # newer full spec
-        return fullspec
-    else:
-        return ArgSpec(
-            fullspec.args, fullspec.varargs, fullspec.varkw, fullspec.defaults
-        )
+get_method_spec = base._get_method_spec
 
 
 class ObjectVersionChecker:
@@ -335,21 +296,7 @@ class ObjectVersionChecker:
         parent_was_remotable: bool = False,
     ) -> Callable[..., Any] | None:
         """Follow a chain of remotable things down to the original function."""
-        if isinstance(thing, classmethod):
-            return self._find_remotable_method(cls, thing.__get__(None, cls))
-        elif (
-            inspect.ismethod(thing) or inspect.isfunction(thing)
-        ) and hasattr(thing, 'remotable'):
-            return self._find_remotable_method(
-                cls, getattr(thing, 'original_fn'), parent_was_remotable=True
-            )
-        elif parent_was_remotable:
-            # We must be the first non-remotable thing underneath a stack of
-            # remotable things (i.e. the actual implementation method)
-            return thing  # type: ignore[no-any-return]
-        else:
-            # This means the top-level thing never hit a remotable layer
-            return None
+        return base._find_remotable_method(cls, thing, parent_was_remotable)
 
     def _get_fingerprint(
         self,
@@ -358,45 +305,12 @@ class ObjectVersionChecker:
             Callable[[type[base.VersionedObject]], tuple[Any, ...]] | None
         ) = None,
     ) -> str:
-        obj_class = self.obj_classes[obj_name][0]
-        obj_fields = list(obj_class.fields.items())
-        obj_fields.sort()
-        methods = []
-        for name in dir(obj_class):
-            thing = getattr(obj_class, name)
-            if (
-                inspect.ismethod(thing)
-                or inspect.isfunction(thing)
-                or isinstance(thing, classmethod)
-            ):
-                method = self._find_remotable_method(obj_class, thing)
-                if method:
-                    methods.append((name, get_method_spec(method)))
-        methods.sort()
-        # NOTE(danms): Things that need a version bump are any fields
-        # and their types, or the signatures of any remotable methods.
-        # Of course, these are just the mechanical changes we can detect,
-        # but many other things may require a version bump (method behavior
-        # and return value changes, for example).
-        if hasattr(obj_class, 'child_versions'):
-            relevant_data: tuple[Any, ...] = (
-                obj_fields,
-                methods,
-                OsloOrderedDict(sorted(obj_class.child_versions.items())),
-            )
-        else:
-            relevant_data = (obj_fields, methods)
-
-        if extra_data_func:
-            relevant_data += extra_data_func(obj_class)
-
-        fingerprint = '{}-{}'.format(
-            obj_class.VERSION,
-            hashlib.md5(
-                bytes(repr(relevant_data).encode()), usedforsecurity=False
-            ).hexdigest(),
+        return base._get_fingerprint(
+            self.obj_classes[obj_name][0],
+            extra_data_func,
+            find_remotable_method=self._find_remotable_method,
+            get_method_spec=get_method_spec,
         )
-        return fingerprint
 
     def get_hashes(
         self,
@@ -489,7 +403,7 @@ class ObjectVersionChecker:
     ) -> None:
         init_args = init_args or []
         init_kwargs = init_kwargs or {}
-        version = vutils.convert_version_to_tuple(obj_class.VERSION)
+        version = base.ObjectVersion.parse(obj_class.VERSION)
         kwargs: dict[str, Any] = (
             {'version_manifest': manifest} if manifest else {}
         )
@@ -557,8 +471,8 @@ class ObjectVersionChecker:
             last_my_version: tuple[int, ...] = (0, 0)
             last_child_version: tuple[int, ...] = (0, 0)
             for my_version, child_version in versions:
-                _my_version = vutils.convert_version_to_tuple(my_version)
-                _ch_version = vutils.convert_version_to_tuple(child_version)
+                _my_version = base.ObjectVersion.parse(my_version)
+                _ch_version = base.ObjectVersion.parse(child_version)
                 if not (
                     last_my_version < _my_version
                     and last_child_version <= _ch_version
@@ -593,12 +507,22 @@ class VersionedObjectRegistryFixture(fixtures.Fixture):
     """
 
     _base_test_obj_backup: dict[str, list[type[base.VersionedObject]]]
+    _frozen_backup: base.RegistrySnapshot | None
+    _lazy_backup: dict[str, str]
 
     def setUp(self) -> None:
         super().setUp()
         self._base_test_obj_backup = copy.deepcopy(
             base.VersionedObjectRegistry._registry._obj_classes  # type: ignore[union-attr]
         )
+        # NOTE: Classes can be registered here even if the registry is
+        # frozen, which it is again once restored
+        self._frozen_backup = base.VersionedObjectRegistry._frozen
+        self._lazy_backup = dict(
+            base.VersionedObjectRegistry._obj_lazy_modules
+        )
+        base.VersionedObjectRegistry._frozen = None
+        base.VersionedObjectRegistry._invalidate_caches()
         self.addCleanup(self._restore_obj_registry)
 
     @staticmethod
@@ -606,9 +530,24 @@ class VersionedObjectRegistryFixture(fixtures.Fixture):
         base.VersionedObjectRegistry.register(cls_name)
 
     def _restore_obj_registry(self) -> None:
+        registered = base.VersionedObjectRegistry._registry._obj_classes  # type: ignore[union-attr]
+        for objname, module in list(self._lazy_backup.items()):
+            # NOTE: The modules of lazy objects imported since setUp() are
+            # not imported again, so their classes are kept registered
+            objclasses = [
+                objclass
+                for objclass in registered.get(objname, ())
+                if objclass.__module__ == module
+            ]
+            if objclasses:
+                self._base_test_obj_backup[objname] = objclasses
+                del self._lazy_backup[objname]
         base.VersionedObjectRegistry._registry._obj_classes = (  # type: ignore[union-attr]
             self._base_test_obj_backup
         )
+        base.VersionedObjectRegistry._frozen = self._frozen_backup
+        base.VersionedObjectRegistry._obj_lazy_modules = self._lazy_backup
+        base.VersionedObjectRegistry._invalidate_caches()
 
 
 class StableObjectJsonFixture(fixtures.Fixture):
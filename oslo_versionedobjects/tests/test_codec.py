@@ -0,0 +1,297 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import netaddr
+
+from oslo_versionedobjects import base
+from oslo_versionedobjects import codec
+from oslo_versionedobjects import exception
+from oslo_versionedobjects import fields
+from oslo_versionedobjects import fixture
+from oslo_versionedobjects import test
+
+
+class TestBinaryCodec(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.codec = codec.BinaryCodec()
+
+    def test_round_trip(self):
+        values = [
+            None,
+            True,
+            False,
+            0,
+            -(2**31),
+            2**31,
+            -(2**63),
+            2**100,
+            -(2**100),
+            1.5,
+            '',
+            'caf\xe9',
+            b'\x00\xff',
+            [1, [2, 'three']],
+            (1, 'two'),
+            {'a': {'b': None}, 1: 'one'},
+            {1, 'two'},
+            datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+            datetime.datetime(1955, 11, 5, tzinfo=datetime.timezone.utc),
+            datetime.datetime(
+                2020,
+                1,
+                2,
+                3,
+                4,
+                5,
+                tzinfo=datetime.timezone(datetime.timedelta(hours=-5)),
+            ),
+            netaddr.IPAddress('1.2.3.4'),
+            netaddr.IPAddress('::1'),
+            netaddr.IPNetwork('10.0.0.5/24'),
+            netaddr.IPNetwork('2001:db8::1/64'),
+        ]
+        for value in values:
+            decoded = self.codec.decode(self.codec.encode(value))
+            self.assertEqual(value, decoded)
+            self.assertIs(type(value), type(decoded))
+        self.assertEqual(values, self.codec.decode(self.codec.encode(values)))
+
+    def test_round_trip_datetime_offset(self):
+        value = datetime.datetime(
+            2020, 1, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+        )
+        decoded = self.codec.decode(self.codec.encode(value))
+        self.assertEqual(value.utcoffset(), decoded.utcoffset())
+        self.assertEqual(
+            value.replace(tzinfo=None), decoded.replace(tzinfo=None)
+        )
+
+    def test_encode_subclasses(self):
+        class MyStr(str):
+            pass
+
+        self.assertEqual(
+            ['foo', {'a': 1}],
+            self.codec.decode(self.codec.encode([MyStr('foo'), {'a': 1}])),
+        )
+
+    def test_encode_unsupported(self):
+        self.assertRaises(TypeError, self.codec.encode, [object()])
+
+    def test_decode_invalid(self):
+        data = self.codec.encode({'a': [1, 2]})
+        self.assertRaises(ValueError, self.codec.decode, b'')
+        self.assertRaises(ValueError, self.codec.decode, b'\x02' + data[1:])
+        self.assertRaises(ValueError, self.codec.decode, data[:-1])
+        self.assertRaises(ValueError, self.codec.decode, data + b'\x00')
+        self.assertRaises(ValueError, self.codec.decode, b'\x01\xff')
+        # Out of range datetime and IPv4 network prefix
+        self.assertRaises(
+            ValueError, self.codec.decode, b'\x01\x0e' + b'\xff' * 7 + b'\x7f'
+        )
+        self.assertRaises(
+            ValueError, self.codec.decode, b'\x01\x11\x00\x00\x00\x00\x63'
+        )
+
+
+class TestJSONCodec(test.TestCase):
+    def test_round_trip(self):
+        json_codec = codec.JSONCodec()
+        value = {'a': [1, 'two', None], 'b': {'c': 1.5}}
+        self.assertEqual(value, json_codec.decode(json_codec.encode(value)))
+        self.assertFalse(json_codec.native)
+
+
+class TestZlibCompressor(test.TestCase):
+    def test_round_trip(self):
+        compressor = codec.ZlibCompressor(level=9)
+        data = b'foo' * 100
+        compressed = compressor.compress(data)
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(data, compressor.decompress(compressed, len(data)))
+        self.assertRaises(
+            ValueError, compressor.decompress, compressed[:-1], len(data)
+        )
+
+    def test_decompress_limit(self):
+        compressor = codec.ZlibCompressor()
+        compressed = compressor.compress(b'x' * 100000)
+        self.assertRaises(
+            exception.DecompressedSizeExceeded,
+            compressor.decompress,
+            compressed,
+            99999,
+        )
+
+
+class TestSchemaCodec(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+        self.codec = codec.SchemaCodec()
+
+        @base.VersionedObjectRegistry.register
+        class MyLayoutChild(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = {'name': fields.StringField(nullable=True)}
+
+        @base.VersionedObjectRegistry.register
+        class MyPlainChild(base.VersionedObject):
+            fields = {'name': fields.StringField()}
+
+        @base.VersionedObjectRegistry.register
+        class MyLayoutObj(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = {
+                'id': fields.IntegerField(),
+                'uuid': fields.UUIDField(nullable=True),
+                'weight': fields.FloatField(nullable=True),
+                'enabled': fields.BooleanField(),
+                'name': fields.StringField(),
+                'when': fields.DateTimeField(nullable=True),
+                'tags': fields.ListOfStringsField(),
+                'child': fields.ObjectField('MyLayoutChild', nullable=True),
+                'plain': fields.ObjectField('MyPlainChild'),
+                'children': fields.ListOfObjectsField('MyLayoutChild'),
+            }
+
+        @base.VersionedObjectRegistry.register
+        class MySlotLayoutObj(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            OBJ_SLOT_STORAGE = True
+            fields = dict(MyLayoutObj.fields)
+
+        self.child_class = MyLayoutChild
+        self.plain_class = MyPlainChild
+        self.classes = [MyLayoutObj, MySlotLayoutObj]
+
+    def _make_obj(self, cls):
+        obj = cls(
+            id=2**40,
+            uuid=None,
+            weight=1.5,
+            enabled=True,
+            name='caf\xe9',
+            when=datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc),
+            tags=['a', 'b'],
+            child=self.child_class(name=None),
+            plain=self.plain_class(name='plain'),
+            children=[self.child_class(name=str(i)) for i in range(3)],
+        )
+        obj.obj_reset_changes(['id', 'weight'])
+        return obj
+
+    def _decode(self, data):
+        return self.codec.decode_object(base.VersionedObject, data, 'ctxt')
+
+    def test_layout(self):
+        for cls in self.classes:
+            layout = cls._obj_binary_layout
+            assert layout is not None
+            self.assertIs(cls, layout.owner)
+            self.assertEqual(
+                fixture.ObjectVersionChecker().get_hashes()[cls.obj_name()],
+                layout.fingerprint,
+            )
+        self.assertIsNone(self.plain_class._obj_binary_layout)
+
+    def test_round_trip(self):
+        for cls in self.classes:
+            obj = self._make_obj(cls)
+            data = self.codec.encode_object(obj)
+            obj2 = self._decode(data)
+            self.assertIsInstance(obj2, cls)
+            self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+            self.assertEqual(obj.obj_what_changed(), obj2.obj_what_changed())
+            self.assertEqual('ctxt', obj2._context)
+            self.assertEqual('ctxt', obj2.children[0]._context)
+            self.assertIsInstance(obj2.plain, self.plain_class)
+            # Without the layouts, the primitive is decoded instead
+            obj3 = cls.obj_from_primitive(self.codec.decode(data))
+            self.assertEqual(obj.obj_to_primitive(), obj3.obj_to_primitive())
+
+    def test_round_trip_unset_fields(self):
+        for cls in self.classes:
+            obj = cls(id=1, children=[])
+            obj2 = self._decode(self.codec.encode_object(obj))
+            self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+            self.assertFalse(obj2.obj_attr_is_set('name'))
+
+    def test_round_trip_wide(self):
+        @base.VersionedObjectRegistry.register
+        class MyWideObj(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = {
+                f'field{i}': fields.IntegerField(nullable=True)
+                for i in range(70)
+            }
+
+        obj = MyWideObj(field0=0, field65=None, field69=69)
+        obj2 = self._decode(self.codec.encode_object(obj))
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_value_out_of_layout(self):
+        obj = self._make_obj(self.classes[0])
+        obj.id = 2**70
+        data = self.codec.encode_object(obj)
+        self.assertIsNone(self._decode(data))
+        self.assertEqual(obj.obj_to_primitive(), self.codec.decode(data))
+
+    def test_fingerprint_mismatch(self):
+        obj = self._make_obj(self.classes[0])
+        data = self.codec.encode_object(obj)
+
+        @base.VersionedObjectRegistry.register
+        class MyLayoutChild(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = {
+                'name': fields.StringField(nullable=True),
+                'other': fields.IntegerField(),
+            }
+
+        self.assertIsNone(self._decode(data))
+        obj2 = base.VersionedObject.obj_from_primitive(self.codec.decode(data))
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_encode_primitive(self):
+        primitive = self._make_obj(self.classes[0]).obj_to_primitive()
+        data = self.codec.encode(primitive)
+        self.assertEqual(primitive, self.codec.decode(data))
+        self.assertIsNone(self._decode(data))
+
+    def test_decode_invalid(self):
+        data = self.codec.encode_object(self._make_obj(self.classes[0]))
+        invalid = exception.InvalidEncodedObject
+        self.assertRaises(invalid, self._decode, b'')
+        self.assertRaises(invalid, self._decode, data[:-1])
+        self.assertRaises(invalid, self._decode, data + b'\x00')
+        self.assertRaises(invalid, self.codec.decode, data[:-1])
+        self.assertRaises(invalid, self.codec.decode, b'\x02')
+
+    def test_decode_short_header(self):
+        data = self.codec.encode_object(self._make_obj(self.classes[0]))
+        for size in (2, 4, 20):
+            self.assertRaises(
+                exception.InvalidEncodedObject, self._decode, data[:size]
+            )
+            self.assertRaises(
+                exception.InvalidEncodedObject, self.codec.decode, data[:size]
+            )
+
+    def test_decode_layout_not_matching_fingerprint(self):
+        data = self.codec.encode_object(self._make_obj(self.classes[0]))
+        self.assertEqual(1, data.count(b'weightf'))
+        data = data.replace(b'weightf', b'weighti')
+        self.assertRaises(exception.InvalidEncodedObject, self._decode, data)
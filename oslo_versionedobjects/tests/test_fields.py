@@ -96,6 +96,9 @@ class TestFieldType(test.TestCase):
 
 
 class TestField(test.TestCase):
+    # Values returned by to_native(), if not the same as to_primitive()
+    to_native_values: list[tuple[Any, Any]] | None = None
+
     def setUp(self):
         super().setUp()
         self.field: Any = fields.Field(FakeFieldType())
@@ -124,6 +127,15 @@ class TestField(test.TestCase):
                 prim_val, self.field.to_primitive('obj', 'attr', in_val)
             )
 
+    def test_to_native(self):
+        values = self.to_native_values
+        if values is None:
+            values = self.to_primitive_values
+        for in_val, native_val in values:
+            self.assertEqual(
+                native_val, self.field.to_native('obj', 'attr', in_val)
+            )
+
     def test_from_primitive(self):
         class AnObject(obj_base.VersionedObject):
             fields = {
@@ -136,6 +148,19 @@ class TestField(test.TestCase):
                 out_val, self.field.from_primitive(obj, 'attr', prim_val)
             )
 
+    def test_coerce_trusted(self):
+        class AnObject(obj_base.VersionedObject):
+            fields = {
+                'intfield': fields.IntegerField(),
+            }
+
+        for prim_val, out_val in self.from_primitive_values:
+            obj = AnObject(intfield=5)
+            value = self.field.from_primitive(obj, 'attr', prim_val)
+            self.assertEqual(
+                out_val, self.field.coerce_trusted(obj, 'attr', value)
+            )
+
     def test_stringify(self):
         self.assertEqual('123', self.field.stringify(123))
 
@@ -508,6 +533,22 @@ class TestStateMachine(TestField):
             obj.status = FakeStateMachineField.ACTIVE
             obj.status = "FOO"
 
+    def test_coerce_trusted_validates(self):
+        @obj_base.VersionedObjectRegistry.register
+        class AnObject(obj_base.VersionedObject):
+            fields = {
+                'status': FakeStateMachineField(),
+            }
+
+        obj = AnObject()
+        self.assertRaises(
+            ValueError,
+            AnObject.fields['status'].coerce_trusted,
+            obj,
+            'status',
+            'FOO',
+        )
+
 
 class TestInteger(TestField):
     def setUp(self):
@@ -640,7 +681,14 @@ class TestDateTime(TestField):
         ]
         self.coerce_bad_values = [1, 'foo']
         self.to_primitive_values = [(self.dt, _utils.isotime(self.dt))]
-        self.from_primitive_values = [(_utils.isotime(self.dt), self.dt)]
+        self.from_primitive_values = [
+            (_utils.isotime(self.dt), self.dt),
+            (self.dt, self.dt),
+        ]
+        self.to_native_values = [
+            (self.dt, self.dt),
+            (self.dt.replace(microsecond=5), self.dt),
+        ]
 
     def test_stringify(self):
         self.assertEqual(
@@ -674,8 +722,10 @@ class TestDateTimeNoTzinfo(TestField):
             (
                 _utils.isotime(self.dt),
                 self.dt,
-            )
+            ),
+            (self.dt.replace(tzinfo=datetime.timezone.utc), self.dt),
         ]
+        self.to_native_values = [(self.dt, self.dt)]
 
     def test_stringify(self):
         self.assertEqual(
@@ -812,6 +862,13 @@ class TestList(TestField):
     def test_stringify(self):
         self.assertEqual('[123]', self.field.stringify([123]))
 
+    def test_coerce_trusted_keeps_coercing(self):
+        value = self.field.coerce_trusted(None, 'attr', ['foo'])
+        self.assertIsInstance(value, fields.CoercedList)
+        self.assertEqual(['foo'], value)
+        value.append('bar')
+        self.assertEqual(['foo', '*bar*'], value)
+
     def test_fieldtype_get_schema(self):
         self.assertEqual(
             {'type': ['array'], 'items': {'type': ['foo'], 'readonly': False}},
@@ -852,6 +909,7 @@ class TestSetOfStrings(TestField):
         ]
         self.coerce_bad_values = [['foo']]
         self.to_primitive_values = [({'foo'}, tuple(['foo']))]
+        self.to_native_values = [({'foo'}, {'foo'})]
         self.from_primitive_values = [(tuple(['foo']), {'foo'})]
 
     def test_stringify(self):
@@ -901,6 +959,7 @@ class TestDictOfSetOfIntegers(TestField):
         self.coerce_good_values = [({'foo': {'1', 2}}, {'foo': {1, 2}})]
         self.coerce_bad_values = [{'foo': {'bar'}}]
         self.to_primitive_values = [({'foo': {1}}, {'foo': tuple([1])})]
+        self.to_native_values = [({'foo': {1}}, {'foo': {1}})]
         self.from_primitive_values = [({'foo': tuple([1])}, {'foo': {1}})]
 
     def test_stringify(self):
@@ -937,7 +996,11 @@ class TestSet(TestField):
         self.coerce_good_values = [({'foo', 'bar'}, {'*foo*', '*bar*'})]
         self.coerce_bad_values = [['foo'], {'foo': 'bar'}]
         self.to_primitive_values = [({'foo'}, tuple(['!foo!']))]
-        self.from_primitive_values = [(tuple(['!foo!']), {'foo'})]
+        self.from_primitive_values = [
+            (tuple(['!foo!']), {'foo'}),
+            ({'!foo!'}, {'foo'}),
+        ]
+        self.to_native_values = [({'foo'}, {'!foo!'})]
 
     def test_stringify(self):
         self.assertEqual('set([123])', self.field.stringify({123}))
@@ -962,6 +1025,7 @@ class TestSetOfIntegers(TestField):
         self.coerce_bad_values = [{'foo'}]
         self.to_primitive_values = [({1}, tuple([1]))]
         self.from_primitive_values = [(tuple([1]), {1})]
+        self.to_native_values = [({1}, {1})]
 
     def test_stringify(self):
         self.assertEqual('set([1,2])', self.field.stringify({1, 2}))
@@ -989,6 +1053,7 @@ class TestListOfSetsOfIntegers(TestField):
         self.coerce_good_values = [([{'1', 2}, {3, '4'}], [{1, 2}, {3, 4}])]
         self.coerce_bad_values = [[{'foo'}]]
         self.to_primitive_values = [([{1}], [tuple([1])])]
+        self.to_native_values = [([{1}], [{1}])]
         self.from_primitive_values = [([tuple([1])], [{1}])]
 
     def test_stringify(self):
@@ -1043,16 +1108,19 @@ class TestLocalMethods(test.TestCase):
 
     @mock.patch.object(obj_base.LOG, 'exception')
     def test__make_class_properties_setter_setattr_fails(self, mock_log):
-        @obj_base.VersionedObjectRegistry.register
-        class AnObject(obj_base.VersionedObject):
-            fields = {
-                'intfield': fields.IntegerField(),
-            }
-
         # We want the setattr() call in _make_class_properties.setter() to
-        # raise an exception
+        # raise an exception. The storage attribute names are computed when
+        # the class properties are made, so register the class with the
+        # mock in place.
         with mock.patch.object(obj_base, '_get_attrname') as mock_attr:
             mock_attr.return_value = '__class__'
+
+            @obj_base.VersionedObjectRegistry.register
+            class AnObject(obj_base.VersionedObject):
+                fields = {
+                    'intfield': fields.IntegerField(),
+                }
+
             self.assertRaises(TypeError, AnObject, intfield=2)
             mock_attr.assert_called_once_with('intfield')
             mock_log.assert_called_once_with(
@@ -1296,6 +1364,10 @@ class TestIPAddress(TestField):
         self.from_primitive_values = [
             ('1.2.3.4', netaddr.IPAddress('1.2.3.4')),
             ('::1', netaddr.IPAddress('::1')),
+            (netaddr.IPAddress('::1'), netaddr.IPAddress('::1')),
+        ]
+        self.to_native_values = [
+            (netaddr.IPAddress('1.2.3.4'), netaddr.IPAddress('1.2.3.4'))
         ]
 
 
@@ -1309,6 +1381,9 @@ class TestIPAddressV4(TestField):
         ]
         self.coerce_bad_values = ['1-2', 'foo', '::1']
         self.to_primitive_values = [(netaddr.IPAddress('1.2.3.4'), '1.2.3.4')]
+        self.to_native_values = [
+            (netaddr.IPAddress('1.2.3.4'), netaddr.IPAddress('1.2.3.4'))
+        ]
         self.from_primitive_values = [
             ('1.2.3.4', netaddr.IPAddress('1.2.3.4'))
         ]
@@ -1330,6 +1405,9 @@ class TestIPAddressV6(TestField):
         ]
         self.coerce_bad_values = ['1.2', 'foo', '1.2.3.4']
         self.to_primitive_values = [(netaddr.IPAddress('::1'), '::1')]
+        self.to_native_values = [
+            (netaddr.IPAddress('::1'), netaddr.IPAddress('::1'))
+        ]
         self.from_primitive_values = [('::1', netaddr.IPAddress('::1'))]
 
     def test_get_schema(self):
@@ -1354,6 +1432,9 @@ class TestIPV4AndV6Address(TestField):
             (netaddr.IPAddress('::1'), '::1'),
             (netaddr.IPAddress('1.2.3.4'), '1.2.3.4'),
         ]
+        self.to_native_values = [
+            (netaddr.IPAddress('::1'), netaddr.IPAddress('::1'))
+        ]
         self.from_primitive_values = [
             ('::1', netaddr.IPAddress('::1')),
             ('1.2.3.4', netaddr.IPAddress('1.2.3.4')),
@@ -1382,7 +1463,13 @@ class TestIPNetwork(TestField):
         ]
         self.coerce_bad_values = ['foo']
         self.to_primitive_values = [(netaddr.IPNetwork('::1/0'), '::1/0')]
-        self.from_primitive_values = [('::1/0', netaddr.IPNetwork('::1/0'))]
+        self.from_primitive_values = [
+            ('::1/0', netaddr.IPNetwork('::1/0')),
+            (netaddr.IPNetwork('::1/0'), netaddr.IPNetwork('::1/0')),
+        ]
+        self.to_native_values = [
+            (netaddr.IPNetwork('::1/0'), netaddr.IPNetwork('::1/0'))
+        ]
 
 
 class TestIPV4Network(TestField):
@@ -1396,6 +1483,9 @@ class TestIPV4Network(TestField):
         self.to_primitive_values = [
             (netaddr.IPNetwork('1.2.3.4/24'), '1.2.3.4/24')
         ]
+        self.to_native_values = [
+            (netaddr.IPNetwork('1.2.3.4/24'), netaddr.IPNetwork('1.2.3.4/24'))
+        ]
         self.from_primitive_values = [
             ('1.2.3.4/24', netaddr.IPNetwork('1.2.3.4/24'))
         ]
@@ -1422,7 +1512,13 @@ class TestIPV6Network(TestField):
         ]
         self.coerce_bad_values = ['foo', '1.2.3.4/24']
         self.to_primitive_values = [(netaddr.IPNetwork('::1/0'), '::1/0')]
-        self.from_primitive_values = [('::1/0', netaddr.IPNetwork('::1/0'))]
+        self.from_primitive_values = [
+            ('::1/0', netaddr.IPNetwork('::1/0')),
+            (netaddr.IPNetwork('::1/0'), netaddr.IPNetwork('::1/0')),
+        ]
+        self.to_native_values = [
+            (netaddr.IPNetwork('::1/0'), netaddr.IPNetwork('::1/0'))
+        ]
 
     def test_get_schema(self):
         schema = self.field.get_schema()
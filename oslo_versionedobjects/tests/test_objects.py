@@ -12,18 +12,32 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import collections
 import copy
 import datetime
+from importlib import metadata as importlib_metadata
+import json
 import jsonschema
 import logging
+import pickle
+import sys
+import typing
 from unittest import mock
 import warnings
+import zlib
 
+import netaddr
+from oslo_config import fixture as config_fixture
 from oslo_context import context
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
+from oslo_utils import versionutils as vutils
 import testtools
 
+from oslo_versionedobjects import _options
 from oslo_versionedobjects import base
+from oslo_versionedobjects import codec
 from oslo_versionedobjects import exception
 from oslo_versionedobjects import fields
 from oslo_versionedobjects import fixture
@@ -372,6 +386,201 @@ class TestRegistry(test.TestCase):
         mock_register_if.assert_called_once_with(False)
         mock_reg_callable.assert_called_once_with(my_class)
 
+    def _register_lazy(self, objname, module):
+        registry = self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        class MyLazyRegisteredObj(base.VersionedObject):
+            fields = {'child': fields.ObjectField('MyOwnedObject')}
+
+        MyLazyRegisteredObj.__module__ = module
+
+        def import_module(name):
+            self.assertEqual(module, name)
+            registry.register(MyLazyRegisteredObj)
+
+        base.VersionedObjectRegistry.register_lazy(objname, module)
+        import_patch = mock.patch(
+            'oslo_versionedobjects.base.importlib.import_module',
+            side_effect=import_module,
+        )
+        self.addCleanup(import_patch.stop)
+        return MyLazyRegisteredObj, import_patch.start()
+
+    def test_register_lazy(self):
+        objclass, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        self.assertNotIn(
+            'MyLazyRegisteredObj', base.VersionedObjectRegistry()._obj_classes
+        )
+        self.assertIs(
+            objclass,
+            base.VersionedObject.obj_class_from_name(
+                'MyLazyRegisteredObj', '1.0'
+            ),
+        )
+        self.assertIs(
+            objclass,
+            base.VersionedObject.obj_class_from_name(
+                'MyLazyRegisteredObj', '1.0'
+            ),
+        )
+        mock_import.assert_called_once_with('myproject.objects.lazy')
+
+    def test_register_lazy_manifest(self):
+        _, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        self.assertEqual(
+            {'MyLazyRegisteredObj': '1.0', 'MyOwnedObject': '1.0'},
+            base.obj_tree_get_versions('MyLazyRegisteredObj'),
+        )
+        mock_import.assert_called_once_with('myproject.objects.lazy')
+
+    def test_load_lazy(self):
+        objclass, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        base.VersionedObjectRegistry.load_lazy()
+        mock_import.assert_called_once_with('myproject.objects.lazy')
+        self.assertEqual(
+            [objclass],
+            base.VersionedObjectRegistry.obj_classes()['MyLazyRegisteredObj'],
+        )
+
+    def test_obj_classes_lazy(self):
+        objclass, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        self.assertEqual(
+            [objclass],
+            base.VersionedObjectRegistry.obj_classes()['MyLazyRegisteredObj'],
+        )
+        mock_import.assert_called_once_with('myproject.objects.lazy')
+
+    def test_register_lazy_import_error(self):
+        objclass, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        import_module = mock_import.side_effect
+        mock_import.side_effect = ImportError()
+        self.assertRaises(
+            ImportError,
+            base.VersionedObject.obj_class_from_name,
+            'MyLazyRegisteredObj',
+            '1.0',
+        )
+        mock_import.side_effect = import_module
+        self.assertIs(
+            objclass,
+            base.VersionedObject.obj_class_from_name(
+                'MyLazyRegisteredObj', '1.0'
+            ),
+        )
+
+    def test_register_lazy_loaded_under_fixture(self):
+        objclass, mock_import = self._register_lazy(
+            'MyLazyRegisteredObj', 'myproject.objects.lazy'
+        )
+        registry = fixture.VersionedObjectRegistryFixture()
+        registry.setUp()
+        self.assertIs(
+            objclass,
+            base.VersionedObject.obj_class_from_name(
+                'MyLazyRegisteredObj', '1.0'
+            ),
+        )
+        registry.cleanUp()
+        # The module stays imported, so its classes stay registered
+        self.assertIs(
+            objclass,
+            base.VersionedObject.obj_class_from_name(
+                'MyLazyRegisteredObj', '1.0'
+            ),
+        )
+        self.assertNotIn(
+            'MyLazyRegisteredObj',
+            base.VersionedObjectRegistry._obj_lazy_modules,
+        )
+        mock_import.assert_called_once_with('myproject.objects.lazy')
+
+    @mock.patch('oslo_versionedobjects.base.importlib_metadata.entry_points')
+    def test_register_entry_points(self, mock_entry_points):
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+        mock_entry_points.return_value = [
+            importlib_metadata.EntryPoint(
+                'MyLazyRegisteredObj', 'myproject.objects.lazy', 'myproject'
+            )
+        ]
+        base.VersionedObjectRegistry.register_entry_points('myproject')
+        mock_entry_points.assert_called_once_with(group='myproject')
+        self.assertEqual(
+            {'MyLazyRegisteredObj': 'myproject.objects.lazy'},
+            base.VersionedObjectRegistry._obj_lazy_modules,
+        )
+
+    def _freeze(self):
+        def thaw():
+            base.VersionedObjectRegistry._frozen = None
+            base.VersionedObjectRegistry._invalidate_caches()
+
+        self.addCleanup(thaw)
+        return base.VersionedObjectRegistry.freeze()
+
+    def test_freeze(self):
+        snapshot = self._freeze()
+        self.assertIs(snapshot, base.VersionedObjectRegistry.freeze())
+        self.assertEqual(
+            tuple(base.VersionedObjectRegistry.obj_classes()['MyObj']),
+            snapshot.classes['MyObj'],
+        )
+        self.assertEqual('1.6', snapshot.latest_versions['MyObj'])
+        self.assertEqual(
+            {'MyObj': '1.6', 'MyOwnedObject': '1.0'},
+            snapshot.manifests['MyObj'],
+        )
+        self.assertEqual(
+            dict(snapshot.manifests['MyObj']),
+            base.obj_tree_get_versions('MyObj'),
+        )
+        self.assertIs(
+            MyObj, base.VersionedObject.obj_class_from_name('MyObj', '1.1')
+        )
+
+        class MyFrozenObj(base.VersionedObject):
+            pass
+
+        self.assertRaises(
+            exception.RegistryFrozen,
+            base.VersionedObjectRegistry.register,
+            MyFrozenObj,
+        )
+        self.assertNotIn('MyFrozenObj', snapshot.classes)
+
+    def test_freeze_fixture(self):
+        self._freeze()
+
+        class MyFrozenObj(base.VersionedObject):
+            pass
+
+        with fixture.VersionedObjectRegistryFixture() as obj_registry:
+            obj_registry.register(MyFrozenObj)
+            self.assertIs(
+                MyFrozenObj,
+                base.VersionedObject.obj_class_from_name('MyFrozenObj', '1.0'),
+            )
+        self.assertRaises(
+            exception.UnsupportedObjectError,
+            base.VersionedObject.obj_class_from_name,
+            'MyFrozenObj',
+            '1.0',
+        )
+        self.assertRaises(
+            exception.RegistryFrozen,
+            base.VersionedObjectRegistry.register,
+            MyFrozenObj,
+        )
+
 
 class TestObjMakeList(test.TestCase):
     def test_obj_make_list(self):
@@ -394,6 +603,142 @@ class TestObjMakeList(test.TestCase):
             self.assertEqual(db_objs[index]['missing'], item.missing)
 
 
+@base.VersionedObjectRegistry.register
+class MyMappedObj(base.VersionedObject):
+    fields = {
+        'id': fields.IntegerField(),
+        'name': fields.StringField(nullable=True),
+        'created': fields.DateTimeField(nullable=True),
+        'flag': fields.BooleanField(),
+    }
+    obj_db_columns = {
+        'id': 'id',
+        'display_name': 'name',
+        'created_at': 'created',
+        'flag': 'flag',
+    }
+    obj_db_converters = {'flag': lambda value: value == 'yes'}
+
+
+@base.VersionedObjectRegistry.register
+class MyMappedObjList(base.ObjectListBase[MyMappedObj], base.VersionedObject):
+    fields = {'objects': fields.ListOfObjectsField('MyMappedObj')}
+
+
+class TestObjFromDbRows(test.TestCase):
+    def _rows(self):
+        return [
+            {
+                'id': i,
+                'display_name': f'name-{i}',
+                'created_at': datetime.datetime(2020, 1, 1),
+                'flag': 'yes',
+                'extra': 'ignored',
+            }
+            for i in range(3)
+        ]
+
+    def test_obj_make_list(self):
+        mylist = base.obj_make_list(
+            'ctxt', MyMappedObjList(), MyMappedObj, self._rows()
+        )
+        self.assertEqual([0, 1, 2], [item.id for item in mylist])
+        self.assertEqual('name-1', mylist[1].name)
+        self.assertTrue(mylist[1].flag)
+        self.assertEqual(
+            datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+            mylist[1].created,
+        )
+        self.assertEqual('ctxt', mylist[1]._context)
+        self.assertEqual(set(), mylist.obj_what_changed())
+        self.assertEqual(set(), mylist[1].obj_what_changed())
+        mylist[1].name = 'foo'
+        self.assertEqual({'objects'}, mylist.obj_what_changed())
+
+    def test_values_coerced(self):
+        rows = self._rows()
+        rows[0]['id'] = '5'
+        rows[0]['display_name'] = None
+        objs = MyMappedObj.obj_from_db_rows('ctxt', rows)
+        self.assertEqual(5, objs[0].id)
+        self.assertIsNone(objs[0].name)
+        rows[0]['id'] = None
+        self.assertRaises(ValueError, MyMappedObj.obj_from_db_rows, None, rows)
+
+    def test_extra_args_use_from_db_object(self):
+        with mock.patch.object(
+            MyMappedObj, '_from_db_object', create=True
+        ) as mock_from_db:
+            mock_from_db.side_effect = lambda context, obj, row, **kw: obj
+            base.obj_make_list(
+                'ctxt', MyMappedObjList(), MyMappedObj, self._rows(), foo=1
+            )
+        self.assertEqual(3, mock_from_db.call_count)
+
+    def test_slot_storage(self):
+        class TestObj(MyMappedObj):
+            OBJ_SLOT_STORAGE = True
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        objs = TestObj.obj_from_db_rows(None, self._rows())
+        self.assertEqual('name-2', objs[2].name)
+        self.assertFalse(objs[2].obj_has_changes())
+
+    def test_not_mapped(self):
+        self.assertRaises(
+            NotImplementedError, MyObj.obj_from_db_rows, None, []
+        )
+
+        class TestObj(MyMappedObj):
+            obj_db_columns = {'id': 'uuid'}
+
+        self.assertRaises(ValueError, TestObj.obj_from_db_rows, None, [])
+
+
+class TestObjectVersion(test.TestCase):
+    def test_parse(self):
+        version = base.ObjectVersion.parse('1.10')
+        self.assertIs(version, base.ObjectVersion.parse('1.10'))
+        self.assertEqual((1, 10), version)
+        self.assertEqual('1.10', str(version))
+        self.assertGreater(version, base.ObjectVersion.parse('1.9'))
+        self.assertLess(version, base.ObjectVersion.parse('2.0'))
+        self.assertRaises(ValueError, base.ObjectVersion.parse, 'foo')
+
+    def test_copy_pickle(self):
+        version = base.ObjectVersion.parse('1.10')
+        for copied in (
+            copy.copy(version),
+            copy.deepcopy(version),
+            pickle.loads(pickle.dumps(version)),
+        ):
+            self.assertIsInstance(copied, base.ObjectVersion)
+            self.assertEqual(version, copied)
+            self.assertEqual('1.10', str(copied))
+
+    def test_is_compatible(self):
+        for requested, current, compatible in (
+            ('1.2', '1.2', True),
+            ('1.2', '1.10', True),
+            ('1.10', '1.2', False),
+            ('1.2', '2.2', False),
+            ('2.0', '1.9', False),
+            ('1.0.0', '1.0', True),
+            ('1.0', '1.0.0', True),
+            ('1.0.1', '1.0', False),
+        ):
+            self.assertEqual(
+                compatible,
+                base.ObjectVersion.parse(requested).is_compatible(
+                    base.ObjectVersion.parse(current)
+                ),
+                f'{requested} {current}',
+            )
+            self.assertEqual(
+                vutils.is_compatible(requested, current), compatible
+            )
+
+
 class TestGetSubobjectVersion(test.TestCase):
     def setUp(self):
         super().setUp()
@@ -515,6 +860,68 @@ class TestDoSubobjectBackport(test.TestCase):
         child_primitive = parent_primitive['versioned_object.data']['objects']
         self.assertEqual('1.0', child_primitive[0]['versioned_object.version'])
 
+    def test_backport_plan(self):
+        parent = self.ParentObj(child=self.ChildObj(foo=1))
+        self.assertEqual(
+            base._BackportPlan({'child': '1.0'}, frozenset()),
+            parent._obj_backport_plan('1.0'),
+        )
+        parent._obj_version_manifest = {'ChildObj': '1.1'}
+        self.assertEqual(
+            base._BackportPlan({'child': '1.1'}, frozenset()),
+            parent._obj_backport_plan('1.0'),
+        )
+        parent._obj_version_manifest = {'ParentObj': '1.0'}
+        self.assertEqual(
+            base._BackportPlan({}, frozenset()),
+            parent._obj_backport_plan('1.0'),
+        )
+
+    def test_backport_plan_cached(self):
+        base.VersionedObjectRegistry._invalidate_caches()
+        parent = self.ParentObj(child=self.ChildObj(foo=1))
+        with mock.patch.object(
+            self.ParentObj,
+            '_obj_compile_backport_plan',
+            wraps=self.ParentObj._obj_compile_backport_plan,
+        ) as mock_compile:
+            for manifest in (
+                {'ParentObj': '1.0', 'ChildObj': '1.0'},
+                {'ParentObj': '1.1', 'ChildObj': '1.0', 'Other': '1.0'},
+            ):
+                primitive = parent.obj_to_primitive(
+                    target_version='1.0', version_manifest=manifest
+                )
+                child_primitive = primitive['versioned_object.data']['child']
+                self.assertEqual(
+                    '1.0', child_primitive['versioned_object.version']
+                )
+        mock_compile.assert_called_once_with('1.0', ('1.0',))
+
+    def test_backport_plan_rules_replaced(self):
+        parent = self.ParentObj(child=self.ChildObj(foo=1))
+
+        def child_version():
+            primitive = parent.obj_to_primitive(target_version='1.0')
+            child_primitive = primitive['versioned_object.data']['child']
+            return child_primitive['versioned_object.version']
+
+        self.assertEqual('1.0', child_version())
+        with mock.patch.object(
+            self.ParentObj, 'obj_relationships', {'child': [('1.0', '1.1')]}
+        ):
+            self.assertEqual('1.1', child_version())
+        self.assertEqual('1.0', child_version())
+
+    def test_backport_plans_bounded(self):
+        parent = self.ParentObj(child=self.ChildObj(foo=1))
+        with mock.patch.object(base, '_MAX_BACKPORT_PLANS', 2):
+            for minor in range(5):
+                parent._obj_backport_plan(f'1.{minor}')
+        plans = self.ParentObj._obj_backport_plans
+        assert plans is not None
+        self.assertLessEqual(len(plans.plans), 2)
+
     def test_do_subobject_backport_null_child(self):
         parent = self.ParentObj(child=None)
         parent_primitive = parent.obj_to_primitive()['versioned_object.data']
@@ -1042,6 +1449,102 @@ class _TestObject(_BaseTestCase):
         except exception.IncompatibleObjectVersion as error:
             self.assertEqual('1.6', error.kwargs['supported'])
 
+    def test_obj_class_from_name_cached(self):
+        base.VersionedObject.obj_class_from_name('MyObj', '1.5')
+        self.assertRaises(
+            exception.UnsupportedObjectError,
+            base.VersionedObject.obj_class_from_name,
+            'foo',
+            '1.0',
+        )
+        with mock.patch.object(base, '_find_class') as mock_find:
+            obj = base.VersionedObject.obj_class_from_name('MyObj', '1.5')
+            self.assertRaises(
+                exception.UnsupportedObjectError,
+                base.VersionedObject.obj_class_from_name,
+                'foo',
+                '1.0',
+            )
+        mock_find.assert_not_called()
+        self.assertEqual('1.5', obj.VERSION)
+
+    def test_obj_class_from_name_version_changed(self):
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyChangingObj(base.VersionedObject):
+            VERSION = '1.0'
+
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            base.VersionedObject.obj_class_from_name,
+            'MyChangingObj',
+            '1.1',
+        )
+        with mock.patch.object(MyChangingObj, 'VERSION', '1.1'):
+            # The classes found are only forgotten with the caches
+            self.assertRaises(
+                exception.IncompatibleObjectVersion,
+                base.VersionedObject.obj_class_from_name,
+                'MyChangingObj',
+                '1.1',
+            )
+            base.VersionedObjectRegistry._invalidate_caches()
+            self.assertIs(
+                MyChangingObj,
+                base.VersionedObject.obj_class_from_name(
+                    'MyChangingObj', '1.1'
+                ),
+            )
+        base.VersionedObjectRegistry._invalidate_caches()
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            base.VersionedObject.obj_class_from_name,
+            'MyChangingObj',
+            '1.1',
+        )
+
+    def test_obj_class_from_name_cache_bounded(self):
+        with mock.patch.object(base, '_MAX_CLASS_LOOKUPS', 4):
+            for minor in range(20):
+                self.assertRaises(
+                    exception.IncompatibleObjectVersion,
+                    base.VersionedObject.obj_class_from_name,
+                    'MyObj',
+                    f'2.{minor}',
+                )
+        self.assertLessEqual(
+            len(base.VersionedObjectRegistry._obj_class_cache), 4
+        )
+
+    def test_obj_class_from_name_registered(self):
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            base.VersionedObject.obj_class_from_name,
+            'MyObj',
+            '1.7',
+        )
+        with fixture.VersionedObjectRegistryFixture() as obj_registry:
+
+            class MyNewerObj(MyObj):
+                VERSION = '1.7'
+
+                @classmethod
+                def obj_name(cls):
+                    return 'MyObj'
+
+            obj_registry.register(MyNewerObj)
+            self.assertIs(
+                MyNewerObj,
+                base.VersionedObject.obj_class_from_name('MyObj', '1.7'),
+            )
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            base.VersionedObject.obj_class_from_name,
+            'MyObj',
+            '1.7',
+        )
+
     def test_orphaned_object(self):
         obj = MyObj.query(self.context)
         obj._context = None
@@ -1786,6 +2289,15 @@ class TestRemoteObject(_RemoteTest, _TestObject):
             exception.IncompatibleObjectVersion, MyObj2.query, self.context
         )
 
+    def test_projection(self):
+        with base.obj_projection(fields=['foo']) as projection:
+            self.assertEqual(projection, base.obj_get_projection())
+            obj = MyObj.query(self.context)
+        self.assertIsNone(base.obj_get_projection())
+        self.assertEqual(1, obj.foo)
+        self.assertFalse(obj.obj_attr_is_set('bar'))
+        self.assertEqual('loaded!', obj.bar)
+
     @mock.patch('oslo_versionedobjects.base.obj_tree_get_versions')
     def test_minor_version_less(self, mock_otgv):
         mock_otgv.return_value = {'MyObj': '1.2'}
@@ -1888,6 +2400,7 @@ class TestObjectListBase(test.TestCase):
     def test_obj_make_compatible_child_versions(self):
         @base.VersionedObjectRegistry.register
         class MyElement(base.VersionedObject):
+            VERSION = '1.1'
             fields = {'foo': fields.IntegerField()}
 
         @base.VersionedObjectRegistry.register
@@ -1909,6 +2422,7 @@ class TestObjectListBase(test.TestCase):
     def test_obj_make_compatible_obj_relationships(self):
         @base.VersionedObjectRegistry.register
         class MyElement(base.VersionedObject):
+            VERSION = '1.1'
             fields = {'foo': fields.IntegerField()}
 
         @base.VersionedObjectRegistry.register
@@ -1930,6 +2444,7 @@ class TestObjectListBase(test.TestCase):
     def test_obj_make_compatible_no_relationships(self):
         @base.VersionedObjectRegistry.register
         class MyElement(base.VersionedObject):
+            VERSION = '1.1'
             fields = {'foo': fields.IntegerField()}
 
         @base.VersionedObjectRegistry.register
@@ -1947,6 +2462,27 @@ class TestObjectListBase(test.TestCase):
             obj.obj_make_compatible(copy.copy(primitive), '1.1')
             self.assertTrue(mock_compat.called)
 
+    def test_obj_make_compatible_elements_at_version(self):
+        @base.VersionedObjectRegistry.register
+        class MyElement(base.VersionedObject):
+            fields = {'foo': fields.IntegerField()}
+
+        @base.VersionedObjectRegistry.register
+        class Foo(
+            base.ObjectListBase[base.VersionedObject], base.VersionedObject
+        ):
+            VERSION = '1.1'
+            fields = {'objects': fields.ListOfObjectsField('MyElement')}
+            child_versions = {'1.0': '1.0', '1.1': '1.0'}
+
+        subobj = MyElement(foo=1)
+        obj = Foo(objects=[subobj])
+        primitive = obj.obj_to_primitive()['versioned_object.data']
+
+        with mock.patch.object(subobj, 'obj_make_compatible') as mock_compat:
+            obj.obj_make_compatible(copy.copy(primitive), '1.1')
+            self.assertFalse(mock_compat.called)
+
     def test_list_changes(self):
         @base.VersionedObjectRegistry.register
         class Foo(
@@ -2012,6 +2548,107 @@ class TestObjectSerializer(_BaseTestCase):
         ser = base.VersionedObjectSerializer()
         self.assertEqual([1, 2], ser.serialize_entity(None, {1, 2}))
 
+    def test_serialize_entity_projection(self):
+        ser = base.VersionedObjectSerializer()
+        obj = MyObj(foo=1, bar='bar', rel_object=MyOwnedObject(baz=1))
+        primitive = ser.serialize_entity(
+            None, {'obj': [obj]}, exclude=['bar', 'rel_object.baz']
+        )
+        data = primitive['obj'][0]['versioned_object.data']
+        self.assertEqual({'foo', 'rel_object'}, set(data))
+        self.assertEqual({}, data['rel_object']['versioned_object.data'])
+        primitive = ser.serialize_entity(None, obj, fields=iter(['foo']))
+        self.assertEqual({'foo': 1}, primitive['versioned_object.data'])
+
+    def test_serialize_entity_nested(self):
+        class RecursiveSerializer(base.VersionedObjectSerializer):
+            def _process_iterable(self, context, action_fn, values):
+                return super()._process_iterable(context, action_fn, values)
+
+        obj = MyObj(foo=1)
+        thing = {
+            'list': [obj, (obj, {obj}), [[], {}]],
+            'dict': collections.OrderedDict([('b', obj), ('a', [1, 'x'])]),
+            'value': None,
+        }
+        ser = base.VersionedObjectSerializer()
+        recursive = RecursiveSerializer()
+        self.assertFalse(recursive._obj_get_dispatch().iterative)
+        self.assertTrue(ser._obj_get_dispatch().iterative)
+        primitive = ser.serialize_entity(self.context, thing)
+        self.assertEqual(
+            recursive.serialize_entity(self.context, thing), primitive
+        )
+        self.assertIsInstance(primitive['list'][1], tuple)
+        self.assertIsInstance(primitive['list'][1][1], list)
+        self.assertIsInstance(primitive['dict'], collections.OrderedDict)
+        self.assertEqual(['b', 'a'], list(primitive['dict']))
+        self.assertEqual(obj.obj_to_primitive(), primitive['list'][0])
+
+        thing2 = ser.deserialize_entity(self.context, primitive)
+        self.assertEqual(
+            primitive,
+            ser.serialize_entity(
+                self.context,
+                recursive.deserialize_entity(self.context, primitive),
+            ),
+        )
+        self.assertEqual(primitive, ser.serialize_entity(self.context, thing2))
+        self.assertIsInstance(thing2['list'][1][1][0], MyObj)
+        self.assertIsInstance(thing2['dict']['b'], MyObj)
+
+    def test_serialize_entity_overridden(self):
+        class MySerializer(base.VersionedObjectSerializer):
+            def serialize_entity(
+                self, context, entity, fields=None, exclude=None, codec=None
+            ):
+                if entity == 'secret':
+                    return '***'
+                return super().serialize_entity(
+                    context, entity, fields, exclude, codec
+                )
+
+        self.assertEqual(
+            ['***', {'a': ('***', 1)}],
+            MySerializer().serialize_entity(
+                None, ['secret', {'a': ('secret', 1)}]
+            ),
+        )
+
+    def test_serialize_entity_handlers(self):
+        class Point(typing.NamedTuple):
+            x: int
+            y: int
+
+        class MySerializer(base.VersionedObjectSerializer):
+            OBJ_SERIALIZE_HANDLERS = {
+                tuple: lambda context, entity: [context, len(entity)],
+            }
+
+        ser = MySerializer()
+        self.assertEqual(
+            {'a': [[self.context, 2], [self.context, 0]], 'b': [1]},
+            ser.serialize_entity(
+                self.context, {'a': [Point(1, 2), ()], 'b': [1]}
+            ),
+        )
+        self.assertEqual(
+            [(1, 2)],
+            base.VersionedObjectSerializer().serialize_entity(
+                None, [Point(1, 2)]
+            ),
+        )
+
+    def test_serialize_entity_mock(self):
+        thing = mock.Mock()
+        thing.obj_to_primitive.return_value = 'primitive'
+        ser = base.VersionedObjectSerializer()
+        self.assertEqual(
+            ['primitive', 'primitive'],
+            ser.serialize_entity(None, [thing, thing]),
+        )
+        self.assertEqual([object], ser.serialize_entity(None, [object]))
+
     @mock.patch('oslo_versionedobjects.base.VersionedObject.indirection_api')
     def _test_deserialize_entity_newer(
         self, obj_version, backported_to, mock_iapi, my_version='1.6'
@@ -2464,6 +3101,31 @@ class TestNamespaceCompatibility(test.TestCase):
 
 
 class TestUtilityMethods(test.TestCase):
+    def test_version_changed(self):
+        @base.VersionedObjectRegistry.register
+        class TestChild(base.VersionedObject):
+            VERSION = '2.34'
+
+        @base.VersionedObjectRegistry.register
+        class TestObject(base.VersionedObject):
+            VERSION = '1.23'
+            fields = {
+                'child': fields.ObjectField('TestChild'),
+            }
+
+        base.obj_tree_get_versions('TestObject')
+        with mock.patch.object(TestChild, 'VERSION', '2.35'):
+            base.VersionedObjectRegistry._invalidate_caches()
+            self.assertEqual(
+                {'TestObject': '1.23', 'TestChild': '2.35'},
+                base.obj_tree_get_versions('TestObject'),
+            )
+        base.VersionedObjectRegistry._invalidate_caches()
+        self.assertEqual(
+            {'TestObject': '1.23', 'TestChild': '2.34'},
+            base.obj_tree_get_versions('TestObject'),
+        )
+
     def test_flat(self):
         @base.VersionedObjectRegistry.register
         class TestObject(base.VersionedObject):
@@ -2576,16 +3238,54 @@ class TestUtilityMethods(test.TestCase):
             exc.format_message(),
         )
 
+    def test_cached(self):
+        @base.VersionedObjectRegistry.register
+        class TestChild(base.VersionedObject):
+            VERSION = '2.34'
 
-class TestListObjectConcat(test.TestCase):
-    def test_list_object_concat(self):
-        @base.VersionedObjectRegistry.register_if(False)
-        class MyList(base.ObjectListBase[MyOwnedObject], base.VersionedObject):
-            fields = {'objects': fields.ListOfObjectsField('MyOwnedObject')}
-
-        values = [1, 2, 42]
+        @base.VersionedObjectRegistry.register
+        class TestObject(base.VersionedObject):
+            VERSION = '1.23'
+            fields = {
+                'child': fields.ObjectField('TestChild'),
+            }
 
-        list1 = MyList(
+        tree = base.obj_tree_get_versions('TestObject')
+        tree['TestChild'] = '2.0'
+        with mock.patch.object(
+            base.VersionedObjectRegistry, 'obj_classes'
+        ) as mock_classes:
+            tree = base.obj_tree_get_versions('TestObject')
+            child_tree = base.obj_tree_get_versions('TestChild')
+        mock_classes.assert_not_called()
+        self.assertEqual({'TestObject': '1.23', 'TestChild': '2.34'}, tree)
+        self.assertEqual({'TestChild': '2.34'}, child_tree)
+
+        with fixture.VersionedObjectRegistryFixture() as obj_registry:
+
+            class TestChildNewer(base.VersionedObject):
+                VERSION = '2.35'
+
+                @classmethod
+                def obj_name(cls):
+                    return 'TestChild'
+
+            obj_registry.register(TestChildNewer)
+            tree = base.obj_tree_get_versions('TestObject')
+        self.assertEqual({'TestObject': '1.23', 'TestChild': '2.35'}, tree)
+        tree = base.obj_tree_get_versions('TestObject')
+        self.assertEqual({'TestObject': '1.23', 'TestChild': '2.34'}, tree)
+
+
+class TestListObjectConcat(test.TestCase):
+    def test_list_object_concat(self):
+        @base.VersionedObjectRegistry.register_if(False)
+        class MyList(base.ObjectListBase[MyOwnedObject], base.VersionedObject):
+            fields = {'objects': fields.ListOfObjectsField('MyOwnedObject')}
+
+        values = [1, 2, 42]
+
+        list1 = MyList(
             objects=[
                 MyOwnedObject(baz=values[0]),
                 MyOwnedObject(baz=values[1]),
@@ -2720,3 +3420,2293 @@ class TestTimestampedObject(test.TestCase):
 
         with testtools.ExpectedException(ValueError, '.*parse date.*'):
             self.my_object.created_at = 'a string'  # type: ignore[attr-defined]
+
+
+@base.VersionedObjectRegistry.register
+class MySlotObj(base.VersionedObject):
+    OBJ_SLOT_STORAGE = True
+    fields = {
+        'foo': fields.IntegerField(default=1),
+        'bar': fields.StringField(),
+        'readonly': fields.IntegerField(read_only=True),
+        'rel_object': fields.ObjectField('MyOwnedObject', nullable=True),
+        'tags': fields.ListOfStringsField(default=[]),
+    }
+
+    def obj_load_attr(self, attrname):
+        if attrname == 'bar':
+            self.bar = 'loaded!'
+
+
+class TestSlotStorage(test.TestCase):
+    def test_layout(self):
+        self.assertEqual(
+            {'foo': 0, 'bar': 1, 'readonly': 2, 'rel_object': 3, 'tags': 4},
+            MySlotObj._obj_slots,
+        )
+        self.assertIsNone(MyObj._obj_slots)
+        obj = MySlotObj(foo=2)
+        self.assertEqual(5, len(obj._obj_values))
+        self.assertNotIn('_obj_foo', obj.__dict__)
+
+    def test_get_set_del(self):
+        obj = MySlotObj()
+        self.assertFalse(obj.obj_attr_is_set('foo'))
+        obj.foo = '3'
+        self.assertEqual(3, obj.foo)
+        self.assertTrue(obj.obj_attr_is_set('foo'))
+        self.assertEqual({'foo'}, obj.obj_what_changed())
+        del obj.foo
+        self.assertFalse(obj.obj_attr_is_set('foo'))
+        self.assertRaises(AttributeError, delattr, obj, 'foo')
+        self.assertRaises(AttributeError, obj.obj_attr_is_set, 'bang')
+
+    def test_load_attr(self):
+        obj = MySlotObj()
+        self.assertEqual('loaded!', obj.bar)
+        self.assertRaises(AttributeError, getattr, obj, 'foo')
+
+    def test_read_only(self):
+        obj = MySlotObj(readonly=1)
+        obj.readonly = 1
+        self.assertRaises(
+            exception.ReadOnlyFieldError, setattr, obj, 'readonly', 2
+        )
+
+    def test_set_defaults(self):
+        obj = MySlotObj()
+        obj.obj_set_defaults()
+        self.assertEqual(1, obj.foo)
+        self.assertEqual([], obj.tags)
+
+    def test_primitive_round_trip(self):
+        obj = MySlotObj(
+            foo=1, bar='bar', rel_object=MyOwnedObject(baz=2), tags=['a']
+        )
+        obj.obj_reset_changes(['foo'])
+        primitive = obj.obj_to_primitive()
+        self.assertEqual(
+            {
+                'foo': 1,
+                'bar': 'bar',
+                'rel_object': MyOwnedObject(baz=2).obj_to_primitive(),
+                'tags': ['a'],
+            },
+            primitive['versioned_object.data'],
+        )
+        obj2 = MySlotObj.obj_from_primitive(primitive)
+        self.assertEqual('bar', obj2.bar)
+        self.assertEqual(obj.obj_what_changed(), obj2.obj_what_changed())
+        self.assertEqual(
+            primitive['versioned_object.data'],
+            obj2.obj_to_primitive()['versioned_object.data'],
+        )
+
+    def test_copies_do_not_share_values(self):
+        obj = MySlotObj(foo=1, tags=['a'])
+        shallow = copy.copy(obj)
+        shallow.foo = 2
+        self.assertEqual(1, obj.foo)
+        deep = obj.obj_clone()
+        deep.tags.append('b')
+        self.assertEqual(['a'], obj.tags)
+        self.assertEqual(['a', 'b'], deep.tags)
+
+    def test_instance_storage_is_smaller(self):
+        def make_class(slot_storage):
+            class Wide(base.VersionedObject):
+                OBJ_SLOT_STORAGE = slot_storage
+                fields = {
+                    f'field{i}': fields.IntegerField() for i in range(32)
+                }
+
+            base.VersionedObjectRegistry.objectify(Wide)
+            return Wide
+
+        def storage_size(obj):
+            size = sys.getsizeof(obj.__dict__)
+            if obj._obj_slots is not None:
+                size += sys.getsizeof(obj._obj_values)
+            return size
+
+        values = {f'field{i}': i for i in range(32)}
+        dict_obj = make_class(False)(**values)
+        slot_obj = make_class(True)(**values)
+        self.assertLess(storage_size(slot_obj), storage_size(dict_obj) / 2)
+
+
+class TestFieldIndex(test.TestCase):
+    def test_index_made_with_class_properties(self):
+        index = MyObj._obj_get_field_index()
+        self.assertIn('_obj_field_index', vars(MyObj))
+        self.assertIs(MyObj, index.owner)
+        self.assertEqual(tuple(MyObj.fields), index.names)
+        self.assertEqual(frozenset(MyObj.fields), index.name_set)
+        self.assertEqual('_obj_foo', index.attrnames['foo'])
+
+    def test_index_refreshed(self):
+        class TestObj(base.VersionedObject):
+            fields = {'foo': fields.IntegerField()}
+            obj_extra_fields = ['bar']
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        self.assertEqual(('foo', 'bar'), TestObj._obj_get_field_index().names)
+        TestObj.fields['baz'] = fields.IntegerField()
+        base.VersionedObjectRegistry.objectify(TestObj)
+        self.assertEqual(
+            ('foo', 'baz', 'bar'), TestObj._obj_get_field_index().names
+        )
+        self.assertEqual(
+            frozenset(['bar']), TestObj._obj_get_field_index().extra_names
+        )
+
+    def test_index_of_unregistered_subclass(self):
+        class TestObj(MyOwnedObject):
+            fields = {'foo': fields.IntegerField()}
+
+        obj = TestObj()
+        self.assertEqual(['foo'], obj.obj_fields)
+        self.assertFalse(obj.obj_attr_is_set('foo'))
+        self.assertRaises(AttributeError, obj.obj_attr_is_set, 'baz')
+        self.assertIs(TestObj, TestObj._obj_get_field_index().owner)
+        self.assertIs(
+            MyOwnedObject, MyOwnedObject._obj_get_field_index().owner
+        )
+
+    def test_dict_compat_does_not_build_field_lists(self):
+        obj = MyObj(foo=1, bar='bar')
+        with mock.patch.object(
+            MyObj, 'obj_fields', new_callable=mock.PropertyMock
+        ) as mock_fields:
+            self.assertEqual(['foo', 'bar'], list(obj))
+            self.assertEqual([('foo', 1), ('bar', 'bar')], list(obj.items()))
+            self.assertIn('foo', obj)
+            self.assertEqual('default', obj.get('missing', 'default'))
+            self.assertRaises(AttributeError, obj.get, 'bang')
+            self.assertTrue(obj.obj_attr_is_set('foo'))
+            self.assertFalse(mock_fields.called)
+
+
+@base.VersionedObjectRegistry.register
+class MyCompiledObj(base.VersionedObject):
+    VERSION = '1.1'
+    OBJ_COMPILED_PRIMITIVES = True
+    fields = {
+        'foo': fields.IntegerField(default=1),
+        'bar': fields.StringField(),
+        'baz': fields.StringField(nullable=True),
+        'flag': fields.BooleanField(default=False),
+        'ratio': fields.FloatField(nullable=True),
+        'readonly': fields.IntegerField(read_only=True),
+        'state': fields.EnumField(['up', 'down']),
+        'when': fields.DateTimeField(nullable=True),
+        'tags': fields.ListOfStringsField(default=[]),
+        'meta': fields.DictOfNullableStringsField(),
+        'rel_object': fields.ObjectField('MyOwnedObject', nullable=True),
+        'missing': fields.StringField(),
+    }
+    obj_relationships = {'rel_object': [('1.0', '1.0')]}
+
+
+@base.VersionedObjectRegistry.register
+class MyCompiledSlotObj(MyCompiledObj):
+    OBJ_SLOT_STORAGE = True
+
+
+class TestCompiledPrimitives(test.TestCase):
+    def _make_obj(self, cls):
+        obj = cls(
+            foo=2,
+            bar='bar',
+            baz=None,
+            flag=True,
+            ratio=0.5,
+            readonly=3,
+            state='up',
+            when=datetime.datetime(1955, 11, 5, tzinfo=datetime.timezone.utc),
+            tags=['a', 'b'],
+            meta={'a': None, 'b': 'c'},
+            rel_object=MyOwnedObject(baz=4),
+        )
+        obj.obj_reset_changes(['foo', 'flag'])
+        return obj
+
+    def _generic(self, cls):
+        return mock.patch.object(cls, '_obj_primitive_codec', None)
+
+    def test_codec_generated_when_enabled(self):
+        codec = MyCompiledObj._obj_primitive_codec
+        assert codec is not None
+        self.assertIs(MyCompiledObj, codec.owner)
+        self.assertIsNotNone(codec.to_primitive)
+        self.assertIsNotNone(codec.from_primitive)
+        self.assertIsNone(MyObj._obj_primitive_codec)
+
+    def test_codec_not_generated_for_overrides(self):
+        class TestObj(MyCompiledObj):
+            def obj_make_compatible(self, primitive, target_version):
+                pass
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        codec = base._make_primitive_codec(TestObj)
+        self.assertIsNone(codec.to_primitive)
+        self.assertIsNotNone(codec.from_primitive)
+
+    def test_to_primitive_identical(self):
+        for cls in (MyCompiledObj, MyCompiledSlotObj):
+            obj = self._make_obj(cls)
+            compiled = obj.obj_to_primitive()
+            with self._generic(cls):
+                generic = obj.obj_to_primitive()
+            self.assertEqual(json.dumps(generic), json.dumps(compiled))
+
+    def test_to_primitive_unset_and_unchanged(self):
+        obj = MyCompiledSlotObj(foo=1)
+        obj.obj_reset_changes()
+        compiled = obj.obj_to_primitive()
+        with self._generic(MyCompiledSlotObj):
+            generic = obj.obj_to_primitive()
+        self.assertEqual(json.dumps(generic), json.dumps(compiled))
+        self.assertNotIn('versioned_object.changes', compiled)
+
+    def test_from_primitive_identical(self):
+        for cls in (MyCompiledObj, MyCompiledSlotObj):
+            primitive = self._make_obj(cls).obj_to_primitive()
+            # Values which need coercion on the way in
+            primitive['versioned_object.data'].update(
+                foo=True, bar=5, ratio=None, flag=1
+            )
+            compiled = cls.obj_from_primitive(primitive)
+            with self._generic(cls):
+                generic = cls.obj_from_primitive(primitive)
+            self.assertEqual(repr(generic), repr(compiled))
+            self.assertEqual(generic._changed_fields, compiled._changed_fields)
+            self.assertEqual(1, compiled.foo)
+            self.assertIs(int, type(compiled.foo))
+            self.assertEqual('5', compiled.bar)
+            self.assertEqual(
+                json.dumps(generic.obj_to_primitive()),
+                json.dumps(compiled.obj_to_primitive()),
+            )
+
+    def test_backport_uses_generic_path(self):
+        obj = self._make_obj(MyCompiledSlotObj)
+        primitive = obj.obj_to_primitive(target_version='1.0')
+        self.assertEqual('1.0', primitive['versioned_object.version'])
+        primitive = obj.obj_to_primitive(
+            version_manifest={'MyOwnedObject': '1.0'}
+        )
+        self.assertEqual('1.1', primitive['versioned_object.version'])
+
+    def test_unregistered_subclass_uses_generic_path(self):
+        class TestObj(MyCompiledSlotObj):
+            fields = {'extra': fields.IntegerField()}
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        obj = TestObj(foo=1, extra=2)
+        codec = TestObj._obj_primitive_codec
+        assert codec is not None
+        self.assertIs(MyCompiledSlotObj, codec.owner)
+        primitive = obj.obj_to_primitive()
+        self.assertEqual(
+            {'foo': 1, 'extra': 2}, primitive['versioned_object.data']
+        )
+
+
+@base.VersionedObjectRegistry.register
+class MyOwnedObjectList(
+    base.ObjectListBase[MyOwnedObject], base.VersionedObject
+):
+    fields = {'objects': fields.ListOfObjectsField('MyOwnedObject')}
+
+
+@base.VersionedObjectRegistry.register
+class MyTrackedObj(base.VersionedObject):
+    fields = {
+        'foo': fields.IntegerField(),
+        'rel_object': fields.ObjectField('MyOwnedObject', nullable=True),
+        'rel_list': fields.ObjectField('MyOwnedObjectList'),
+    }
+
+
+class TestChangeTracking(test.TestCase):
+    def _make_obj(self):
+        obj = MyTrackedObj(
+            foo=1,
+            rel_object=MyOwnedObject(baz=1),
+            rel_list=MyOwnedObjectList(
+                objects=[MyOwnedObject(baz=2), MyOwnedObject(baz=3)]
+            ),
+        )
+        obj.obj_reset_changes(recursive=True)
+        return obj
+
+    def test_changed_fields_mask(self):
+        obj = MyTrackedObj()
+        self.assertEqual(set(), set(obj._changed_fields))
+        obj.rel_object = None
+        obj.foo = 1
+        self.assertEqual(0b011, obj._obj_changed_mask)
+        self.assertEqual({'foo', 'rel_object'}, obj._changed_fields)
+        self.assertEqual(['foo', 'rel_object'], list(obj._changed_fields))
+        obj._changed_fields.add('does_not_exist')
+        self.assertIn('does_not_exist', obj._changed_fields)
+        self.assertEqual(3, len(obj._changed_fields))
+        self.assertEqual({'foo', 'rel_object'}, obj.obj_what_changed())
+        obj._changed_fields.discard('foo')
+        obj._changed_fields -= {'does_not_exist'}
+        self.assertEqual({'rel_object'}, obj._changed_fields)
+        obj._changed_fields = ['foo']
+        self.assertEqual(0b001, obj._obj_changed_mask)
+        obj.obj_reset_changes()
+        self.assertEqual(0, obj._obj_changed_mask)
+        self.assertFalse(obj.obj_has_changes())
+
+    def test_child_change_propagates(self):
+        obj = self._make_obj()
+        self.assertFalse(obj._obj_child_dirty)
+        self.assertFalse(obj.rel_list._obj_child_dirty)
+        obj.rel_list[1].baz = 4
+        self.assertTrue(obj.rel_list._obj_child_dirty)
+        self.assertTrue(obj._obj_child_dirty)
+        self.assertTrue(obj.obj_has_changes())
+        self.assertEqual({'rel_list'}, obj.obj_what_changed())
+        self.assertEqual({'objects'}, obj.rel_list.obj_what_changed())
+        obj.rel_list[1].obj_reset_changes()
+        self.assertEqual(set(), obj.obj_what_changed())
+        self.assertFalse(obj._obj_child_dirty)
+
+    def test_unchanged_children_not_visited(self):
+        obj = self._make_obj()
+        with (
+            mock.patch.object(
+                MyOwnedObject, 'obj_what_changed'
+            ) as mock_changed,
+            mock.patch.object(
+                MyOwnedObject, 'obj_has_changes'
+            ) as mock_has_changes,
+        ):
+            self.assertEqual(set(), obj.obj_what_changed())
+            self.assertFalse(obj.obj_has_changes())
+            obj.obj_reset_changes(recursive=True)
+        self.assertFalse(mock_changed.called)
+        self.assertFalse(mock_has_changes.called)
+
+    def test_recursive_reset_visits_changed_elements(self):
+        obj = self._make_obj()
+        obj.rel_list[0].baz = 5
+        with mock.patch.object(
+            MyOwnedObject,
+            'obj_reset_changes',
+            autospec=True,
+            side_effect=base.VersionedObject.obj_reset_changes,
+        ) as mock_reset:
+            obj.obj_reset_changes(recursive=True)
+        mock_reset.assert_called_once_with(obj.rel_list[0], recursive=True)
+        self.assertFalse(obj.obj_has_changes())
+
+    def test_elements_added_and_removed(self):
+        obj = self._make_obj()
+        child = MyOwnedObject(baz=6)
+        obj.rel_list.objects.append(child)
+        self.assertEqual({'rel_list'}, obj.obj_what_changed())
+        obj.rel_list.objects.pop()
+        self.assertEqual(set(), obj.obj_what_changed())
+        child.obj_reset_changes()
+        obj.rel_list.objects.append(child)
+        self.assertEqual(set(), obj.obj_what_changed())
+        child.baz = 7
+        self.assertEqual({'rel_list'}, obj.obj_what_changed())
+
+    def test_shared_child(self):
+        child = MyOwnedObject(baz=1)
+        obj1 = MyTrackedObj(rel_object=child)
+        obj2 = MyTrackedObj(rel_object=child)
+        obj1.obj_reset_changes(recursive=True)
+        obj2.obj_reset_changes()
+        self.assertFalse(obj2.obj_has_changes())
+        child.baz = 2
+        self.assertEqual({'rel_object'}, obj1.obj_what_changed())
+        self.assertEqual({'rel_object'}, obj2.obj_what_changed())
+
+    def test_copies_track_children(self):
+        obj = self._make_obj()
+        obj.rel_object.baz = 2
+        for copied in (
+            copy.copy(obj),
+            copy.deepcopy(obj),
+            pickle.loads(pickle.dumps(obj)),
+        ):
+            self.assertEqual({'rel_object'}, copied.obj_what_changed())
+            copied.obj_reset_changes(recursive=True)
+            self.assertFalse(copied.obj_has_changes())
+            copied.rel_list[0].baz = 8
+            self.assertEqual({'rel_list'}, copied.obj_what_changed())
+
+    def test_child_with_own_change_tracking(self):
+        class TestObj(MyOwnedObject):
+            changed = False
+
+            @classmethod
+            def obj_name(cls):
+                return 'MyOwnedObject'
+
+            def obj_what_changed(self):
+                changes = super().obj_what_changed()
+                if self.changed:
+                    changes.add('baz')
+                return changes
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        child = TestObj(baz=1)
+        obj = MyTrackedObj(rel_object=child)
+        obj.obj_reset_changes(recursive=True)
+        self.assertEqual(set(), obj.obj_what_changed())
+        self.assertTrue(obj._obj_child_dirty)
+        child.changed = True
+        self.assertEqual({'rel_object'}, obj.obj_what_changed())
+        self.assertTrue(obj.obj_has_changes())
+
+    def test_from_primitive_marks_changes_once(self):
+        obj = self._make_obj()
+        obj.foo = 2
+        obj.rel_list[0].baz = 4
+        primitive = obj.obj_to_primitive()
+        with mock.patch.object(
+            base.VersionedObject, '_obj_mark_changed'
+        ) as mock_mark:
+            copied = MyTrackedObj.obj_from_primitive(primitive)
+        self.assertFalse(mock_mark.called)
+        self.assertEqual({'foo', 'rel_list'}, copied.obj_what_changed())
+        self.assertEqual({'objects'}, copied.rel_list.obj_what_changed())
+        self.assertEqual({'baz'}, copied.rel_list[0].obj_what_changed())
+        copied.obj_reset_changes(recursive=True)
+        assert copied.rel_object is not None
+        copied.rel_object.baz = 5
+        self.assertEqual({'rel_object'}, copied.obj_what_changed())
+
+    def test_set_without_owner(self):
+        obj = MyTrackedObj()
+        with mock.patch.object(
+            base.VersionedObject, '_obj_notify_owners'
+        ) as mock_notify:
+            obj.foo = 1
+        self.assertFalse(mock_notify.called)
+        self.assertEqual({'foo'}, obj.obj_what_changed())
+
+    def test_to_primitive_checks_changes_once(self):
+        obj = self._make_obj()
+        with mock.patch.object(
+            MyTrackedObj, 'obj_what_changed', return_value={'foo'}
+        ) as mock_changed:
+            primitive = obj.obj_to_primitive()
+        mock_changed.assert_called_once_with()
+        self.assertEqual(['foo'], primitive['versioned_object.changes'])
+
+
+@base.VersionedObjectRegistry.register
+class MyCowObj(base.VersionedObject):
+    fields = {
+        'foo': fields.IntegerField(),
+        'tags': fields.ListOfStringsField(),
+        'meta': fields.DictOfStringsField(),
+        'ids': fields.SetOfIntegersField(),
+        'rel_object': fields.ObjectField('MyOwnedObject', nullable=True),
+        'rel_list': fields.ObjectField('MyOwnedObjectList'),
+    }
+
+
+class TestCopyOnWriteClone(test.TestCase):
+    def _make_obj(self):
+        obj = MyCowObj(
+            foo=1,
+            tags=['a'],
+            meta={'a': 'b'},
+            ids={1},
+            rel_object=MyOwnedObject(baz=1),
+            rel_list=MyOwnedObjectList(
+                objects=[MyOwnedObject(baz=i) for i in range(3)]
+            ),
+        )
+        obj.obj_reset_changes(['foo', 'ids'])
+        return obj
+
+    def _shared(self, obj1, obj2, name):
+        return obj1._obj_get_value(name) is obj2._obj_get_value(name)
+
+    def test_clone_shares_collections(self):
+        obj = self._make_obj()
+        with mock.patch.object(copy, 'deepcopy') as mock_deepcopy:
+            clone = obj.obj_clone(copy_on_write=True)
+        self.assertFalse(mock_deepcopy.called)
+        for name in ('tags', 'meta', 'ids'):
+            self.assertTrue(self._shared(obj, clone, name))
+        self.assertIsNot(obj.rel_object, clone.rel_object)
+        self.assertTrue(self._shared(obj.rel_list, clone.rel_list, 'objects'))
+        self.assertEqual(obj.obj_what_changed(), clone.obj_what_changed())
+        self.assertEqual(obj.obj_to_primitive(), clone.obj_to_primitive())
+
+    def test_clone_copies_on_access(self):
+        obj = self._make_obj()
+        clone = obj.obj_clone(copy_on_write=True)
+        clone.tags.append('b')
+        clone.meta['c'] = 'd'
+        clone.ids.add(2)
+        clone.rel_object.baz = 2
+        clone.rel_list[0].baz = 5
+        self.assertEqual(['a'], obj.tags)
+        self.assertEqual({'a': 'b'}, obj.meta)
+        self.assertEqual({1}, obj.ids)
+        self.assertEqual(1, obj.rel_object.baz)
+        self.assertEqual(0, obj.rel_list[0].baz)
+        self.assertEqual(['a', 'b'], clone.tags)
+        self.assertEqual(
+            {'rel_list', 'rel_object', 'meta', 'tags'},
+            clone.obj_what_changed(),
+        )
+        # The original was the last object holding these
+        self.assertIsNone(obj._obj_cow.get('tags'))
+        self.assertIsNone(obj.tags._cow_share)
+
+    def test_read_does_not_copy(self):
+        obj = self._make_obj()
+        clone = obj.obj_clone(copy_on_write=True)
+        with mock.patch.object(base, '_copy_cow_value') as mock_copy:
+            self.assertEqual(['a'], obj.tags)
+            self.assertEqual(['a'], clone.tags)
+            self.assertEqual(1, clone.rel_list[1].baz)
+            obj.obj_to_primitive()
+            clone.obj_to_primitive()
+        self.assertFalse(mock_copy.called)
+        self.assertTrue(self._shared(obj, clone, 'tags'))
+        self.assertTrue(self._shared(obj.rel_list, clone.rel_list, 'objects'))
+
+    def test_reader_keeps_value(self):
+        obj = self._make_obj()
+        clone = obj.obj_clone(copy_on_write=True)
+        tags = clone.tags
+        tags.append('b')
+        self.assertIs(tags, clone.tags)
+        self.assertEqual(['a'], obj.tags)
+        self.assertIsNot(tags, obj.tags)
+
+    def test_original_copies_on_access(self):
+        obj = self._make_obj()
+        tags = obj._obj_get_value('tags')
+        clone = obj.obj_clone(copy_on_write=True)
+        obj.tags.append('b')
+        self.assertIs(tags, obj.tags)
+        self.assertEqual(['a', 'b'], obj.tags)
+        self.assertEqual(['a'], clone.tags)
+
+    def test_modify_reference_from_before_clone(self):
+        obj = self._make_obj()
+        tags = obj.tags
+        meta = obj.meta
+        ids = obj.ids
+        child = obj.rel_object
+        clone = obj.obj_clone(copy_on_write=True)
+        tags.pop()
+        meta.clear()
+        ids.discard(1)
+        child.baz = 3
+        self.assertEqual([], obj.tags)
+        self.assertEqual(['a'], clone.tags)
+        self.assertEqual({'a': 'b'}, clone.meta)
+        self.assertEqual({1}, clone.ids)
+        self.assertEqual(1, clone.rel_object.baz)
+
+    def test_set_field_does_not_copy(self):
+        obj = self._make_obj()
+        tags = obj.tags
+        clone = obj.obj_clone(copy_on_write=True)
+        with mock.patch.object(base, '_copy_cow_value') as mock_copy:
+            obj.tags = ['b']
+            self.assertIs(tags, clone.tags)
+        self.assertFalse(mock_copy.called)
+        self.assertEqual(['a'], clone.tags)
+        self.assertIs(clone, clone.tags._obj)
+        self.assertEqual({}, clone._obj_cow.get('tags', {}))
+
+    def test_clone_of_clone(self):
+        obj = self._make_obj()
+        clone1 = obj.obj_clone(copy_on_write=True)
+        clone2 = clone1.obj_clone(copy_on_write=True)
+        self.assertTrue(self._shared(obj, clone2, 'tags'))
+        clone1.tags.append('b')
+        obj.tags = ['c']
+        clone2.tags.append('d')
+        self.assertEqual(['c'], obj.tags)
+        self.assertEqual(['a', 'b'], clone1.tags)
+        self.assertEqual(['a', 'd'], clone2.tags)
+
+    def test_clone_objects_in_collection(self):
+        obj = MyCowObj(
+            rel_object=MyOwnedObject(baz=1),
+            rel_list=MyOwnedObjectList(
+                objects=[MyOwnedObject(baz=1), MyOwnedObject(baz=2)]
+            ),
+        )
+        child = obj.rel_list[0]
+        clone = obj.obj_clone(copy_on_write=True)
+        clone_child = clone.rel_list._obj_get_value('objects')[0]
+        self.assertIs(child, clone_child)
+        child.baz = 5
+        self.assertEqual(1, clone.rel_list[0].baz)
+        self.assertEqual(5, obj.rel_list[0].baz)
+        clone.rel_list[1].baz = 6
+        self.assertEqual(2, obj.rel_list[1].baz)
+        self.assertEqual({'baz'}, clone.rel_list[1].obj_what_changed())
+
+    def test_clone_nested_objects_in_collection(self):
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyCowItem(base.VersionedObject):
+            fields = {'child': fields.ObjectField('MyOwnedObject')}
+
+        @base.VersionedObjectRegistry.register
+        class MyCowHolder(base.VersionedObject):
+            fields = {'items': fields.ListOfObjectsField('MyCowItem')}
+
+        obj = MyCowHolder(items=[MyCowItem(child=MyOwnedObject(baz=1))])
+        obj.obj_reset_changes(recursive=True)
+        clone = obj.obj_clone(copy_on_write=True)
+        clone.items[0].child.baz = 2
+        self.assertEqual(1, obj.items[0].child.baz)
+        self.assertEqual(2, clone.items[0].child.baz)
+        self.assertEqual(set(), obj.items[0].obj_what_changed())
+        self.assertEqual({'child'}, clone.items[0].obj_what_changed())
+
+    def test_large_list_clone(self):
+        objlist = MyOwnedObjectList(
+            objects=[MyOwnedObject(baz=i) for i in range(5000)]
+        )
+        objlist.obj_reset_changes(recursive=True)
+        with (
+            mock.patch.object(copy, 'deepcopy') as mock_deepcopy,
+            mock.patch.object(MyOwnedObject, '_obj_cow_clone') as mock_clone,
+        ):
+            clone = objlist.obj_clone(copy_on_write=True)
+        self.assertFalse(mock_deepcopy.called)
+        self.assertFalse(mock_clone.called)
+        self.assertTrue(self._shared(objlist, clone, 'objects'))
+        clone[0].baz = 10
+        self.assertEqual(0, objlist[0].baz)
+        self.assertEqual({'objects'}, clone.obj_what_changed())
+        self.assertEqual(set(), objlist.obj_what_changed())
+
+    def test_field_access_checked_once_cloned(self):
+        class TestObj(base.VersionedObject):
+            fields = {'tags': fields.ListOfStringsField()}
+
+        class TestSubObj(TestObj):
+            pass
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        base.VersionedObjectRegistry.objectify(TestSubObj)
+        unchecked = vars(TestSubObj)['tags']
+        self.assertFalse(TestObj._obj_checked_access)
+        obj = TestObj(tags=['a'])
+        clone = obj.obj_clone(copy_on_write=True)
+        self.assertTrue(TestObj._obj_checked_access)
+        self.assertTrue(TestSubObj._obj_checked_access)
+        self.assertIsNot(unchecked, vars(TestSubObj)['tags'])
+        clone.tags.append('b')
+        self.assertEqual(['a'], obj.tags)
+        self.assertEqual(['a', 'b'], clone.tags)
+
+    def test_pickle_shared(self):
+        obj = self._make_obj()
+        clone = obj.obj_clone(copy_on_write=True)
+        copied = pickle.loads(pickle.dumps(clone))
+        self.assertEqual(['a'], copied.tags)
+        self.assertIsNone(copied._obj_cow)
+        self.assertEqual(['a'], copy.deepcopy(clone).tags)
+
+
+@base.VersionedObjectRegistry.register
+class MyLazyChild(base.VersionedObject):
+    OBJ_LAZY_HYDRATION = True
+    fields = {'baz': fields.IntegerField()}
+
+
+@base.VersionedObjectRegistry.register
+class MyLazyChildList(base.ObjectListBase[MyLazyChild], base.VersionedObject):
+    OBJ_LAZY_HYDRATION = True
+    fields = {'objects': fields.ListOfObjectsField('MyLazyChild')}
+
+
+@base.VersionedObjectRegistry.register
+class MyLazyObj(base.VersionedObject):
+    VERSION = '1.1'
+    OBJ_LAZY_HYDRATION = True
+    OBJ_COMPILED_PRIMITIVES = True
+    fields = {
+        'foo': fields.IntegerField(),
+        'bar': fields.StringField(read_only=True),
+        'tags': fields.ListOfStringsField(),
+        'rel_object': fields.ObjectField('MyLazyChild'),
+        'rel_list': fields.ObjectField('MyLazyChildList'),
+    }
+    obj_relationships = {
+        'rel_object': [('1.0', '1.0')],
+        'rel_list': [('1.0', '1.0')],
+    }
+
+    def obj_make_compatible(self, primitive, target_version):
+        super().obj_make_compatible(primitive, target_version)
+        if target_version == '1.0':
+            primitive.pop('tags', None)
+
+
+@base.VersionedObjectRegistry.register
+class MyLazySlotObj(MyLazyObj):
+    OBJ_SLOT_STORAGE = True
+
+
+class TestLazyHydration(test.TestCase):
+    obj_cls: type[MyLazyObj] = MyLazyObj
+
+    def _make_primitive(self):
+        obj = self.obj_cls(
+            foo=1,
+            bar='a',
+            tags=['x'],
+            rel_object=MyLazyChild(baz=1),
+            rel_list=MyLazyChildList(
+                objects=[MyLazyChild(baz=i) for i in range(3)]
+            ),
+        )
+        obj.obj_reset_changes(recursive=True)
+        return obj.obj_to_primitive()
+
+    def test_fields_decoded_on_access(self):
+        primitive = self._make_primitive()
+        obj = self.obj_cls.obj_from_primitive(primitive)
+        assert obj._obj_lazy is not None
+        self.assertEqual(set(obj.fields), set(obj._obj_lazy))
+        self.assertTrue(obj.obj_attr_is_set('rel_list'))
+        self.assertEqual(1, obj.foo)
+        self.assertNotIn('foo', obj._obj_lazy)
+        self.assertEqual([0, 1, 2], [child.baz for child in obj.rel_list])
+        self.assertEqual(1, obj.rel_object.baz)
+        self.assertIsNone(obj.rel_object._obj_lazy)
+        self.assertEqual(set(), obj.obj_what_changed())
+
+    def test_decode_error_raised_on_access(self):
+        primitive = self._make_primitive()
+        primitive['versioned_object.data']['foo'] = 'a'
+        obj = self.obj_cls.obj_from_primitive(primitive)
+        self.assertRaises(ValueError, getattr, obj, 'foo')
+
+    def test_reserialize_reuses_primitive(self):
+        primitive = self._make_primitive()
+        data = primitive['versioned_object.data']
+        obj = self.obj_cls.obj_from_primitive(primitive)
+        obj.rel_object.baz = 2
+        result = obj.obj_to_primitive()
+        self.assertIs(
+            data['rel_list'], result['versioned_object.data']['rel_list']
+        )
+        self.assertEqual(
+            2,
+            result['versioned_object.data']['rel_object'][
+                'versioned_object.data'
+            ]['baz'],
+        )
+        self.assertEqual(['rel_object'], result['versioned_object.changes'])
+
+    def test_backport_decodes_fields(self):
+        primitive = self._make_primitive()
+        expected = self.obj_cls.obj_from_primitive(primitive)
+        for name in expected.fields:
+            getattr(expected, name)
+        obj = self.obj_cls.obj_from_primitive(primitive)
+        self.assertEqual(
+            expected.obj_to_primitive(target_version='1.0'),
+            obj.obj_to_primitive(target_version='1.0'),
+        )
+
+    def test_deferred_child_changes(self):
+        obj = self.obj_cls(
+            rel_object=MyLazyChild(baz=1),
+            rel_list=MyLazyChildList(objects=[MyLazyChild(baz=1)]),
+        )
+        obj.obj_reset_changes()
+        obj = self.obj_cls.obj_from_primitive(obj.obj_to_primitive())
+        self.assertEqual({'rel_object', 'rel_list'}, obj.obj_what_changed())
+        assert obj._obj_lazy is not None
+        self.assertEqual({'rel_object', 'rel_list'}, set(obj._obj_lazy))
+        obj.obj_reset_changes(recursive=True)
+        self.assertEqual(set(), obj.obj_what_changed())
+        self.assertEqual(set(), obj.rel_list.obj_what_changed())
+
+    def test_set_deferred_field(self):
+        obj = self.obj_cls.obj_from_primitive(self._make_primitive())
+        obj.foo = 2
+        obj.bar = 'a'
+        self.assertRaises(
+            exception.ReadOnlyFieldError, setattr, obj, 'bar', 'b'
+        )
+        self.assertEqual(2, obj.foo)
+        self.assertEqual({'foo'}, obj.obj_what_changed())
+
+    def test_delete_deferred_field(self):
+        obj = self.obj_cls.obj_from_primitive(self._make_primitive())
+        del obj.tags
+        self.assertFalse(obj.obj_attr_is_set('tags'))
+        self.assertNotIn(
+            'tags', obj.obj_to_primitive()['versioned_object.data']
+        )
+
+    def test_copies(self):
+        primitive = self._make_primitive()
+        obj = self.obj_cls.obj_from_primitive(primitive)
+        for copied in (
+            copy.deepcopy(obj),
+            obj.obj_clone(copy_on_write=True),
+            pickle.loads(pickle.dumps(obj)),
+        ):
+            self.assertEqual(primitive, copied.obj_to_primitive())
+            self.assertEqual([0, 1, 2], [c.baz for c in copied.rel_list])
+            self.assertEqual(['x'], copied.tags)
+
+
+class TestLazyHydrationSlotStorage(TestLazyHydration):
+    obj_cls = MyLazySlotObj
+
+
+class TestCheckedFieldAccess(test.TestCase):
+    def test_unchecked_by_default(self):
+        class TestObj(base.VersionedObject):
+            fields = {'foo': fields.IntegerField()}
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        self.assertFalse(TestObj._obj_checked_access)
+        self.assertTrue(MyLazyObj._obj_checked_access)
+        self.assertTrue(MyLazySlotObj._obj_checked_access)
+
+    def test_deferred_fields_of_unchecked_class(self):
+        class TestObj(base.VersionedObject):
+            fields = {'foo': fields.IntegerField()}
+
+        base.VersionedObjectRegistry.objectify(TestObj)
+        obj = TestObj()
+        primitive = TestObj(foo=1).obj_to_primitive()
+        obj._obj_defer_fields(
+            dict(primitive['versioned_object.data']), frozenset()
+        )
+        self.assertTrue(TestObj._obj_checked_access)
+        self.assertEqual(1, obj.foo)
+        self.assertIsNone(obj._obj_lazy)
+
+
+class TestProjection(test.TestCase):
+    def _make_obj(self):
+        return MyTrackedObj(
+            foo=1,
+            rel_object=MyOwnedObject(baz=1),
+            rel_list=MyOwnedObjectList(
+                objects=[MyOwnedObject(baz=i) for i in range(2)]
+            ),
+        )
+
+    def _data(self, primitive):
+        return primitive['versioned_object.data']
+
+    def test_fields(self):
+        obj = self._make_obj()
+        primitive = obj.obj_to_primitive(fields=['foo', 'rel_object'])
+        self.assertEqual(
+            obj.obj_to_primitive()['versioned_object.data']['rel_object'],
+            self._data(primitive)['rel_object'],
+        )
+        self.assertEqual({'foo', 'rel_object'}, set(self._data(primitive)))
+        self.assertEqual(
+            {'foo', 'rel_object'}, set(primitive['versioned_object.changes'])
+        )
+        self.assertEqual({}, self._data(obj.obj_to_primitive(fields=[])))
+
+    def test_nested_paths(self):
+        obj = self._make_obj()
+        obj.obj_reset_changes(recursive=True)
+        primitive = obj.obj_to_primitive(
+            fields=['rel_object.missing', 'rel_list.baz']
+        )
+        data = self._data(primitive)
+        self.assertEqual({}, self._data(data['rel_object']))
+        self.assertEqual(
+            [{'baz': 0}, {'baz': 1}],
+            [self._data(p) for p in self._data(data['rel_list'])['objects']],
+        )
+        primitive = obj.obj_to_primitive(exclude=['foo', 'rel_list.baz'])
+        data = self._data(primitive)
+        self.assertEqual({'rel_object', 'rel_list'}, set(data))
+        self.assertEqual(
+            [{}, {}],
+            [self._data(p) for p in self._data(data['rel_list'])['objects']],
+        )
+
+    def test_list_of_objects_field(self):
+        obj = MyObj(rel_objects=[MyOwnedObject(baz=1)], foo=2)
+        primitive = obj.obj_to_primitive(exclude=['rel_objects.baz'])
+        data = self._data(primitive)
+        self.assertEqual({}, self._data(data['rel_objects'][0]))
+        self.assertEqual(2, data['foo'])
+
+    def test_unknown_names_ignored(self):
+        obj = self._make_obj()
+        primitive = obj.obj_to_primitive(
+            fields=['foo', 'bogus', 'foo.bogus'], exclude=['bogus.foo']
+        )
+        self.assertEqual({'foo': 1}, self._data(primitive))
+
+    def test_projected_fields_unset(self):
+        obj = self._make_obj()
+        obj.obj_reset_changes(recursive=True)
+        obj = MyTrackedObj.obj_from_primitive(
+            obj.obj_to_primitive(exclude=['rel_list'])
+        )
+        self.assertTrue(obj.obj_attr_is_set('foo'))
+        self.assertFalse(obj.obj_attr_is_set('rel_list'))
+        with mock.patch.object(MyTrackedObj, 'obj_load_attr') as mock_load:
+            self.assertRaises(AttributeError, getattr, obj, 'rel_list')
+        mock_load.assert_called_once_with('rel_list')
+
+    def test_lazy_fields(self):
+        obj = MyLazyObj(
+            foo=1,
+            tags=['a'],
+            rel_object=MyLazyChild(baz=1),
+            rel_list=MyLazyChildList(objects=[MyLazyChild(baz=1)]),
+        )
+        obj = MyLazyObj.obj_from_primitive(obj.obj_to_primitive())
+        primitive = obj.obj_to_primitive(fields=['tags', 'rel_list.baz'])
+        self.assertEqual({'tags', 'rel_list'}, set(self._data(primitive)))
+        self.assertEqual(['a'], self._data(primitive)['tags'])
+        assert obj._obj_lazy is not None
+        self.assertEqual({'foo', 'tags', 'rel_object'}, set(obj._obj_lazy))
+
+
+class TestDeltaPrimitive(test.TestCase):
+    def _make_pair(self):
+        obj = MyTrackedObj(
+            foo=1,
+            rel_object=MyOwnedObject(baz=1),
+            rel_list=MyOwnedObjectList(
+                objects=[MyOwnedObject(baz=i) for i in range(3)]
+            ),
+        )
+        obj.obj_reset_changes(recursive=True)
+        return obj, obj.obj_clone()
+
+    def _data(self, primitive):
+        return primitive['versioned_object.data']
+
+    def test_only_changes_sent(self):
+        obj, receiver = self._make_pair()
+        obj.rel_object.baz = 2
+        obj.rel_list[1].baz = 5
+        delta = obj.obj_to_delta_primitive()
+        self.assertEqual(
+            ['rel_object', 'rel_list'], delta['versioned_object.delta']
+        )
+        data = self._data(delta)
+        self.assertEqual({'baz': 2}, self._data(data['rel_object']))
+        objects = self._data(data['rel_list'])['objects']
+        self.assertEqual(['1'], list(objects))
+        self.assertEqual({'baz': 5}, self._data(objects['1']))
+
+        receiver.obj_apply_delta(json.loads(json.dumps(delta)))
+        self.assertEqual(obj.obj_to_primitive(), receiver.obj_to_primitive())
+        self.assertEqual({'rel_object', 'rel_list'}, obj.obj_what_changed())
+        self.assertEqual({'baz'}, receiver.rel_list[1].obj_what_changed())
+        self.assertEqual(set(), receiver.rel_list[0].obj_what_changed())
+
+    def test_set_fields_sent_in_full(self):
+        obj, receiver = self._make_pair()
+        obj.foo = 2
+        obj.rel_object = MyOwnedObject(baz=3)
+        delta = obj.obj_to_delta_primitive()
+        self.assertEqual([], delta['versioned_object.delta'])
+        self.assertEqual(
+            ['foo', 'rel_object'], delta['versioned_object.changes']
+        )
+        receiver.obj_apply_delta(delta)
+        self.assertEqual(obj.obj_to_primitive(), receiver.obj_to_primitive())
+        self.assertEqual({'foo', 'rel_object'}, receiver.obj_what_changed())
+
+    def test_unchanged(self):
+        obj, receiver = self._make_pair()
+        delta = obj.obj_to_delta_primitive()
+        self.assertEqual({}, self._data(delta))
+        receiver.obj_apply_delta(delta)
+        self.assertFalse(receiver.obj_has_changes())
+
+    def test_version_mismatch(self):
+        obj, receiver = self._make_pair()
+        delta = obj.obj_to_delta_primitive()
+        delta['versioned_object.version'] = '1.1'
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            receiver.obj_apply_delta,
+            delta,
+        )
+
+    def test_not_a_delta(self):
+        obj, receiver = self._make_pair()
+        self.assertRaises(
+            exception.ObjectActionError,
+            receiver.obj_apply_delta,
+            obj.obj_to_primitive(),
+        )
+        self.assertRaises(
+            exception.ObjectActionError,
+            receiver.obj_apply_delta,
+            obj.rel_object.obj_to_delta_primitive(),
+        )
+
+
+class TestBatchHydration(test.TestCase):
+    def _make_list(self, count=10):
+        objlist = MyOwnedObjectList(
+            objects=[MyOwnedObject(baz=i) for i in range(count)]
+        )
+        objlist.obj_reset_changes(recursive=True)
+        objlist[1].baz = 10
+        return objlist
+
+    def test_class_looked_up_once(self):
+        objlist = self._make_list()
+        primitive = objlist.obj_to_primitive()
+        with mock.patch.object(
+            base.VersionedObject,
+            'obj_class_from_name',
+            wraps=base.VersionedObject.obj_class_from_name,
+        ) as mock_lookup:
+            result = MyOwnedObjectList.obj_from_primitive(primitive)
+        self.assertEqual(2, mock_lookup.call_count)
+        self.assertEqual(primitive, result.obj_to_primitive())
+        self.assertEqual({'baz'}, result[1].obj_what_changed())
+        self.assertEqual(set(), result[0].obj_what_changed())
+        self.assertEqual({'objects'}, result.obj_what_changed())
+
+    def test_mixed_values(self):
+        owned = MyOwnedObject(baz=1)
+        tracked = MyTrackedObj(foo=1)
+        result = base.VersionedObject.obj_from_primitive_list(
+            [
+                owned.obj_to_primitive(),
+                tracked.obj_to_primitive(),
+                None,
+                owned,
+                owned.obj_to_primitive(),
+            ]
+        )
+        self.assertIsInstance(result[0], MyOwnedObject)
+        self.assertIsInstance(result[1], MyTrackedObj)
+        self.assertIsNone(result[2])
+        self.assertIs(owned, result[3])
+        self.assertEqual(
+            owned.obj_to_primitive(), result[4].obj_to_primitive()
+        )
+        self.assertEqual({'foo'}, result[1].obj_what_changed())
+
+    def test_namespace_mismatch(self):
+        primitive = MyOwnedObject(baz=1).obj_to_primitive()
+        primitive['versioned_object.namespace'] = 'foo'
+        self.assertRaises(
+            exception.UnsupportedObjectError,
+            base.VersionedObject.obj_from_primitive_list,
+            [primitive],
+        )
+
+    def test_overridden_hydration(self):
+        class TestObj(base.VersionedObject):
+            @classmethod
+            def obj_from_primitive(
+                cls, primitive, context=None, trusted=False
+            ):
+                return 'hydrated'
+
+        primitive = MyOwnedObject(baz=1).obj_to_primitive()
+        self.assertEqual(
+            ['hydrated', None],
+            TestObj.obj_from_primitive_list([primitive, None]),
+        )
+
+    def test_lazy_elements(self):
+        objlist = MyLazyChildList(objects=[MyLazyChild(baz=1)])
+        result = MyLazyChildList.obj_from_primitive(objlist.obj_to_primitive())
+        assert result[0]._obj_lazy is not None
+        self.assertEqual({'baz'}, set(result[0]._obj_lazy))
+        self.assertEqual(1, result[0].baz)
+
+
+class TestTrustedHydration(test.TestCase):
+    def _make_obj(self):
+        obj = MyObj(
+            foo=2,
+            bar='bar',
+            readonly=3,
+            rel_object=MyOwnedObject(baz=4),
+            rel_objects=[MyOwnedObject(baz=5), MyOwnedObject(baz=6)],
+            mutable_default=['a', 'b'],
+            timestamp=datetime.datetime(
+                2020, 1, 1, tzinfo=datetime.timezone.utc
+            ),
+        )
+        obj.obj_reset_changes(['foo', 'readonly'])
+        return obj
+
+    def test_same_result(self):
+        primitive = self._make_obj().obj_to_primitive()
+        expected = MyObj.obj_from_primitive(primitive)
+        result = MyObj.obj_from_primitive(primitive, trusted=True)
+        self.assertEqual(
+            expected.obj_to_primitive(), result.obj_to_primitive()
+        )
+        self.assertEqual(
+            expected.obj_what_changed(), result.obj_what_changed()
+        )
+        self.assertEqual(expected.timestamp, result.timestamp)
+
+    def test_values_not_coerced(self):
+        primitive = self._make_obj().obj_to_primitive()
+        with (
+            mock.patch.object(fields.Integer, 'coerce') as mock_int,
+            mock.patch.object(fields.DateTime, 'coerce') as mock_dt,
+        ):
+            result = MyObj.obj_from_primitive(primitive, trusted=True)
+        mock_int.assert_not_called()
+        # NOTE: Only from_primitive() itself coerces the parsed value
+        self.assertEqual(1, mock_dt.call_count)
+        assert result.rel_object is not None
+        assert result.rel_objects is not None
+        self.assertEqual(4, result.rel_object.baz)
+        self.assertEqual([5, 6], [x.baz for x in result.rel_objects])
+        self.assertFalse(base._trusted_hydration.get())
+
+    def test_collections_coerce(self):
+        primitive = self._make_obj().obj_to_primitive()
+        result = MyObj.obj_from_primitive(primitive, trusted=True)
+        self.assertIsInstance(result.mutable_default, fields.CoercedList)
+        result.mutable_default.append(1)
+        self.assertEqual(['a', 'b', '1'], result.mutable_default)
+        assert result.rel_objects is not None
+        self.assertRaises(ValueError, result.rel_objects.append, 'foo')
+
+    def test_children_tracked(self):
+        primitive = self._make_obj().obj_to_primitive()
+        result = MyObj.obj_from_primitive(primitive, trusted=True)
+        result.obj_reset_changes(recursive=True)
+        assert result.rel_object is not None
+        result.rel_object.baz = 7
+        self.assertEqual({'rel_object'}, result.obj_what_changed())
+
+    def test_list(self):
+        objlist = MyOwnedObjectList(
+            objects=[MyOwnedObject(baz=i) for i in range(3)]
+        )
+        primitives = [x.obj_to_primitive() for x in objlist]
+        with mock.patch.object(fields.Integer, 'coerce') as mock_int:
+            result = base.VersionedObject.obj_from_primitive_list(
+                primitives, trusted=True
+            )
+            MyOwnedObjectList.obj_from_primitive(
+                objlist.obj_to_primitive(), trusted=True
+            )
+        mock_int.assert_not_called()
+        self.assertEqual([0, 1, 2], [x.baz for x in result])
+
+    def test_serializer(self):
+        class TrustingSerializer(base.VersionedObjectSerializer):
+            OBJ_TRUSTED_HYDRATION = True
+
+        primitive = self._make_obj().obj_to_primitive()
+        with mock.patch.object(fields.Integer, 'coerce') as mock_int:
+            result = TrustingSerializer().deserialize_entity(None, primitive)
+        mock_int.assert_not_called()
+        self.assertEqual(primitive, result.obj_to_primitive())
+
+
+class TestSharedPrimitives(test.TestCase):
+    def _make_obj(self):
+        owned = MyOwnedObject(baz=1)
+        obj = MyObj(
+            foo=2,
+            rel_object=owned,
+            rel_objects=[owned, owned, MyOwnedObject(baz=1)],
+        )
+        obj.obj_reset_changes(recursive=True)
+        owned.baz = 2
+        return obj
+
+    def test_share_by_identity(self):
+        obj = self._make_obj()
+        primitive = obj.obj_to_shared_primitive()
+        self.assertEqual(
+            [obj.rel_object.obj_to_primitive()],
+            primitive['versioned_object.shared'],
+        )
+        data = primitive['versioned_object.data']
+        ref = {'versioned_object.ref': 0}
+        self.assertEqual(ref, data['rel_object'])
+        self.assertEqual(
+            [ref, ref, obj.rel_objects[2].obj_to_primitive()],
+            data['rel_objects'],
+        )
+
+        obj2 = MyObj.obj_from_primitive(primitive)
+        assert obj2.rel_objects is not None
+        self.assertIs(obj2.rel_object, obj2.rel_objects[0])
+        self.assertIs(obj2.rel_object, obj2.rel_objects[1])
+        self.assertIsNot(obj2.rel_object, obj2.rel_objects[2])
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+        self.assertEqual(
+            MyObj.obj_from_primitive(
+                obj.obj_to_primitive()
+            ).obj_what_changed(),
+            obj2.obj_what_changed(),
+        )
+        obj2.obj_reset_changes(recursive=True)
+        obj2.rel_objects[0].baz = 3
+        self.assertEqual(3, obj2.rel_objects[1].baz)
+        self.assertIn('rel_object', obj2.obj_what_changed())
+
+    def test_share_by_content(self):
+        obj = self._make_obj()
+        obj.obj_reset_changes(recursive=True)
+        obj.rel_object.baz = 1
+        obj.rel_object.obj_reset_changes()
+        primitive = obj.obj_to_shared_primitive(by_content=True)
+        self.assertEqual(1, len(primitive['versioned_object.shared']))
+        self.assertEqual(
+            [{'versioned_object.ref': 0}] * 3,
+            primitive['versioned_object.data']['rel_objects'],
+        )
+        obj2 = MyObj.obj_from_primitive(primitive, trusted=True)
+        assert obj2.rel_objects is not None
+        self.assertIs(obj2.rel_objects[0], obj2.rel_objects[2])
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_nothing_shared(self):
+        obj = MyObj(foo=1, rel_object=MyOwnedObject(baz=1))
+        self.assertEqual(obj.obj_to_primitive(), obj.obj_to_shared_primitive())
+
+    def test_version_manifest(self):
+        obj = self._make_obj()
+        manifest = {'MyObj': '1.6', 'MyOwnedObject': '1.0'}
+        self.assertNotIn(
+            'versioned_object.shared',
+            obj.obj_to_shared_primitive(version_manifest=manifest),
+        )
+        primitive = obj.obj_to_shared_primitive(
+            version_manifest=manifest, by_content=True
+        )
+        self.assertEqual(1, len(primitive['versioned_object.shared']))
+        self.assertEqual(
+            obj.obj_to_primitive(version_manifest=manifest),
+            MyObj.obj_from_primitive(primitive).obj_to_primitive(),
+        )
+
+    def test_nested_shared_objects(self):
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyHolder(base.VersionedObject):
+            fields = {'objs': fields.ListOfObjectsField('MyObj')}
+
+        obj = self._make_obj()
+        other = MyObj(rel_object=obj.rel_object)
+        primitive = MyHolder(objs=[obj, obj, other]).obj_to_shared_primitive()
+        self.assertEqual(2, len(primitive['versioned_object.shared']))
+        holder = MyHolder.obj_from_primitive(primitive)
+        self.assertIs(holder.objs[0], holder.objs[1])
+        self.assertIs(holder.objs[0].rel_object, holder.objs[2].rel_object)
+        rel_objects = holder.objs[0].rel_objects
+        assert rel_objects is not None
+        self.assertIs(holder.objs[0].rel_object, rel_objects[0])
+        self.assertEqual(
+            [o.obj_to_primitive() for o in (obj, obj, other)],
+            [o.obj_to_primitive() for o in holder.objs],
+        )
+
+    def test_lazy_hydration(self):
+        child = MyLazyChild(baz=1)
+        obj = MyLazyObj(
+            foo=1,
+            rel_object=child,
+            rel_list=MyLazyChildList(objects=[child]),
+        )
+        primitive = obj.obj_to_shared_primitive()
+        self.assertEqual(1, len(primitive['versioned_object.shared']))
+        obj2 = MyLazyObj.obj_from_primitive(primitive)
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+        self.assertIs(obj2.rel_object, obj2.rel_list[0])
+
+    def test_serializer(self):
+        class SharingSerializer(base.VersionedObjectSerializer):
+            OBJ_SHARE_OBJECTS = True
+
+        obj = self._make_obj()
+        primitive = SharingSerializer().serialize_entity(None, [obj])
+        self.assertIn('versioned_object.shared', primitive[0])
+        result = base.VersionedObjectSerializer().deserialize_entity(
+            None, primitive
+        )
+        self.assertIs(result[0].rel_object, result[0].rel_objects[1])
+        self.assertEqual(obj.obj_to_primitive(), result[0].obj_to_primitive())
+
+
+class TestCompactPrimitives(test.TestCase):
+    def _make_obj(self):
+        owned = MyOwnedObject(baz=1)
+        obj = MyObj(foo=2, rel_object=owned, rel_objects=[owned])
+        obj.obj_reset_changes(['rel_objects'])
+        return obj
+
+    def test_compact(self):
+        obj = self._make_obj()
+        primitive = MyObj.obj_compact_primitive(obj.obj_to_primitive())
+        self.assertEqual(
+            {
+                'versioned_object.~n': 'MyObj',
+                'versioned_object.~s': 'versionedobjects',
+                'versioned_object.~v': '1.6',
+            },
+            {
+                key: primitive[key]
+                for key in (
+                    'versioned_object.~n',
+                    'versioned_object.~s',
+                    'versioned_object.~v',
+                )
+            },
+        )
+        self.assertEqual(
+            {'foo', 'rel_object'}, set(primitive['versioned_object.~c'])
+        )
+        child = {
+            'versioned_object.~n': 'MyOwnedObject',
+            'versioned_object.~v': '1.0',
+            'versioned_object.~d': {'baz': 1},
+        }
+        child['versioned_object.~c'] = ['baz']
+        self.assertEqual(child, primitive['versioned_object.~d']['rel_object'])
+        self.assertEqual(
+            [child], primitive['versioned_object.~d']['rel_objects']
+        )
+
+        obj2 = MyObj.obj_from_primitive(primitive)
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+        self.assertEqual(obj.obj_what_changed(), obj2.obj_what_changed())
+
+    def test_compact_namespace(self):
+        primitive = self._make_obj().obj_to_primitive()
+        child = primitive['versioned_object.data']['rel_object']
+        child['versioned_object.namespace'] = 'other'
+        compact = MyObj.obj_compact_primitive(primitive)
+        self.assertEqual(
+            'other',
+            compact['versioned_object.~d']['rel_object'][
+                'versioned_object.~s'
+            ],
+        )
+        self.assertNotIn(
+            'versioned_object.~s',
+            compact['versioned_object.~d']['rel_objects'][0],
+        )
+        self.assertRaises(
+            exception.UnsupportedObjectError,
+            MyObj.obj_from_primitive,
+            compact,
+        )
+
+    def test_compact_shared(self):
+        obj = self._make_obj()
+        primitive = MyObj.obj_compact_primitive(obj.obj_to_shared_primitive())
+        self.assertEqual(
+            {'versioned_object.~r': 0},
+            primitive['versioned_object.~d']['rel_object'],
+        )
+        self.assertEqual(
+            'MyOwnedObject',
+            primitive['versioned_object.~t'][0]['versioned_object.~n'],
+        )
+        obj2 = MyObj.obj_from_primitive(primitive, trusted=True)
+        assert obj2.rel_objects is not None
+        self.assertIs(obj2.rel_object, obj2.rel_objects[0])
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_compact_list(self):
+        obj = self._make_obj()
+        primitives = [
+            MyObj.obj_compact_primitive(obj.obj_to_primitive()),
+            obj.obj_to_primitive(),
+        ]
+        objs = MyObj.obj_from_primitive_list(primitives)
+        self.assertEqual(
+            [obj.obj_to_primitive()] * 2,
+            [o.obj_to_primitive() for o in objs],
+        )
+
+    def test_compact_lazy_hydration(self):
+        obj = MyLazyObj(foo=1, rel_object=MyLazyChild(baz=2))
+        primitive = MyLazyObj.obj_compact_primitive(obj.obj_to_primitive())
+        obj2 = MyLazyObj.obj_from_primitive(primitive)
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_serializer(self):
+        class CompactSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPACT_PRIMITIVES = True
+
+        obj = self._make_obj()
+        ser = CompactSerializer()
+        primitive = ser.serialize_entity(None, {'obj': obj})
+        self.assertEqual(
+            MyObj.obj_compact_primitive(obj.obj_to_primitive()),
+            primitive['obj'],
+        )
+        result = base.VersionedObjectSerializer().deserialize_entity(
+            None, primitive
+        )
+        self.assertEqual(
+            obj.obj_to_primitive(), result['obj'].obj_to_primitive()
+        )
+
+        ser.OBJ_SHARE_OBJECTS = True
+        primitive = ser.serialize_entity(None, obj)
+        self.assertIn('versioned_object.~t', primitive)
+        result = ser.deserialize_entity(None, primitive)
+        self.assertIs(result.rel_object, result.rel_objects[0])
+
+    def test_serializer_revision(self):
+        primitive = MyObj.obj_compact_primitive(
+            MyObj(foo=1).obj_to_primitive()
+        )
+        primitive['versioned_object.~v'] = '1.6.1'
+        obj = base.VersionedObjectSerializer().deserialize_entity(
+            None, primitive
+        )
+        self.assertEqual('1.6', obj.VERSION)
+        self.assertEqual(1, obj.foo)
+
+    def test_serializer_namespace_mismatch(self):
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyNSObj(base.VersionedObject):
+            OBJ_SERIAL_NAMESPACE = 'foo'
+            fields = {'foo': fields.IntegerField()}
+
+        class MySerializer(base.VersionedObjectSerializer):
+            OBJ_BASE_CLASS = MyNSObj
+            OBJ_COMPACT_PRIMITIVES = True
+
+        primitive = MySerializer().serialize_entity(None, MyNSObj(foo=1))
+        self.assertEqual(
+            {'foo.~n', 'foo.~v', 'foo.~d', 'foo.~s', 'foo.~c'}, set(primitive)
+        )
+        self.assertEqual(
+            primitive,
+            base.VersionedObjectSerializer().deserialize_entity(
+                None, primitive
+            ),
+        )
+        obj = MySerializer().deserialize_entity(None, primitive)
+        self.assertEqual(1, obj.foo)
+
+    def test_serializer_plain_dict(self):
+        ser = base.VersionedObjectSerializer()
+        for entity in (
+            {'~n': 'host1', 'port': 1},
+            {'versioned_object.~n': 'host1', 'port': 1},
+            {'versioned_object.~n': 'host1', 'versioned_object.~v': '1.0'},
+        ):
+            self.assertEqual(entity, ser.deserialize_entity(None, entity))
+            self.assertEqual([entity], ser.deserialize_entity(None, [entity]))
+
+
+class TestCodecs(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyNativeChild(base.VersionedObject):
+            fields = {'when': fields.DateTimeField()}
+
+        @base.VersionedObjectRegistry.register
+        class MyNativeObj(base.VersionedObject):
+            VERSION = '1.1'
+            fields = {
+                'name': fields.StringField(),
+                'when': fields.DateTimeField(),
+                'address': fields.IPAddressField(nullable=True),
+                'network': fields.IPNetworkField(),
+                'ports': fields.SetOfIntegersField(),
+                'child': fields.ObjectField('MyNativeChild'),
+            }
+            obj_relationships = {'child': [('1.0', '1.0')]}
+
+            def obj_make_compatible(self, primitive, target_version):
+                super().obj_make_compatible(primitive, target_version)
+                if target_version == '1.0':
+                    primitive.pop('network', None)
+
+        @base.VersionedObjectRegistry.register
+        class MyCompiledNativeObj(base.VersionedObject):
+            OBJ_COMPILED_PRIMITIVES = True
+            fields = dict(MyNativeObj.fields)
+
+        self.classes = [MyNativeObj, MyCompiledNativeObj]
+        self.when = datetime.datetime(
+            2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+        )
+
+    def _make_obj(self, cls):
+        return cls(
+            name='foo',
+            when=self.when.replace(microsecond=7),
+            address='10.0.0.1',
+            network='10.0.0.0/24',
+            ports={80, 443},
+            child=cls.obj_class_from_name('MyNativeChild', '1.0')(
+                when=self.when
+            ),
+        )
+
+    def test_native_primitive(self):
+        for cls in self.classes:
+            obj = self._make_obj(cls)
+            with base._native_values(True):
+                primitive = obj.obj_to_primitive()
+            data = primitive['versioned_object.data']
+            self.assertEqual('foo', data['name'])
+            self.assertEqual(self.when, data['when'])
+            self.assertEqual(netaddr.IPAddress('10.0.0.1'), data['address'])
+            self.assertEqual(netaddr.IPNetwork('10.0.0.0/24'), data['network'])
+            self.assertEqual({80, 443}, data['ports'])
+            self.assertEqual(
+                self.when,
+                data['child']['versioned_object.data']['when'],
+            )
+            obj2 = cls.obj_from_primitive(primitive)
+            self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_native_primitive_backport(self):
+        obj = self._make_obj(self.classes[0])
+        with base._native_values(True):
+            primitive = obj.obj_to_primitive(target_version='1.0')
+        data = primitive['versioned_object.data']
+        self.assertNotIn('network', data)
+        self.assertEqual(obj.obj_to_primitive('1.0'), primitive)
+
+    def test_serializer(self):
+        class BinarySerializer(base.VersionedObjectSerializer):
+            OBJ_CODEC = codec.BinaryCodec()
+
+        for cls in self.classes:
+            obj = self._make_obj(cls)
+            entity = BinarySerializer().serialize_entity(
+                None, {'obj': obj, 'count': 1}
+            )
+            self.assertEqual(
+                {'versioned_object.codec', 'versioned_object.encoded'},
+                set(entity['obj']),
+            )
+            self.assertEqual('binary', entity['obj']['versioned_object.codec'])
+            self.assertEqual(1, entity['count'])
+            result = base.VersionedObjectSerializer().deserialize_entity(
+                None, entity
+            )
+            self.assertEqual(
+                obj.obj_to_primitive(), result['obj'].obj_to_primitive()
+            )
+
+    def test_serializer_json_transport(self):
+        class CompressingSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPRESSOR = codec.ZlibCompressor()
+            OBJ_COMPRESSION_THRESHOLD = 0
+
+        obj = self._make_obj(self.classes[0])
+        for ser, obj_codec in (
+            (base.VersionedObjectSerializer(), codec.BinaryCodec()),
+            (CompressingSerializer(), None),
+            (CompressingSerializer(), codec.BinaryCodec()),
+        ):
+            entity = ser.serialize_entity(None, obj, codec=obj_codec)
+            self.assertIsInstance(entity['versioned_object.encoded'], str)
+            entity = jsonutils.loads(jsonutils.dumps(entity))
+            result = ser.deserialize_entity(None, entity)
+            self.assertEqual(obj.obj_to_primitive(), result.obj_to_primitive())
+
+    def test_serializer_binary_transport(self):
+        class BinarySerializer(base.VersionedObjectSerializer):
+            OBJ_CODEC = codec.BinaryCodec()
+            OBJ_BINARY_TRANSPORT = True
+
+        obj = self._make_obj(self.classes[0])
+        entity = BinarySerializer().serialize_entity(None, obj)
+        self.assertIsInstance(entity['versioned_object.encoded'], bytes)
+        result = base.VersionedObjectSerializer().deserialize_entity(
+            None, entity
+        )
+        self.assertEqual(obj.obj_to_primitive(), result.obj_to_primitive())
+
+    def test_serializer_invalid_base64(self):
+        entity = {
+            'versioned_object.codec': 'json',
+            'versioned_object.encoded': 'not base64!',
+        }
+        self.assertRaises(
+            exception.InvalidEncodedObject,
+            base.VersionedObjectSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+
+    def test_serializer_corrupted(self):
+        class CompressingSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPRESSOR = codec.ZlibCompressor()
+            OBJ_COMPRESSION_THRESHOLD = 0
+            OBJ_BINARY_TRANSPORT = True
+
+        obj = self._make_obj(self.classes[0])
+        ser = CompressingSerializer()
+        for obj_codec in (codec.JSONCodec(), codec.BinaryCodec()):
+            entity = ser.serialize_entity(None, obj, codec=obj_codec)
+            data = entity['versioned_object.encoded']
+            for corrupted in (
+                data[: len(data) // 2],
+                data[:2] + bytes(255 - b for b in data[2:]),
+                zlib.compress(obj_codec.encode(obj.obj_to_primitive())[:-3]),
+                zlib.compress(b'\x01\x09\xff\xff\xff\xff'),
+                zlib.compress(b'{"versioned_object.name": "MyNativeObj"}'),
+            ):
+                self.assertRaises(
+                    exception.InvalidEncodedObject,
+                    ser.deserialize_entity,
+                    None,
+                    dict(entity, **{'versioned_object.encoded': corrupted}),
+                )
+        del entity['versioned_object.encoded']
+        self.assertRaises(
+            exception.InvalidEncodedObject,
+            ser.deserialize_entity,
+            None,
+            entity,
+        )
+
+    def test_serializer_codec_per_call(self):
+        obj = self._make_obj(self.classes[0])
+        ser = base.VersionedObjectSerializer()
+        entity = ser.serialize_entity(None, [obj], codec=codec.JSONCodec())
+        self.assertEqual('json', entity[0]['versioned_object.codec'])
+        self.assertEqual(
+            json.loads(json.dumps(obj.obj_to_primitive())),
+            json.loads(
+                base64.b64decode(entity[0]['versioned_object.encoded'])
+            ),
+        )
+        result = ser.deserialize_entity(None, entity)
+        self.assertEqual(obj.obj_to_primitive(), result[0].obj_to_primitive())
+        self.assertEqual(
+            obj.obj_to_primitive(), ser.serialize_entity(None, obj)
+        )
+
+    def test_serializer_codec_with_override(self):
+        class OverridingSerializer(base.VersionedObjectSerializer):
+            OBJ_CODEC = codec.JSONCodec()
+
+            def serialize_entity(self, context, entity):  # type: ignore[override]
+                return super().serialize_entity(context, entity)
+
+        obj = self._make_obj(self.classes[0])
+        ser = OverridingSerializer()
+        entity = ser.serialize_entity(None, {'objs': [obj], 'count': 1})
+        self.assertEqual('json', entity['objs'][0]['versioned_object.codec'])
+        self.assertEqual(1, entity['count'])
+        entity = base.VersionedObjectSerializer.serialize_entity(
+            ser, None, [obj], codec=codec.BinaryCodec()
+        )
+        self.assertEqual('binary', entity[0]['versioned_object.codec'])
+        entity = base.VersionedObjectSerializer.serialize_entity(
+            ser, None, [obj], exclude=['child']
+        )
+        result = ser.deserialize_entity(None, entity)
+        self.assertFalse(result[0].obj_attr_is_set('child'))
+        self.assertEqual(
+            'json', ser.serialize_entity(None, obj)['versioned_object.codec']
+        )
+
+        entity = {
+            'versioned_object.codec': 'foo',
+            'versioned_object.encoded': b'',
+        }
+        self.assertRaises(
+            exception.UnsupportedCodec,
+            base.VersionedObjectSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+
+    @mock.patch('oslo_versionedobjects.base.VersionedObject.indirection_api')
+    def test_serializer_backport(self, mock_iapi):
+        mock_iapi.object_backport_versions.return_value = 'backported'
+        obj = self._make_obj(self.classes[0])
+        obj.VERSION = '1.2'
+        ser = base.VersionedObjectSerializer()
+        entity = ser.serialize_entity(None, obj, codec=codec.BinaryCodec())
+        self.assertEqual('backported', ser.deserialize_entity(None, entity))
+        mock_iapi.object_backport_versions.assert_called_once_with(
+            None, entity, base.obj_tree_get_versions('MyNativeObj')
+        )
+
+    def test_serializer_schema(self):
+        @base.VersionedObjectRegistry.register
+        class MyLayoutObj(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = dict(self.classes[0].fields)
+
+        obj = self._make_obj(MyLayoutObj)
+        ser = base.VersionedObjectSerializer()
+        entity = ser.serialize_entity(None, [obj], codec=codec.SchemaCodec())
+        self.assertEqual('schema', entity[0]['versioned_object.codec'])
+        with mock.patch.object(codec.SchemaCodec, 'decode') as mock_decode:
+            result = ser.deserialize_entity(None, entity)
+        mock_decode.assert_not_called()
+        self.assertEqual(obj.obj_to_primitive(), result[0].obj_to_primitive())
+
+        # Objects of a class with another fingerprint are hydrated from
+        # their primitive
+        @base.VersionedObjectRegistry.register
+        class MyNewLayoutObj(base.VersionedObject):
+            OBJ_BINARY_LAYOUT = True
+            fields = dict(MyLayoutObj.fields, extra=fields.IntegerField())
+
+            @classmethod
+            def obj_name(cls):
+                return 'MyLayoutObj'
+
+        result = ser.deserialize_entity(None, entity)
+        self.assertIsInstance(result[0], MyNewLayoutObj)
+        self.assertEqual('foo', result[0].name)
+        self.assertFalse(result[0].obj_attr_is_set('extra'))
+
+    def test_serializer_compression(self):
+        class CompressingSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPRESSOR = codec.ZlibCompressor()
+            OBJ_COMPRESSION_THRESHOLD = 1024
+
+        obj = self._make_obj(self.classes[0])
+        obj.name = 'foo' * 1000
+        ser = CompressingSerializer()
+        for obj_codec, name in (
+            (None, 'json'),
+            (codec.BinaryCodec(), 'binary'),
+        ):
+            entity = ser.serialize_entity(None, obj, codec=obj_codec)
+            self.assertEqual(name, entity['versioned_object.codec'])
+            self.assertEqual('zlib', entity['versioned_object.compressor'])
+            self.assertLess(len(entity['versioned_object.encoded']), 1000)
+            result = base.VersionedObjectSerializer().deserialize_entity(
+                None, entity
+            )
+            self.assertEqual(obj.obj_to_primitive(), result.obj_to_primitive())
+
+        # Objects below the threshold are sent as they would be otherwise,
+        # without being encoded to measure them
+        obj.name = 'foo'
+        with mock.patch.object(codec.JSONCodec, 'encode') as encode:
+            self.assertEqual(
+                obj.obj_to_primitive(), ser.serialize_entity(None, obj)
+            )
+        encode.assert_not_called()
+        entity = ser.serialize_entity(None, obj, codec=codec.BinaryCodec())
+        self.assertNotIn('versioned_object.compressor', entity)
+
+    def test_serializer_compression_threshold_option(self):
+        class CompressingSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPRESSOR = codec.ZlibCompressor()
+
+        self.assertIn(
+            'compression_threshold',
+            [opt.name for opt in _options.list_opts()[0][1]],
+        )
+        obj = self._make_obj(self.classes[0])
+        obj.name = 'foo' * 100
+        ser = CompressingSerializer()
+        self.assertEqual(
+            obj.obj_to_primitive(), ser.serialize_entity(None, obj)
+        )
+        self.useFixture(config_fixture.Config()).config(
+            compression_threshold=100, group='oslo_versionedobjects'
+        )
+        entity = ser.serialize_entity(None, obj)
+        self.assertEqual('zlib', entity['versioned_object.compressor'])
+
+    def test_serializer_compression_not_smaller(self):
+        compressor = mock.Mock(spec=codec.Compressor)
+        compressor.name = 'mock'
+        compressor.compress.side_effect = lambda data: data + b'\x00'
+
+        class CompressingSerializer(base.VersionedObjectSerializer):
+            OBJ_COMPRESSOR = compressor
+            OBJ_COMPRESSION_THRESHOLD = 0
+
+        obj = self._make_obj(self.classes[0])
+        entity = CompressingSerializer().serialize_entity(None, obj)
+        self.assertEqual('json', entity['versioned_object.codec'])
+        self.assertNotIn('versioned_object.compressor', entity)
+
+    def test_serializer_unsupported_compressor(self):
+        entity = {
+            'versioned_object.codec': 'json',
+            'versioned_object.compressor': 'foo',
+            'versioned_object.encoded': b'',
+        }
+        self.assertRaises(
+            exception.UnsupportedCompressor,
+            base.VersionedObjectSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+
+    def test_serializer_decompression_limit(self):
+        class LimitedSerializer(base.VersionedObjectSerializer):
+            OBJ_MAX_DECOMPRESSED_SIZE = 1000
+
+        entity = {
+            'versioned_object.codec': 'json',
+            'versioned_object.compressor': 'zlib',
+            'versioned_object.encoded': zlib.compress(
+                b'[' + b' ' * 1000 + b']'
+            ),
+        }
+        self.assertRaises(
+            exception.DecompressedSizeExceeded,
+            LimitedSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+        self.useFixture(config_fixture.Config()).config(
+            max_decompressed_size=1000, group='oslo_versionedobjects'
+        )
+        self.assertRaises(
+            exception.DecompressedSizeExceeded,
+            base.VersionedObjectSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+
+    def test_serializer_encoded_not_object(self):
+        entity = {
+            'versioned_object.codec': 'json',
+            'versioned_object.compressor': 'zlib',
+            'versioned_object.encoded': zlib.compress(b'[1, 2]'),
+        }
+        self.assertRaises(
+            exception.InvalidEncodedObject,
+            base.VersionedObjectSerializer().deserialize_entity,
+            None,
+            entity,
+        )
+
+
+class TestJSONPrimitives(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyJSONChild(base.VersionedObject):
+            fields = {
+                'name': fields.StringField(),
+                'when': fields.DateTimeField(nullable=True),
+            }
+
+        @base.VersionedObjectRegistry.register
+        class MyJSONChildList(
+            base.ObjectListBase[MyJSONChild], base.VersionedObject
+        ):
+            fields = {'objects': fields.ListOfObjectsField('MyJSONChild')}
+
+        @base.VersionedObjectRegistry.register
+        class MyPrivateChild(base.VersionedObject):
+            fields = {
+                'name': fields.StringField(),
+                'secret': fields.StringField(nullable=True),
+            }
+
+            def obj_to_primitive(self, *args, **kwargs):
+                primitive = super().obj_to_primitive(*args, **kwargs)
+                primitive['versioned_object.data'].pop('secret', None)
+                return primitive
+
+        @base.VersionedObjectRegistry.register
+        class MyJSONObj(base.VersionedObject):
+            fields = {
+                'id': fields.IntegerField(),
+                'name': fields.StringField(),
+                'weight': fields.FloatField(nullable=True),
+                'meta': fields.DictOfStringsField(),
+                'child': fields.ObjectField('MyJSONChild', nullable=True),
+                'children': fields.ObjectField('MyJSONChildList'),
+                'private': fields.ObjectField('MyPrivateChild'),
+            }
+
+        @base.VersionedObjectRegistry.register
+        class MyCompiledJSONObj(base.VersionedObject):
+            OBJ_COMPILED_PRIMITIVES = True
+            OBJ_SLOT_STORAGE = True
+            fields = dict(MyJSONObj.fields)
+
+        self.child_class = MyJSONChild
+        self.list_class = MyJSONChildList
+        self.private_class = MyPrivateChild
+        self.classes = [MyJSONObj, MyCompiledJSONObj]
+
+    def _make_obj(self, cls):
+        obj = cls(
+            id=1,
+            name='caf\xe9 "quoted"',
+            weight=None,
+            meta={'a': 'b'},
+            child=self.child_class(
+                name='child',
+                when=datetime.datetime(
+                    2020, 1, 2, tzinfo=datetime.timezone.utc
+                ),
+            ),
+            children=self.list_class(
+                objects=[self.child_class(name=str(i)) for i in range(3)]
+            ),
+            private=self.private_class(name='private', secret='secret'),
+        )
+        obj.obj_reset_changes(recursive=True)
+        obj.meta = {'a': 'c'}
+        obj.children[1].name = 'changed'
+        return obj
+
+    def _from_json(self, text, **kwargs):
+        return base.VersionedObject.obj_from_json(text, **kwargs)
+
+    def test_obj_to_json(self):
+        for cls in self.classes:
+            obj = self._make_obj(cls)
+            text = obj.obj_to_json()
+            self.assertEqual(json.dumps(obj.obj_to_primitive()), text)
+            self.assertNotIn('"secret": ', text)
+
+    def test_obj_to_json_sub_object_primitives(self):
+        class ChildName(fields.FieldType[str]):
+            @staticmethod
+            def to_primitive(obj, attr, value):
+                primitive = value.obj_to_primitive()
+                return primitive['versioned_object.data']['name']
+
+        @base.VersionedObjectRegistry.register
+        class MyNamedObj(base.VersionedObject):
+            fields = {
+                'child': fields.ObjectField('MyJSONChild'),
+                'summary': fields.Field(ChildName()),
+            }
+
+        child = self.child_class(name='child')
+        obj = MyNamedObj(child=child, summary=child)
+        with mock.patch.object(
+            self.child_class,
+            'obj_to_primitive',
+            autospec=True,
+            side_effect=base.VersionedObject.obj_to_primitive,
+        ) as mock_to_primitive:
+            text = obj.obj_to_json()
+        self.assertEqual(
+            'child', json.loads(text)['versioned_object.data']['summary']
+        )
+        self.assertEqual(json.dumps(obj.obj_to_primitive()), text)
+        mock_to_primitive.assert_called_once_with(child)
+
+    def test_obj_to_json_unset_child(self):
+        obj = self.classes[0](id=1, child=None)
+        self.assertEqual(json.dumps(obj.obj_to_primitive()), obj.obj_to_json())
+
+    def test_obj_from_json(self):
+        for cls in self.classes:
+            obj = self._make_obj(cls)
+            for trusted in (False, True):
+                obj2 = self._from_json(
+                    obj.obj_to_json(), context='ctxt', trusted=trusted
+                )
+                self.assertIsInstance(obj2, cls)
+                self.assertEqual(
+                    obj.obj_to_primitive(), obj2.obj_to_primitive()
+                )
+                self.assertEqual(
+                    obj.obj_what_changed(), obj2.obj_what_changed()
+                )
+                self.assertEqual('ctxt', obj2.children[0]._context)
+                self.assertIsInstance(obj2.children, self.list_class)
+
+    def test_obj_from_json_envelope_shaped_values(self):
+        @base.VersionedObjectRegistry.register
+        class MyBlobObj(base.VersionedObject):
+            fields = {
+                'meta': fields.DictOfStringsField(),
+                'blob': fields.Field(fields.FieldType(), nullable=True),
+                'child': fields.ObjectField('MyJSONChild', nullable=True),
+            }
+
+        envelope = {
+            'versioned_object.name': 'MyJSONChild',
+            'versioned_object.data': 'x',
+        }
+        child = self.child_class(name='child').obj_to_primitive()
+        for meta, blob in (
+            (envelope, None),
+            (dict(envelope, **{'versioned_object.version': '1.0'}), None),
+            (
+                dict(
+                    envelope,
+                    **{
+                        'versioned_object.namespace': 'versionedobjects',
+                        'versioned_object.version': '1.0',
+                    },
+                ),
+                None,
+            ),
+            ({}, child),
+            ({}, {'nested': [child]}),
+        ):
+            obj = MyBlobObj(
+                meta=meta, blob=blob, child=self.child_class(name='c')
+            )
+            for trusted in (False, True):
+                obj2 = self._from_json(obj.obj_to_json(), trusted=trusted)
+                self.assertEqual(meta, obj2.meta)
+                self.assertEqual(blob, obj2.blob)
+                self.assertEqual('c', obj2.child.name)
+
+    def test_obj_from_json_shared(self):
+        obj = self._make_obj(self.classes[0])
+        obj.child = obj.children[0]
+        text = json.dumps(obj.obj_to_shared_primitive())
+        self.assertIn('versioned_object.shared', text)
+        obj2 = self._from_json(text)
+        self.assertIs(obj2.child, obj2.children[0])
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_obj_from_json_compact(self):
+        obj = self._make_obj(self.classes[0])
+        primitive = obj.obj_compact_primitive(obj.obj_to_primitive())
+        obj2 = base.VersionedObject.obj_from_json(json.dumps(primitive))
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+
+    def test_obj_from_json_unsupported_version(self):
+        text = self._make_obj(self.classes[0]).obj_to_json()
+        text = text.replace(
+            '"versioned_object.version": "1.0"',
+            '"versioned_object.version": "1.5"',
+        )
+        self.assertRaises(
+            exception.IncompatibleObjectVersion,
+            base.VersionedObject.obj_from_json,
+            text,
+        )
+
+    def test_codec(self):
+        obj = self._make_obj(self.classes[0])
+        direct = codec.DirectJSONCodec()
+        data = direct.encode_object(obj)
+        self.assertEqual(codec.JSONCodec().encode_object(obj), data)
+        obj2 = direct.decode_object(base.VersionedObject, data, 'ctxt')
+        assert obj2 is not None
+        self.assertEqual(obj.obj_to_primitive(), obj2.obj_to_primitive())
+        self.assertEqual('ctxt', obj2._context)
+
+    @mock.patch('oslo_versionedobjects.base.VersionedObject.indirection_api')
+    def test_serializer_backport(self, mock_iapi):
+        class DirectSerializer(base.VersionedObjectSerializer):
+            OBJ_CODECS = {'json': codec.DirectJSONCodec()}
+
+        mock_iapi.object_backport_versions.return_value = 'backported'
+        obj = self._make_obj(self.classes[0])
+        ser = DirectSerializer()
+        entity = ser.serialize_entity(None, obj, codec=codec.DirectJSONCodec())
+        self.assertEqual('json', entity['versioned_object.codec'])
+        self.assertEqual(
+            obj.obj_to_primitive(),
+            ser.deserialize_entity(None, entity).obj_to_primitive(),
+        )
+        obj.children[0].VERSION = '1.5'
+        entity = ser.serialize_entity(None, obj, codec=codec.DirectJSONCodec())
+        self.assertEqual('backported', ser.deserialize_entity(None, entity))
+        mock_iapi.object_backport_versions.assert_called_once_with(
+            None, entity, base.obj_tree_get_versions('MyJSONObj')
+        )
+
+
+class TestStreamedLists(test.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.useFixture(fixture.VersionedObjectRegistryFixture())
+
+        @base.VersionedObjectRegistry.register
+        class MyStreamElement(base.VersionedObject):
+            VERSION = '1.1'
+            fields = {
+                'foo': fields.IntegerField(),
+                'bar': fields.StringField(nullable=True),
+            }
+
+            def obj_make_compatible(self, primitive, target_version):
+                super().obj_make_compatible(primitive, target_version)
+                if target_version == '1.0':
+                    primitive.pop('bar', None)
+
+        @base.VersionedObjectRegistry.register
+        class MyStreamList(
+            base.ObjectListBase[MyStreamElement], base.VersionedObject
+        ):
+            VERSION = '1.2'
+            fields = {
+                'name': fields.StringField(),
+                'objects': fields.ListOfObjectsField('MyStreamElement'),
+            }
+            obj_relationships = {'objects': [('1.1', '1.0'), ('1.2', '1.1')]}
+
+        self.element_class = MyStreamElement
+        self.list_class = MyStreamList
+
+    def _make_list(self, count=3):
+        objlist = self.list_class(
+            context='ctxt',
+            name='foo',
+            objects=[
+                self.element_class(foo=i, bar=str(i)) for i in range(count)
+            ],
+        )
+        objlist.obj_reset_changes(recursive=True)
+        return objlist
+
+    def _join(self, primitives):
+        primitive = copy.deepcopy(primitives[0])
+        data = primitive['versioned_object.data']
+        self.assertEqual([], data['objects'])
+        data['objects'] = primitives[1:]
+        return primitive
+
+    def test_iter_primitives(self):
+        objlist = self._make_list()
+        primitives = objlist.iter_primitives()
+        self.assertIs(primitives, iter(primitives))
+        self.assertEqual(
+            objlist.obj_to_primitive(), self._join(list(primitives))
+        )
+
+    def test_iter_primitives_backport(self):
+        objlist = self._make_list()
+        primitives = list(objlist.iter_primitives(target_version='1.1'))
+        self.assertEqual('1.0', primitives[1]['versioned_object.version'])
+        self.assertNotIn('bar', primitives[1]['versioned_object.data'])
+        self.assertEqual(
+            objlist.obj_to_primitive(target_version='1.1'),
+            self._join(primitives),
+        )
+
+    def test_iter_primitives_manifest(self):
+        objlist = self._make_list()
+        manifest = {'MyStreamElement': '1.0'}
+        primitives = list(objlist.iter_primitives(version_manifest=manifest))
+        self.assertEqual('1.0', primitives[1]['versioned_object.version'])
+        self.assertEqual(
+            objlist.obj_to_primitive(version_manifest=manifest),
+            self._join(primitives),
+        )
+
+    def test_iter_primitives_objects_dropped(self):
+        objlist = self._make_list()
+        primitives = list(objlist.iter_primitives(target_version='1.0'))
+        self.assertEqual([objlist.obj_to_primitive('1.0')], primitives)
+        self.assertNotIn('objects', primitives[0]['versioned_object.data'])
+
+    def test_iter_primitives_changes(self):
+        objlist = self._make_list()
+        objlist.objects[1].foo = 5
+        primitives = list(objlist.iter_primitives())
+        self.assertEqual(
+            ['objects'], primitives[0]['versioned_object.changes']
+        )
+        self.assertEqual(
+            objlist.obj_to_primitive(), self._join(list(primitives))
+        )
+
+    def test_from_primitive_stream(self):
+        objlist = self._make_list()
+        objlist.objects[1].foo = 5
+
+        def stream():
+            for primitive in objlist.iter_primitives():
+                yield copy.deepcopy(primitive)
+
+        for trusted in (False, True):
+            objlist2 = self.list_class.from_primitive_stream(
+                stream(), context='ctxt2', trusted=trusted
+            )
+            self.assertIsInstance(objlist2, self.list_class)
+            self.assertEqual(
+                objlist.obj_to_primitive(), objlist2.obj_to_primitive()
+            )
+            self.assertEqual({'objects'}, objlist2.obj_what_changed())
+            self.assertEqual('ctxt2', objlist2._context)
+            self.assertEqual('ctxt2', objlist2.objects[0]._context)
+
+    def test_from_primitive_stream_objects_dropped(self):
+        objlist = self._make_list()
+        objlist2 = self.list_class.from_primitive_stream(
+            objlist.iter_primitives(target_version='1.0')
+        )
+        self.assertEqual('foo', objlist2.name)
+        self.assertEqual(0, len(objlist2))
+
+    def test_serializer(self):
+        objlist = self._make_list()
+        ser = base.VersionedObjectSerializer()
+        for stream_codec in (None, codec.BinaryCodec()):
+            entities = list(
+                ser.serialize_stream(None, objlist, codec=stream_codec)
+            )
+            self.assertEqual(4, len(entities))
+            if stream_codec is None:
+                self.assertEqual(
+                    objlist.obj_to_primitive(), self._join(list(entities))
+                )
+            objlist2 = ser.deserialize_stream('ctxt', iter(entities))
+            self.assertIsInstance(objlist2, self.list_class)
+            self.assertEqual(
+                objlist.obj_to_primitive(), objlist2.obj_to_primitive()
+            )
+
+    @mock.patch('oslo_versionedobjects.base.VersionedObject.indirection_api')
+    def test_serializer_backport(self, mock_iapi):
+        objlist = self._make_list()
+        element = objlist.objects[1]
+        ser = base.VersionedObjectSerializer()
+        backported = self.element_class(foo=1)
+        mock_iapi.object_backport_versions.return_value = backported
+        entities = list(ser.serialize_stream(None, objlist))
+        entities[2]['versioned_object.version'] = '1.5'
+        objlist2 = ser.deserialize_stream(None, entities)
+        self.assertEqual(3, len(objlist2))
+        self.assertIs(backported, objlist2[1])
+        mock_iapi.object_backport_versions.assert_called_once_with(
+            None,
+            dict(
+                element.obj_to_primitive(),
+                **{'versioned_object.version': '1.5'},
+            ),
+            base.obj_tree_get_versions('MyStreamElement'),
+        )